@@ -2,29 +2,83 @@
 """
 Script to generate description embeddings for products in the product_data.json file.
 Concatenates product name and description to create embeddings using Azure OpenAI.
-This script is restartable - it will skip products that already have embeddings.
+Embeddings are appended to the sidecar description embedding store (see product_catalog.py).
+Products are sent in batches bounded by --batch-size and --max-batch-tokens, failed requests
+are retried with exponential backoff, and progress is checkpointed to the store once per batch.
+With --workers N, N batches are kept in flight by an asyncio worker pool that stays under
+--tokens-per-minute / --requests-per-minute and backs off when the service returns 429.
+Set AZURE_OPENAI_API_KEY to use key authentication (e.g. against a local stub server).
+This script is restartable and incremental - it skips products whose stored embedding was
+computed from the same name and description (by content hash) with the same model/deployment.
 """
 
+import argparse
+import asyncio
 import json
 import os
+import random
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Tuple
 
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import (AsyncAzureOpenAI, AuthenticationError, AzureOpenAI, BadRequestError, NotFoundError,
+                    PermissionDeniedError, RateLimitError)
+
+from product_catalog import EmbeddingSource, ProductCatalog, content_hash
+from rate_limiter import RateLimiter, ThroughputStats, retry_after_seconds
+
+# Azure OpenAI accepts at most 2048 inputs per embeddings request
+MAX_BATCH_INPUTS = 2048
+DEFAULT_BATCH_SIZE = 256
+# Estimated tokens per request, well under the service's per-request limit
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+# Token estimate without a tokenizer. English text averages about 4 characters per token,
+# but names, SKUs and numbers tokenize denser; 3 overestimates so batches stay under the limit
+CHARS_PER_TOKEN = 3
+
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+# Total retry-after time one batch may spend throttled before it is given up
+DEFAULT_MAX_THROTTLE_WAIT_SECONDS = 600.0
+# Errors that will not go away by retrying the same request
+NON_RETRYABLE_ERRORS = (BadRequestError, AuthenticationError, PermissionDeniedError, NotFoundError)
 
 
 class DescriptionEmbeddingProcessor:
-    def __init__(self, data_directory_path: str) -> None:
+    def __init__(self, data_directory_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS, max_retries: int = DEFAULT_MAX_RETRIES,
+                 workers: int = 1, tokens_per_minute: int = 0, requests_per_minute: int = 0,
+                 max_throttle_wait: float = DEFAULT_MAX_THROTTLE_WAIT_SECONDS,
+                 client: Any = None, async_client: Any = None) -> None:
         """
         Initialize the description embedding processor.
         
         Args:
             data_directory_path: Path to the data directory containing product_data.json
+            batch_size: Maximum products per embeddings request
+            max_batch_tokens: Maximum estimated tokens per embeddings request
+            max_retries: Retries for a failed request before its batch is given up
+            workers: Embedding requests kept in flight; above 1 an asyncio worker pool is used
+            tokens_per_minute: Token quota to stay under in the worker pool (0 for no limit)
+            requests_per_minute: Request quota to stay under in the worker pool (0 for no limit)
+            max_throttle_wait: Seconds of 429 retry-after waits one batch may accumulate before it fails
+            client: Embeddings client to use instead of an Azure OpenAI client (e.g. a fake in tests)
+            async_client: Async embeddings client for the worker pool, likewise
         """
         self.data_directory_path = Path(data_directory_path)
+        self.batch_size = min(batch_size, MAX_BATCH_INPUTS)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.workers = workers
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_throttle_wait = max_throttle_wait
+        self.async_client = async_client
+        self.stats = ThroughputStats()
         self.json_file_path = self.data_directory_path / "product_data.json"
         
         # Load environment variables
@@ -34,24 +88,32 @@ class DescriptionEmbeddingProcessor:
         self.endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "<ENDPOINT_URL>")
         self.model_name = "text-embedding-3-small"
         self.deployment = "text-embedding-3-small"
+        # Recorded with every vector so a model or deployment change triggers re-embedding
+        self.embedding_model = f"{self.model_name}/{self.deployment}"
+        
+        if client is not None:
+            self.client = client
+        else:
+            self.client = self._create_client()
         
-        # Check if endpoint is configured
+        # Load the product data
+        self.load_product_data()
+    
+    def _create_client(self) -> AzureOpenAI:
+        """Check the endpoint is configured and create the Azure OpenAI client, exiting on failure."""
         if self.endpoint == "<ENDPOINT_URL>":
             print("Error: Please set the AZURE_OPENAI_ENDPOINT environment variable!")
             print("Example: export AZURE_OPENAI_ENDPOINT='https://your-openai-resource.openai.azure.com/'")
             sys.exit(1)
         
-        # Initialize Azure OpenAI client
         print("Setting up Azure OpenAI client...")
         try:
-            self.client = self._setup_azure_openai_client()
+            client = self._setup_azure_openai_client()
             print("Azure OpenAI client initialized successfully!")
+            return client
         except Exception as e:
             print(f"Failed to initialize Azure OpenAI client: {e}")
             sys.exit(1)
-        
-        # Load the product data
-        self.load_product_data()
     
     def _load_environment(self) -> None:
         """Load environment variables from .env files."""
@@ -69,25 +131,37 @@ class DescriptionEmbeddingProcessor:
             # Fallback to default behavior
             load_dotenv()
     
+    def _client_options(self) -> Dict[str, Any]:
+        """Connection and authentication options shared by the sync and async clients."""
+        options: Dict[str, Any] = {
+            "api_version": "2024-02-01",
+            "azure_endpoint": self.endpoint,
+            # Retries and throttling are handled here, not inside the SDK
+            "max_retries": 0,
+        }
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        if api_key:
+            options["api_key"] = api_key
+        else:
+            options["azure_ad_token_provider"] = get_bearer_token_provider(
+                DefaultAzureCredential(), 
+                "https://cognitiveservices.azure.com/.default"
+            )
+        return options
+    
     def _setup_azure_openai_client(self) -> AzureOpenAI:
         """Setup and return Azure OpenAI client with token provider."""
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(), 
-            "https://cognitiveservices.azure.com/.default"
-        )
-        api_version = "2024-02-01"
-        
-        return AzureOpenAI(
-            api_version=api_version,
-            azure_endpoint=self.endpoint,
-            azure_ad_token_provider=token_provider,
-        )
+        return AzureOpenAI(**self._client_options())
+    
+    def _setup_async_azure_openai_client(self) -> AsyncAzureOpenAI:
+        """Setup and return an async Azure OpenAI client for the worker pool."""
+        return AsyncAzureOpenAI(**self._client_options())
     
     def load_product_data(self) -> None:
-        """Load the product data from JSON file."""
+        """Load the product data from JSON file (embeddings are read lazily from the sidecar store)."""
         try:
-            with self.json_file_path.open('r', encoding='utf-8') as f:
-                self.product_data = json.load(f)
+            self.catalog = ProductCatalog.load(self.json_file_path)
+            self.product_data = self.catalog.data
             print(f"Loaded product data from {self.json_file_path}")
         except FileNotFoundError:
             print(f"Error: Could not find {self.json_file_path}")
@@ -96,123 +170,249 @@ class DescriptionEmbeddingProcessor:
             print(f"Error parsing JSON file: {e}")
             sys.exit(1)
     
-    def save_product_data(self) -> None:
-        """Save the product data back to JSON file."""
-        try:
-            with self.json_file_path.open('w', encoding='utf-8') as f:
-                json.dump(self.product_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"Saved updated product data to {self.json_file_path}")
-        except Exception as e:
-            print(f"Error saving JSON file: {e}")
-            sys.exit(1)
+    @staticmethod
+    def embedding_text(product: Dict[str, Any]) -> str:
+        """Text embedded for a product: its name and description concatenated."""
+        return f"{product['name']}. {product['description']}"
+    
+    def embedding_source(self, product: Dict[str, Any]) -> EmbeddingSource:
+        """Hash of the text embedded for a product and the model that embeds it."""
+        return EmbeddingSource(content_hash(self.embedding_text(product)), self.embedding_model)
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Estimate the token count of a text without a tokenizer (errs on the high side)."""
+        return len(text) // CHARS_PER_TOKEN + 1
     
-    def get_description_embedding(self, product_name: str, description: str) -> Optional[List[float]]:
+    def _record_response(self, response: Any, texts: List[str]) -> List[List[float]]:
+        """Update throughput stats and return the embeddings of a response in input order."""
+        usage = getattr(response, "usage", None)
+        tokens = usage.total_tokens if usage else sum(self.estimate_tokens(text) for text in texts)
+        self.stats.record(len(texts), tokens)
+        # Each result carries the index of the input it belongs to
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    @staticmethod
+    def backoff_seconds(attempt: int) -> float:
+        """Jittered exponential backoff delay before retry number attempt + 1."""
+        return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+    
+    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
-        Generate embedding for a product description.
+        Embed several texts with a single request, retrying transient failures with exponential backoff.
         
         Args:
-            product_name: Name of the product
-            description: Description of the product
+            texts: Texts to embed
             
         Returns:
-            List of float values representing the embedding
+            One embedding per text, in input order
         """
-        try:
-            # Concatenate name and description
-            combined_text = f"{product_name}. {description}"
-            
-            # Generate embedding using Azure OpenAI
-            response = self.client.embeddings.create(
-                input=[combined_text],
-                model=self.deployment
-            )
-            
-            # Extract embedding from response
-            return response.data[0].embedding
-            
-        except Exception as e:
-            print(f"Error generating embedding for {product_name}: {e}")
-            return None
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.embeddings.create(input=texts, model=self.deployment)
+                return self._record_response(response, texts)
+            except NON_RETRYABLE_ERRORS:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds(attempt)
+                if isinstance(e, RateLimitError):
+                    self.stats.throttled += 1
+                    delay = retry_after_seconds(e, default=delay)
+                self.stats.retries += 1
+                print(f"  Embedding request failed ({e}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1} of {self.max_retries})")
+                time.sleep(delay)
+        return []
     
-    def process_product(self, product: Dict[str, Any]) -> bool:
+    async def create_embeddings_async(self, client: AsyncAzureOpenAI, limiter: RateLimiter,
+                                      texts: List[str]) -> List[List[float]]:
         """
-        Process a single product to add description embedding.
+        Embed several texts with a single request from the worker pool.
+        
+        Throttled (429) requests wait for the retry-after period and do not use up retries,
+        until the batch has waited max_throttle_wait seconds in total; other transient
+        failures are retried with exponential backoff.
         
-        Args:
-            product: Product dictionary
-            
         Returns:
-            True if embedding was added, False if skipped or failed
+            One embedding per text, in input order
+        """
+        tokens = sum(self.estimate_tokens(text) for text in texts)
+        attempt = 0
+        throttle_wait = 0.0
+        while True:
+            try:
+                async with limiter.slot(tokens):
+                    response = await client.embeddings.create(input=texts, model=self.deployment)
+                await limiter.succeeded()
+                return self._record_response(response, texts)
+            except RateLimitError as e:
+                delay = retry_after_seconds(e, default=self.backoff_seconds(min(attempt, 6)))
+                self.stats.throttled += 1
+                throttle_wait += delay
+                if throttle_wait > self.max_throttle_wait:
+                    print(f"  Throttled for over {self.max_throttle_wait:.0f}s, giving up on this batch")
+                    raise
+                limiter.throttled(delay)
+                print(f"  Throttled, pausing requests for {delay:.1f}s "
+                      f"(concurrency now {limiter.concurrency} of {limiter.max_concurrency})")
+            except NON_RETRYABLE_ERRORS:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds(attempt)
+                attempt += 1
+                self.stats.retries += 1
+                print(f"  Embedding request failed ({e}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt} of {self.max_retries})")
+                await asyncio.sleep(delay)
+    
+    def iter_batches(self, products: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Group products into batches bounded by the batch size and the per-request token budget."""
+        batch: List[Dict[str, Any]] = []
+        batch_tokens = 0
+        for product in products:
+            tokens = self.estimate_tokens(self.embedding_text(product))
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(product)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+    
+    def embed_batch(self, products: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[float]]]:
         """
-        # Check if product already has a valid embedding (non-empty)
-        if product.get('description_embedding'):
-            print(f"Skipping {product.get('name', 'Unknown')} - already has embedding")
-            return False
+        Generate description embeddings for a batch of products.
         
-        # Check if product has name and description
-        if 'name' not in product or 'description' not in product:
-            print(f"Warning: {product.get('name', 'Unknown')} missing name or description")
-            return False
+        A request rejected as invalid is split in half and retried, so one bad product
+        only loses its own embedding.
         
-        product_name = product['name']
-        description = product['description']
+        Returns:
+            List of (product, embedding) for the products that were embedded
+        """
+        try:
+            embeddings = self.create_embeddings([self.embedding_text(product) for product in products])
+            return list(zip(products, embeddings))
+        except BadRequestError as e:
+            if len(products) == 1:
+                print(f"✗ Failed to generate embedding for {products[0]['name']}: {e}")
+                return []
+            middle = len(products) // 2
+            return self.embed_batch(products[:middle]) + self.embed_batch(products[middle:])
+        except Exception as e:
+            print(f"✗ Failed to generate embeddings for a batch of {len(products)} products: {e}")
+            return []
+    
+    async def embed_batch_async(self, client: AsyncAzureOpenAI, limiter: RateLimiter,
+                                products: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[float]]]:
+        """Worker pool version of embed_batch."""
+        try:
+            texts = [self.embedding_text(product) for product in products]
+            embeddings = await self.create_embeddings_async(client, limiter, texts)
+            return list(zip(products, embeddings))
+        except BadRequestError as e:
+            if len(products) == 1:
+                print(f"✗ Failed to generate embedding for {products[0]['name']}: {e}")
+                return []
+            middle = len(products) // 2
+            return (await self.embed_batch_async(client, limiter, products[:middle])
+                    + await self.embed_batch_async(client, limiter, products[middle:]))
+        except Exception as e:
+            print(f"✗ Failed to generate embeddings for a batch of {len(products)} products: {e}")
+            return []
+    
+    def checkpoint_batch(self, batch_number: int, batch: List[Dict[str, Any]],
+                         results: List[Tuple[Dict[str, Any], List[float]]], pending_count: int) -> None:
+        """Append a finished batch to the store in one write and report progress."""
+        sources = [self.embedding_source(product) for product, _ in results]
+        self.catalog.set_embeddings('description_embedding', results, sources)
+        print(f"  Batch {batch_number}: {len(results)}/{len(batch)} embedded → Saved progress "
+              f"({self.stats.items}/{pending_count} embeddings added, {self.stats.rates()})")
+    
+    async def process_batches_async(self, batches: List[List[Dict[str, Any]]], pending_count: int) -> int:
+        """
+        Embed batches with a pool of asyncio workers sharing one rate limiter.
         
-        print(f"Processing: {product_name}")
+        Returns:
+            Number of products embedded
+        """
+        client = self.async_client or self._setup_async_azure_openai_client()
+        limiter = RateLimiter(self.workers, self.tokens_per_minute, self.requests_per_minute)
+        queue: asyncio.Queue = asyncio.Queue()
+        for batch_number, batch in enumerate(batches, 1):
+            queue.put_nowait((batch_number, batch))
+        embedded = 0
         
-        # Generate embedding
-        embedding = self.get_description_embedding(product_name, description)
+        async def worker() -> None:
+            nonlocal embedded
+            while not queue.empty():
+                batch_number, batch = queue.get_nowait()
+                results = await self.embed_batch_async(client, limiter, batch)
+                self.checkpoint_batch(batch_number, batch, results, pending_count)
+                embedded += len(results)
         
-        if embedding is not None:
-            product['description_embedding'] = embedding
-            print(f"✓ Added embedding for {product_name} (dimension: {len(embedding)})")
-            return True
-        print(f"✗ Failed to generate embedding for {product_name}")
-        return False
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.workers)))
+        finally:
+            await client.close()
+        return embedded
     
     def process_all_products(self) -> None:
         """Process all products in the JSON file to add description embeddings."""
         total_products = 0
         processed_products = 0
         skipped_products = 0
+        changed_products = 0
         failed_products = 0
+        pending_products = []
         
         print("Starting description embedding processing...")
         print("=" * 50)
         
-        # Iterate through all categories and subcategories
-        for category_name, category_data in self.product_data.get('main_categories', {}).items():
-            print(f"\nProcessing category: {category_name}")
+        for _category_name, _product_type, product in self.catalog.products():
+            total_products += 1
+            
+            # Embeddings are stored by SKU
+            if not product.get('sku'):
+                print(f"Warning: {product.get('name', 'Unknown')} has no sku - run generate_skus.py first")
+                failed_products += 1
+                continue
             
-            for subcategory_name, products in category_data.items():
-                # Skip non-product items (like seasonal multipliers)
-                if not isinstance(products, list):
-                    continue
-                
-                print(f"  Subcategory: {subcategory_name} ({len(products)} products)")
-                
-                for product in products:
-                    if not isinstance(product, dict):
-                        continue
-                    
-                    total_products += 1
-                    
-                    # Check if already has a valid embedding (non-empty)
-                    if product.get('description_embedding'):
-                        skipped_products += 1
-                        continue
-                    
-                    # Process the product
-                    success = self.process_product(product)
-                    
-                    if success:
-                        processed_products += 1
-                        # Save after each successful embedding
-                        self.save_product_data()
-                        print(f"  → Saved progress ({processed_products} embeddings added)")
-                    else:
-                        print(f"  → Failed to process {product.get('name', 'Unknown')}")
-                        failed_products += 1
+            # Check if product has name and description
+            if 'name' not in product or 'description' not in product:
+                print(f"Warning: {product.get('name', 'Unknown')} missing name or description")
+                failed_products += 1
+                continue
+            
+            # Skip products whose embedding was computed from the same text with the same model
+            if not self.catalog.needs_embedding(product, 'description_embedding', self.embedding_source(product)):
+                skipped_products += 1
+                continue
+            
+            if self.catalog.has_embedding(product, 'description_embedding'):
+                changed_products += 1
+            pending_products.append(product)
+        
+        print(f"{len(pending_products)} products need embeddings, {changed_products} of them because "
+              f"their text or the model changed "
+              f"(batches of up to {self.batch_size} products / ~{self.max_batch_tokens} tokens, "
+              f"{self.workers} in flight)")
+        
+        self.stats = ThroughputStats()
+        batches = list(self.iter_batches(pending_products))
+        if self.workers > 1:
+            processed_products = asyncio.run(self.process_batches_async(batches, len(pending_products)))
+        else:
+            for batch_number, batch in enumerate(batches, 1):
+                results = self.embed_batch(batch)
+                # Checkpoint once per batch: the whole batch is appended to the store in one write
+                self.checkpoint_batch(batch_number, batch, results, len(pending_products))
+                processed_products += len(results)
+        failed_products += len(pending_products) - processed_products
         
         # Print summary
         print("\n" + "=" * 50)
@@ -220,13 +420,38 @@ class DescriptionEmbeddingProcessor:
         print("=" * 50)
         print(f"Total products found: {total_products}")
         print(f"Products processed: {processed_products}")
-        print(f"Products skipped (already had embeddings): {skipped_products}")
+        print(f"Products re-embedded (text or model changed): {changed_products}")
+        print(f"Products skipped (embedding up to date): {skipped_products}")
         print(f"Products failed: {failed_products}")
-        print("Final save completed!")
+        print(f"Throughput: {self.stats.summary()}")
+        print(f"Embeddings stored in {self.catalog.store('description_embedding').matrix_path}")
 
 
 def main() -> None:
     """Main function to run the description embedding processor."""
+    parser = argparse.ArgumentParser(description="Generate description embeddings for products")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Products per embeddings request, at most {MAX_BATCH_INPUTS} (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--max-batch-tokens", type=int, default=DEFAULT_MAX_BATCH_TOKENS,
+                        help=f"Estimated tokens per embeddings request (default: {DEFAULT_MAX_BATCH_TOKENS})")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"Retries with exponential backoff for a failed request (default: {DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Embedding requests kept in flight by an asyncio worker pool (default: 1, sequential)")
+    parser.add_argument("--tokens-per-minute", type=int, default=0,
+                        help="Token quota for the worker pool to stay under (default: 0, no limit)")
+    parser.add_argument("--requests-per-minute", type=int, default=0,
+                        help="Request quota for the worker pool to stay under (default: 0, no limit)")
+    parser.add_argument("--max-throttle-wait", type=float, default=DEFAULT_MAX_THROTTLE_WAIT_SECONDS,
+                        help="Seconds a batch may wait on 429 responses in total before it fails "
+                             f"(default: {DEFAULT_MAX_THROTTLE_WAIT_SECONDS:.0f})")
+    args = parser.parse_args()
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not 1 <= args.batch_size <= MAX_BATCH_INPUTS:
+        parser.error(f"--batch-size must be between 1 and {MAX_BATCH_INPUTS}")
+    
     # Get the directory of this script
     script_dir = Path(__file__).parent
     
@@ -242,7 +467,12 @@ def main() -> None:
     
     try:
         # Create processor and run
-        processor = DescriptionEmbeddingProcessor(str(script_dir))
+        processor = DescriptionEmbeddingProcessor(str(script_dir), batch_size=args.batch_size,
+                                                  max_batch_tokens=args.max_batch_tokens,
+                                                  max_retries=args.max_retries, workers=args.workers,
+                                                  tokens_per_minute=args.tokens_per_minute,
+                                                  requests_per_minute=args.requests_per_minute,
+                                                  max_throttle_wait=args.max_throttle_wait)
         processor.process_all_products()
         
     except KeyboardInterrupt:
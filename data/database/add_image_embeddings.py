@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 """
 Script to add image embeddings to products in product_data.json file.
-This script is restartable - it will skip products that already have embeddings.
+Embeddings are appended to the sidecar image embedding store (see product_catalog.py).
+Images are decoded and preprocessed in DataLoader worker processes while CLIP embeds the
+previous batch, and each batch is embedded in one forward pass and appended in one write.
+With --backend onnx the image encoder runs as an int8-quantized ONNX Runtime model (exported
+and cached on first use, see clip_onnx.py); --parity-check N compares it against torch.
+This script is restartable and incremental - it skips products whose stored embedding was
+computed from the same image file (by content hash) with the same model.
 """
 
+import argparse
 import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 try:
     import torch
     from PIL import Image
+    from torch.utils.data import DataLoader, Dataset
     from transformers import CLIPModel, CLIPProcessor
 except ImportError as e:
     print(f"Error importing required packages: {e}")
@@ -19,16 +31,68 @@ except ImportError as e:
     print("pip install -r requirements_embeddings.txt")
     sys.exit(1)
 
+from product_catalog import EmbeddingSource, ProductCatalog, content_hash
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+BACKENDS = ("torch", "onnx")
+DEFAULT_ONNX_MODEL_PATH = Path(__file__).parent / "models" / "clip-vit-base-patch32-image-int8.onnx"
+# Minimum cosine similarity between torch and ONNX embeddings of the same image
+DEFAULT_PARITY_THRESHOLD = 0.99
+
+
+class ProductImageDataset(Dataset):
+    """Product images decoded and preprocessed for CLIP, one item per image path."""
+    
+    def __init__(self, image_paths: List[Path], image_processor: Any) -> None:
+        self.image_paths = image_paths
+        self.image_processor = image_processor
+    
+    def __len__(self) -> int:
+        return len(self.image_paths)
+    
+    def __getitem__(self, index: int) -> Tuple[int, Optional["torch.Tensor"]]:
+        try:
+            # Each image is opened once and converted straight to CLIP pixel values
+            with Image.open(self.image_paths[index]) as img:
+                pixel_values = self.image_processor(images=img.convert('RGB'), return_tensors="pt")['pixel_values']
+            return index, pixel_values[0]
+        except Exception as e:
+            print(f"Warning: Cannot open image {self.image_paths[index]}: {e}")
+            return index, None
+
+
+def collate_images(items: List[Tuple[int, Optional["torch.Tensor"]]]) -> Tuple[List[int], Optional["torch.Tensor"]]:
+    """Stack the decoded images of a batch, dropping the ones that failed to decode."""
+    decoded = [(index, pixel_values) for index, pixel_values in items if pixel_values is not None]
+    if not decoded:
+        return [], None
+    return [index for index, _ in decoded], torch.stack([pixel_values for _, pixel_values in decoded])
+
 
 class ImageEmbeddingProcessor:
-    def __init__(self, data_generator_path: str):
+    def __init__(self, data_generator_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = DEFAULT_DECODE_WORKERS, threads: Optional[int] = None,
+                 backend: str = "torch", onnx_model_path: Path = DEFAULT_ONNX_MODEL_PATH):
         """
         Initialize the image embedding processor.
         
         Args:
             data_generator_path: Path to the data-generator directory
+            batch_size: Images per CLIP forward pass
+            workers: Worker processes decoding and preprocessing images (0 decodes on the main thread)
+            threads: Intra-op threads for CLIP inference (default: PyTorch's choice)
+            backend: "torch" for the HuggingFace model, "onnx" for the int8 ONNX Runtime model
+            onnx_model_path: Cached ONNX model, exported from the torch model if missing
         """
         self.data_generator_path = Path(data_generator_path)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.threads = threads
+        self.backend = backend
+        if threads:
+            torch.set_num_threads(threads)
         self.json_file_path = self.data_generator_path / "product_data.json"
         # self.images_dir = self.data_generator_path / "images"
         self.images_dir = Path("/workspace/images")
@@ -37,14 +101,21 @@ class ImageEmbeddingProcessor:
         print("Initializing CLIP embedding model...")
         try:
             # Load CLIP model and processor from HuggingFace
-            model_name = "openai/clip-vit-base-patch32"
-            self.processor = CLIPProcessor.from_pretrained(model_name)
-            self.model = CLIPModel.from_pretrained(model_name)
+            self.model_name = "openai/clip-vit-base-patch32"
+            self.processor = CLIPProcessor.from_pretrained(self.model_name)
+            self.model = None
+            self.onnx_encoder = None
             
             # Set device (use CPU to avoid GPU complexity for now)
             self.device = "cpu"  # torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            # self.model = self.model.to(self.device)
-            self.model.eval()
+            
+            if backend == "onnx":
+                self.onnx_encoder = self._load_onnx_encoder(onnx_model_path)
+                # Quantized embeddings differ slightly, so they are recorded as a different model
+                self.embedding_model = f"{self.model_name}+onnx-int8"
+            else:
+                self._load_torch_model()
+                self.embedding_model = self.model_name
             
         except Exception as e:
             print(f"Failed to initialize CLIP model: {e}")
@@ -54,11 +125,57 @@ class ImageEmbeddingProcessor:
         # Load the product data
         self.load_product_data()
     
+    def _load_torch_model(self) -> Any:
+        """Load the full-precision HuggingFace CLIP model on first use."""
+        if self.model is None:
+            self.model = CLIPModel.from_pretrained(self.model_name)
+            # self.model = self.model.to(self.device)
+            self.model.eval()
+        return self.model
+    
+    def _load_onnx_encoder(self, onnx_model_path: Path) -> Any:
+        """Load the int8 ONNX image encoder, exporting it from the torch model if it is not cached yet."""
+        try:
+            from clip_onnx import OnnxImageEncoder, export_quantized_image_encoder
+        except ImportError as e:
+            print(f"Error importing ONNX backend packages: {e}")
+            print("Please install the required packages:")
+            print("pip install onnx onnxruntime")
+            sys.exit(1)
+        
+        if not onnx_model_path.exists():
+            print(f"Exporting CLIP image encoder to {onnx_model_path} with int8 quantization...")
+            export_quantized_image_encoder(self._load_torch_model(), onnx_model_path)
+        return OnnxImageEncoder(onnx_model_path, self.threads)
+    
+    def encode_images(self, pixel_values: "torch.Tensor") -> np.ndarray:
+        """Embed a batch of preprocessed images with the selected backend."""
+        if self.onnx_encoder is not None:
+            return self.onnx_encoder(pixel_values.numpy())
+        return self.encode_images_torch(pixel_values)
+    
+    def encode_images_torch(self, pixel_values: "torch.Tensor") -> np.ndarray:
+        """Embed a batch of preprocessed images with the HuggingFace CLIP model."""
+        model = self._load_torch_model()
+        with torch.inference_mode():
+            return model.get_image_features(pixel_values=pixel_values).numpy()
+    
+    def image_loader(self, image_paths: List[Path]) -> DataLoader:
+        """Batches of (indices, pixel values) for image paths, decoded in worker processes."""
+        return DataLoader(
+            ProductImageDataset(image_paths, self.processor.image_processor),
+            batch_size=self.batch_size,
+            num_workers=self.workers,
+            collate_fn=collate_images,
+            # Keep the next batches decoding while the current one runs through CLIP
+            prefetch_factor=2 if self.workers else None,
+        )
+    
     def load_product_data(self):
-        """Load the product data from JSON file."""
+        """Load the product data from JSON file (embeddings are read lazily from the sidecar store)."""
         try:
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                self.product_data = json.load(f)
+            self.catalog = ProductCatalog.load(self.json_file_path)
+            self.product_data = self.catalog.data
             print(f"Loaded product data from {self.json_file_path}")
         except FileNotFoundError:
             print(f"Error: Could not find {self.json_file_path}")
@@ -67,159 +184,108 @@ class ImageEmbeddingProcessor:
             print(f"Error parsing JSON file: {e}")
             sys.exit(1)
     
-    def save_product_data(self):
-        """Save the product data back to JSON file with single-line embeddings."""
-        try:
-            # First, save with regular formatting
-            with open(self.json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.product_data, f, indent=2, ensure_ascii=False)
-            
-            # Then format the embeddings to be on single lines
-            self._format_embeddings_single_line()
-            
-            print(f"Saved updated product data to {self.json_file_path}")
-        except Exception as e:
-            print(f"Error saving JSON file: {e}")
-            sys.exit(1)
+    def resolve_image_path(self, image_path: str) -> Path:
+        """Full path of a product image within the images directory."""
+        # Remove "images/" prefix if it exists since we're already in the images directory
+        if image_path.startswith("images/"):
+            image_path = image_path[7:]
+        return self.images_dir / image_path
     
-    def _format_embeddings_single_line(self):
-        """Format all image_embedding arrays to be on single lines."""
-        import re
-        
-        try:
-            # Read the file content
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Pattern to match image_embedding arrays that span multiple lines
-            pattern = r'"image_embedding":\s*\[\s*((?:[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?,?\s*)*)\s*\]'
-            
-            def format_embedding_array(match):
-                """Format a single embedding array to be on one line."""
-                # Extract the numbers from the match
-                numbers_str = match.group(1)
-                
-                # Remove all whitespace and split by commas
-                numbers = [num.strip() for num in numbers_str.split(',') if num.strip()]
-                
-                # Join the numbers with commas and single spaces
-                formatted_numbers = ', '.join(numbers)
-                
-                # Return the formatted array
-                return f'"image_embedding": [{formatted_numbers}]'
-            
-            # Apply the formatting
-            formatted_content = re.sub(pattern, format_embedding_array, content, flags=re.DOTALL)
-            
-            # Write the formatted content back to the file
-            with open(self.json_file_path, 'w', encoding='utf-8') as f:
-                f.write(formatted_content)
-                
-        except Exception as e:
-            print(f"Warning: Failed to format embeddings to single line: {e}")
-            # Continue anyway since the file was saved successfully
+    def embedding_source(self, product: Dict[str, Any]) -> Optional[EmbeddingSource]:
+        """Hash of a product's image file and the model that embeds it, or None if the file is missing."""
+        full_image_path = self.resolve_image_path(product['image_path'])
+        if not full_image_path.exists():
+            return None
+        return EmbeddingSource(content_hash(full_image_path.read_bytes()), self.embedding_model)
     
-    def get_image_embedding(self, image_path: str) -> Optional[List[float]]:
+    def embed_products(self, pending: List[Tuple[Dict[str, Any], EmbeddingSource, Path]]) -> int:
         """
-        Generate embedding for a single image.
+        Embed product images in batches and append each batch to the image embedding store.
         
         Args:
-            image_path: Path to the image file
+            pending: Tuples of (product, source recorded with its embedding, full image path)
             
         Returns:
-            List of float values representing the embedding
+            Number of products embedded
         """
-        try:
-            # Create full path to image
-            # Remove "images/" prefix if it exists since we're already in the images directory
-            if image_path.startswith("images/"):
-                image_filename = image_path[7:]  # Remove "images/" prefix
-            else:
-                image_filename = image_path
-            
-            full_image_path = self.images_dir / image_filename
-            
-            if not full_image_path.exists():
-                print(f"Warning: Image file not found: {full_image_path}")
-                print(f"  Original path: {image_path}")
-                print(f"  Looking for: {image_filename}")
-                return None
-            
-            # Verify the image can be opened
-            try:
-                with Image.open(full_image_path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-            except Exception as img_error:
-                print(f"Warning: Cannot open image {full_image_path}: {img_error}")
-                return None
-            
-            # Generate embedding using CLIP model
-            with Image.open(full_image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Process the image
-                inputs = self.processor(images=img, return_tensors="pt")
-                
-                # Get image embeddings  
-                with torch.no_grad():
-                    image_features = self.model.get_image_features(pixel_values=inputs['pixel_values'])
-                
-                # Convert to numpy and then to list
-                embedding = image_features.squeeze().cpu().numpy()
-                embedding_list = embedding.tolist()
+        loader = self.image_loader([image_path for _, _, image_path in pending])
+        
+        embedded = 0
+        start_time = time.perf_counter()
+        for batch_number, (indices, pixel_values) in enumerate(loader, 1):
+            if pixel_values is None:
+                continue
             
-            return embedding_list
+            embeddings = self.encode_images(pixel_values)
+            results = [(pending[index][0], embedding) for index, embedding in zip(indices, embeddings)]
+            # Checkpoint once per batch: the whole batch is appended to the store in one write
+            self.catalog.set_embeddings('image_embedding', results, [pending[index][1] for index in indices])
+            embedded += len(results)
             
-        except Exception as e:
-            print(f"Error generating embedding for {image_path}: {e}")
-            return None
+            rate = embedded / max(time.perf_counter() - start_time, 1e-9)
+            print(f"  Batch {batch_number}: {len(results)} embedded → Saved progress "
+                  f"({embedded}/{len(pending)} embeddings added, {rate:.1f} images/s)")
+        return embedded
     
-    def process_product(self, product: Dict[str, Any]) -> bool:
+    def run_parity_check(self, sample_size: int, threshold: float = DEFAULT_PARITY_THRESHOLD) -> bool:
         """
-        Process a single product to add image embedding.
+        Compare ONNX and torch embeddings for a sample of product images.
         
         Args:
-            product: Product dictionary
+            sample_size: Number of product images to embed with both backends
+            threshold: Minimum acceptable cosine similarity for every image
             
         Returns:
-            True if embedding was added, False if skipped or failed
+            True if every sampled image meets the threshold
         """
-        # Check if product already has a valid embedding (non-empty)
-        if product.get('image_embedding'):
-            print(f"Skipping {product.get('name', 'Unknown')} - already has embedding")
+        if self.onnx_encoder is None:
+            print("Error: the parity check compares the onnx backend against torch; run it with --backend onnx")
             return False
         
-        # Check if product has image_path
-        if 'image_path' not in product:
-            print(f"Warning: {product.get('name', 'Unknown')} has no image_path")
-            return False
+        from clip_onnx import cosine_similarities
         
-        image_path = product['image_path']
-        product_name = product.get('name', 'Unknown')
+        image_paths = []
+        for _category_name, _product_type, product in self.catalog.products():
+            if 'image_path' in product and self.resolve_image_path(product['image_path']).exists():
+                image_paths.append(self.resolve_image_path(product['image_path']))
+            if len(image_paths) >= sample_size:
+                break
         
-        print(f"Processing: {product_name}")
-        print(f"Image path: {image_path}")
+        print(f"Comparing ONNX and torch embeddings for {len(image_paths)} images...")
+        similarities = []
+        onnx_seconds = 0.0
+        torch_seconds = 0.0
+        for _indices, pixel_values in self.image_loader(image_paths):
+            if pixel_values is None:
+                continue
+            start_time = time.perf_counter()
+            onnx_embeddings = self.encode_images(pixel_values)
+            onnx_seconds += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            torch_embeddings = self.encode_images_torch(pixel_values)
+            torch_seconds += time.perf_counter() - start_time
+            similarities.append(cosine_similarities(torch_embeddings, onnx_embeddings))
         
-        # Generate embedding
-        embedding = self.get_image_embedding(image_path)
+        if not similarities:
+            print("Error: no images could be embedded for the parity check")
+            return False
         
-        if embedding is not None:
-            product['image_embedding'] = embedding
-            print(f"✓ Added embedding for {product_name} (dimension: {len(embedding)})")
-            return True
-        print(f"✗ Failed to generate embedding for {product_name}")
-        return False
+        similarities = np.concatenate(similarities)
+        passed = bool(similarities.min() >= threshold)
+        print(f"  Cosine similarity: min {similarities.min():.4f}, mean {similarities.mean():.4f} "
+              f"(threshold {threshold})")
+        print(f"  Inference time: onnx {onnx_seconds:.2f}s, torch {torch_seconds:.2f}s")
+        print("✓ Parity check passed" if passed else "✗ Parity check failed")
+        return passed
     
     def process_all_products(self):
         """Process all products in the JSON file to add image embeddings."""
         total_products = 0
         processed_products = 0
         skipped_products = 0
+        changed_products = 0
         failed_products = 0
+        pending_products = []
         
         print("Starting image embedding processing...")
         print("=" * 50)
@@ -241,22 +307,40 @@ class ImageEmbeddingProcessor:
                     
                     total_products += 1
                     
-                    # Check if already has a valid embedding (non-empty)
-                    if product.get('image_embedding'):
-                        skipped_products += 1
+                    # Embeddings are stored by SKU
+                    if not product.get('sku'):
+                        print(f"Warning: {product.get('name', 'Unknown')} has no sku - run generate_skus.py first")
+                        failed_products += 1
                         continue
                     
-                    # Process the product
-                    success = self.process_product(product)
+                    # Check if product has image_path
+                    if 'image_path' not in product:
+                        print(f"Warning: {product.get('name', 'Unknown')} has no image_path")
+                        failed_products += 1
+                        continue
                     
-                    if success:
-                        processed_products += 1
-                        # Save after each successful embedding
-                        self.save_product_data()
-                        print(f"  → Saved progress ({processed_products} embeddings added)")
-                    else:
-                        print(f"  → Failed to process {product.get('name', 'Unknown')}")
+                    source = self.embedding_source(product)
+                    if source is None:
+                        print(f"Warning: Image file not found for {product.get('name', 'Unknown')}: "
+                              f"{self.resolve_image_path(product['image_path'])}")
                         failed_products += 1
+                        continue
+                    
+                    # Skip products whose embedding was computed from the same image with the same model
+                    if not self.catalog.needs_embedding(product, 'image_embedding', source):
+                        skipped_products += 1
+                        continue
+                    
+                    if self.catalog.has_embedding(product, 'image_embedding'):
+                        changed_products += 1
+                    pending_products.append((product, source, self.resolve_image_path(product['image_path'])))
+        
+        print(f"\n{len(pending_products)} products need embeddings ({self.backend} backend, batches of "
+              f"{self.batch_size}, {self.workers} decode workers, {self.threads or torch.get_num_threads()} "
+              f"inference threads)")
+        start_time = time.perf_counter()
+        processed_products = self.embed_products(pending_products)
+        failed_products += len(pending_products) - processed_products
         
         # Print summary
         print("\n" + "=" * 50)
@@ -264,13 +348,34 @@ class ImageEmbeddingProcessor:
         print("=" * 50)
         print(f"Total products found: {total_products}")
         print(f"Products processed: {processed_products}")
-        print(f"Products skipped (already had embeddings): {skipped_products}")
+        print(f"Products re-embedded (image or model changed): {changed_products}")
+        print(f"Products skipped (embedding up to date): {skipped_products}")
         print(f"Products failed: {failed_products}")
-        print("Final save completed!")
+        print(f"Elapsed time: {time.perf_counter() - start_time:.1f}s")
+        print(f"Embeddings stored in {self.catalog.store('image_embedding').matrix_path}")
 
 
 def main():
     """Main function to run the image embedding processor."""
+    parser = argparse.ArgumentParser(description="Generate CLIP image embeddings for products")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Images per CLIP forward pass (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_DECODE_WORKERS,
+                        help=f"Processes decoding and preprocessing images, 0 for the main thread "
+                             f"(default: {DEFAULT_DECODE_WORKERS})")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Intra-op threads for CLIP inference (default: PyTorch's choice)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="torch: full-precision HuggingFace model; onnx: int8-quantized ONNX Runtime model "
+                             "(default: torch)")
+    parser.add_argument("--onnx-model", type=Path, default=DEFAULT_ONNX_MODEL_PATH,
+                        help="Cached ONNX model, exported on first use (default: models/ next to this script)")
+    parser.add_argument("--parity-check", type=int, metavar="N",
+                        help="Compare onnx and torch embeddings for N images and exit instead of embedding")
+    parser.add_argument("--parity-threshold", type=float, default=DEFAULT_PARITY_THRESHOLD,
+                        help=f"Minimum cosine similarity for the parity check (default: {DEFAULT_PARITY_THRESHOLD})")
+    args = parser.parse_args()
+    
     # Get the directory of this script (should be in data-generator folder)
     script_dir = Path(__file__).parent
     
@@ -291,7 +396,11 @@ def main():
     
     try:
         # Create processor and run
-        processor = ImageEmbeddingProcessor(str(script_dir))
+        processor = ImageEmbeddingProcessor(str(script_dir), batch_size=args.batch_size,
+                                            workers=args.workers, threads=args.threads,
+                                            backend=args.backend, onnx_model_path=args.onnx_model)
+        if args.parity_check:
+            sys.exit(0 if processor.run_parity_check(args.parity_check, args.parity_threshold) else 1)
         processor.process_all_products()
         
     except KeyboardInterrupt:
@@ -0,0 +1,84 @@
+"""
+ONNX Runtime backend for CLIP image embeddings.
+
+The CLIP vision tower and its projection are exported to ONNX once, quantized with dynamic
+int8 weights and cached on disk. Later runs only need the small CLIP preprocessing config
+and the cached model, so startup skips loading the full-precision HuggingFace weights and
+per-batch inference runs on ONNX Runtime's int8 CPU kernels.
+
+Quantized embeddings are close to, but not identical to, the torch ones; use
+cosine_similarities() (add_image_embeddings.py --parity-check) to compare the two.
+
+REQUIREMENTS:
+    pip install onnx onnxruntime
+
+USAGE:
+    export_quantized_image_encoder(clip_model, Path("models/clip-vision-int8.onnx"))
+    encoder = OnnxImageEncoder(Path("models/clip-vision-int8.onnx"), threads=4)
+    embeddings = encoder(pixel_values)  # float32 (batch, 3, 224, 224) -> (batch, 512)
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+ONNX_OPSET = 17
+
+
+class _ImageFeatures(torch.nn.Module):
+    """Vision tower plus projection, the part of CLIP that get_image_features runs."""
+
+    def __init__(self, model: Any) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
+def export_quantized_image_encoder(model: Any, output_path: Path) -> None:
+    """Export a CLIPModel's image encoder to ONNX with dynamic int8 weight quantization"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_path.with_name(f"{output_path.stem}.fp32.onnx")
+    image_size = model.config.vision_config.image_size
+
+    torch.onnx.export(
+        _ImageFeatures(model).eval(),
+        (torch.zeros(1, 3, image_size, image_size),),
+        str(fp32_path),
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        # Any batch size can be run through the exported graph
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=ONNX_OPSET,
+    )
+    try:
+        quantize_dynamic(str(fp32_path), str(output_path), weight_type=QuantType.QInt8)
+    finally:
+        fp32_path.unlink(missing_ok=True)
+
+
+class OnnxImageEncoder:
+    """Runs an exported CLIP image encoder with ONNX Runtime on CPU."""
+
+    def __init__(self, model_path: Path, threads: Optional[int] = None) -> None:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, pixel_values: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.asarray(pixel_values, dtype=np.float32)})[0]
+
+
+def cosine_similarities(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding matrices of the same shape"""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
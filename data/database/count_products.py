@@ -1,10 +1,11 @@
-import json
 import os
 
+from product_catalog import ProductCatalog
+
 os.chdir('/workspace/data/database')
 
-with open('product_data.json', 'r') as f:
-    data = json.load(f)
+catalog = ProductCatalog.load('product_data.json')
+data = catalog.data
 
 print('=== PRODUCT COUNT ANALYSIS ===')
 total_products = 0
@@ -25,7 +26,7 @@ for category_name, category_data in data['main_categories'].items():
                 # Count embeddings
                 embeddings_in_type = 0
                 for product in value:
-                    if isinstance(product, dict) and 'image_embedding' in product and len(product['image_embedding']) > 0:
+                    if isinstance(product, dict) and catalog.has_embedding(product, 'image_embedding'):
                         embeddings_in_type += 1
                 
                 category_embeddings += embeddings_in_type
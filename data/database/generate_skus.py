@@ -22,6 +22,8 @@ from datetime import datetime
 from collections import defaultdict
 from typing import Dict
 
+from product_catalog import ProductCatalog
+
 
 def setup_logging(verbose: bool = False) -> None:
     """Setup logging configuration"""
@@ -264,10 +266,9 @@ def print_assignment_report(results: Dict, dry_run: bool = False) -> None:
 
 
 def load_product_data(file_path: str) -> Dict:
-    """Load product data from JSON file"""
+    """Load product data from JSON file (embeddings stay in their sidecar stores)"""
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return ProductCatalog.load(file_path).data
     except FileNotFoundError:
         logging.error(f"product_data.json not found at {file_path}")
         raise
@@ -6,6 +6,7 @@ and vector embeddings support for PostgreSQL with pgvector extension.
 
 DATA FILE STRUCTURE:
 - product_data.json: Contains all product information (main_categories with products)
+- product_data.<field>.f32/.skus: Image and description embeddings keyed by SKU (see product_catalog.py)
 - reference_data.json: Contains store configurations (weights, year weights)
 
 POSTGRESQL CONNECTION:
@@ -26,6 +27,16 @@ USAGE:
     python generate_zava_postgres.py --show-stats        # Show database statistics
     python generate_zava_postgres.py --embeddings-only   # Populate embeddings only
     python generate_zava_postgres.py --verify-embeddings # Verify embeddings table
+    python generate_zava_postgres.py --benchmark-orders 10000  # Time order generation (no writes)
+    python generate_zava_postgres.py --loader copy       # Bulk load with binary COPY (faster)
+    python generate_zava_postgres.py --loader copy --unlogged  # COPY into UNLOGGED tables, then SET LOGGED
+    python generate_zava_postgres.py --generator numpy --seed 42  # Vectorized, reproducible order generation
+    python generate_zava_postgres.py --loader copy --workers 8 --seed 42  # Parallel sharded order generation
+    python generate_zava_postgres.py --scale-factor 100 --loader copy --unlogged --workers 16  # ~100M order items
+    python generate_zava_postgres.py --stages inventory,orders     # Re-run only some pipeline stages
+    python generate_zava_postgres.py --resume            # Run stages without a completed checkpoint
+    python generate_zava_postgres.py --show-checkpoints  # Show per-stage checkpoint status
+    python generate_zava_postgres.py --verify-seasonal --verify-sample 1  # Verify a 1% sample of orders
     python generate_zava_postgres.py --help              # Show all options
 """
 
@@ -36,13 +47,23 @@ import logging
 import os
 import random
 import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from multiprocessing import get_context
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import asyncpg
+import numpy as np
 from dotenv import load_dotenv
 from faker import Faker
 
+from pgvector_codec import register_vector_codec
+from product_catalog import ProductCatalog
+from vectorized_orders import OrderShard, VectorizedOrderGenerator
+
 # Load environment variables
 script_dir = os.path.dirname(os.path.abspath(__file__))
 # Try to load .env from script directory first, then parent directories
@@ -74,6 +95,27 @@ POSTGRES_CONFIG = {
 
 SCHEMA_NAME = 'retail'
 
+# Years covered by generated orders
+ORDER_YEARS = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
+
+# TPC-style scale factors: customers, copies of each physical store and years of order history.
+# Each customer averages about 8 order items, so SF1 is ~1M order items and SF100 ~100M.
+SCALE_FACTORS = {
+    1: {'customers': 120_000, 'store_copies': 1, 'years': 7},
+    10: {'customers': 1_200_000, 'store_copies': 2, 'years': 10},
+    100: {'customers': 12_000_000, 'store_copies': 4, 'years': 15},
+}
+
+# Customers per independently seeded shard for the numpy generator
+DEFAULT_SHARD_CUSTOMERS = 10000
+
+# Column layouts for the bulk-loaded order tables
+ORDER_COLUMNS = ["customer_id", "store_id", "order_date"]
+ORDER_ITEM_COLUMNS = [
+    "order_id", "store_id", "product_id", "quantity", "unit_price",
+    "discount_percent", "discount_amount", "total_amount",
+]
+
 # Super Manager UUID - has access to all rows regardless of RLS policies
 SUPER_MANAGER_UUID = '00000000-0000-0000-0000-000000000000'
 
@@ -88,19 +130,18 @@ def load_reference_data():
         logging.error(f"Failed to load reference data: {e}")
         raise
 
-def load_product_data():
-    """Load product data from JSON file"""
+def load_product_data() -> ProductCatalog:
+    """Load the product catalog; embeddings are decoded from the sidecar stores on demand"""
     try:
-        json_path = os.path.join(os.path.dirname(__file__), 'product_data.json')
-        with open(json_path, 'r') as f:
-            return json.load(f)
+        return ProductCatalog.load(os.path.join(os.path.dirname(__file__), 'product_data.json'))
     except Exception as e:
         logging.error(f"Failed to load product data: {e}")
         raise
 
 # Load the reference data
 reference_data = load_reference_data()
-product_data = load_product_data()
+product_catalog = load_product_data()
+product_data = product_catalog.data
 
 # Get reference data from loaded JSON
 main_categories = product_data['main_categories']
@@ -137,8 +178,16 @@ async def create_connection():
         logging.error(f"Failed to connect to PostgreSQL: {e}")
         raise
 
-async def create_database_schema(conn):
-    """Create database schema, tables and indexes"""
+async def create_database_schema(conn, deferred: bool = False, unlogged: bool = False):
+    """Create database schema, tables and indexes
+
+    Args:
+        deferred: Only create tables; indexes and RLS policies are created later with
+            create_performance_indexes() and create_rls_policies() once bulk data is loaded
+        unlogged: Create the bulk tables (customers, inventory, orders, order_items) as UNLOGGED
+            to skip WAL during loading; switch them back with set_bulk_tables_logged()
+    """
+    bulk_table = "UNLOGGED TABLE" if unlogged else "TABLE"
     try:
         # Create schema if it doesn't exist
         await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA_NAME}")
@@ -163,7 +212,7 @@ async def create_database_schema(conn):
         
         # Create customers table
         await conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.customers (
+            CREATE {bulk_table} IF NOT EXISTS {SCHEMA_NAME}.customers (
                 customer_id SERIAL PRIMARY KEY,
                 first_name TEXT NOT NULL,
                 last_name TEXT NOT NULL,
@@ -212,7 +261,7 @@ async def create_database_schema(conn):
         
         # Create inventory table
         await conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.inventory (
+            CREATE {bulk_table} IF NOT EXISTS {SCHEMA_NAME}.inventory (
                 store_id INTEGER NOT NULL,
                 product_id INTEGER NOT NULL,
                 stock_level INTEGER NOT NULL,
@@ -224,7 +273,7 @@ async def create_database_schema(conn):
         
         # Create orders table (header only)
         await conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.orders (
+            CREATE {bulk_table} IF NOT EXISTS {SCHEMA_NAME}.orders (
                 order_id SERIAL PRIMARY KEY,
                 customer_id INTEGER NOT NULL,
                 store_id INTEGER NOT NULL,
@@ -236,7 +285,7 @@ async def create_database_schema(conn):
         
         # Create order_items table (line items)
         await conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {SCHEMA_NAME}.order_items (
+            CREATE {bulk_table} IF NOT EXISTS {SCHEMA_NAME}.order_items (
                 order_item_id SERIAL PRIMARY KEY,
                 order_id INTEGER NOT NULL,
                 store_id INTEGER NOT NULL,
@@ -273,6 +322,18 @@ async def create_database_schema(conn):
             )
         """)
         
+        if not deferred:
+            await create_performance_indexes(conn)
+            await create_rls_policies(conn)
+        
+        logging.info("Database schema created successfully!")
+    except Exception as e:
+        logging.error(f"Error creating database schema: {e}")
+        raise
+
+async def create_performance_indexes(conn):
+    """Create performance and vector similarity indexes"""
+    try:
         # Create optimized performance indexes
         logging.info("Creating performance indexes...")
         
@@ -328,6 +389,9 @@ async def create_database_schema(conn):
         except Exception as e:
             logging.warning(f"Could not create product description embeddings vector index: {e}")
         
+        # Full-text index for the lexical half of hybrid product search (customer_sales_postgres.search_products_hybrid)
+        await conn.execute(f"CREATE INDEX IF NOT EXISTS idx_products_fulltext ON {SCHEMA_NAME}.products USING gin (to_tsvector('english', product_name || ' ' || product_description))")
+        
         # Covering indexes for aggregation queries
         await conn.execute(f"CREATE INDEX IF NOT EXISTS idx_order_items_covering ON {SCHEMA_NAME}.order_items(order_id, store_id, product_id, total_amount, quantity)")
         await conn.execute(f"CREATE INDEX IF NOT EXISTS idx_products_covering ON {SCHEMA_NAME}.products(category_id, type_id, product_id, sku, cost, base_price)")
@@ -338,7 +402,13 @@ async def create_database_schema(conn):
         await conn.execute(f"CREATE INDEX IF NOT EXISTS idx_customers_primary_store ON {SCHEMA_NAME}.customers(primary_store_id)")
         
         logging.info("Performance indexes created successfully!")
-        
+    except Exception as e:
+        logging.error(f"Error creating performance indexes: {e}")
+        raise
+
+async def create_rls_policies(conn):
+    """Enable Row Level Security, create store manager policies and grant permissions"""
+    try:
         # Enable Row Level Security (RLS) and create policies
         # Note: All RLS policies include access for SUPER_MANAGER_UUID which bypasses all restrictions
         logging.info("Setting up Row Level Security policies...")
@@ -493,10 +563,8 @@ async def create_database_schema(conn):
         
         # Grant permissions to store_manager role
         await setup_store_manager_permissions(conn)
-        
-        logging.info("Database schema created successfully!")
     except Exception as e:
-        logging.error(f"Error creating database schema: {e}")
+        logging.error(f"Error creating Row Level Security policies: {e}")
         raise
 
 async def setup_store_manager_permissions(conn):
@@ -546,7 +614,63 @@ async def batch_insert(conn, query: str, data: List[Tuple], batch_size: int = 10
         batch = data[i:i + batch_size]
         await conn.executemany(query, batch)
 
-async def insert_customers(conn, num_customers: int = 100000):
+async def bulk_load(conn, table: str, columns: List[str], data: Iterable[Tuple], loader: str = "insert") -> int:
+    """Load rows into a table using batched INSERTs or binary COPY
+
+    Rows are consumed lazily, so a generator can be streamed into the table without
+    materializing it.
+
+    Args:
+        table: Table name within SCHEMA_NAME
+        columns: Column names matching the tuple layout of data
+        data: Rows to load (list or iterator)
+        loader: "insert" for executemany in batches, "copy" for asyncpg copy_records_to_table
+
+    Returns:
+        Number of rows loaded
+    """
+    if loader == "copy":
+        status = await conn.copy_records_to_table(table, records=data, columns=columns, schema_name=SCHEMA_NAME)
+        return int(status.split()[-1])
+    
+    placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+    query = f"INSERT INTO {SCHEMA_NAME}.{table} ({', '.join(columns)}) VALUES ({placeholders})"
+    rows = iter(data)
+    loaded = 0
+    while batch := list(islice(rows, 1000)):
+        await conn.executemany(query, batch)
+        loaded += len(batch)
+    return loaded
+
+async def set_bulk_tables_logged(conn):
+    """Convert UNLOGGED bulk tables back to regular logged tables after loading"""
+    # Referenced tables must become logged before the tables that reference them
+    for table in ["customers", "inventory", "orders", "order_items"]:
+        is_unlogged = await conn.fetchval(
+            "SELECT relpersistence = 'u' FROM pg_class WHERE oid = $1::regclass", f"{SCHEMA_NAME}.{table}"
+        )
+        if is_unlogged:
+            await conn.execute(f"ALTER TABLE {SCHEMA_NAME}.{table} SET LOGGED")
+            logging.info(f"Table {SCHEMA_NAME}.{table} switched to LOGGED")
+
+def generate_customer_rows(num_customers: int, store_rows) -> Iterator[Tuple]:
+    """Yield customer rows one at a time so they can be streamed into the database"""
+    store_ids = {row['store_name']: row['store_id'] for row in store_rows}
+    
+    for i in range(1, num_customers + 1):
+        first_name = fake.first_name().replace("'", "''")  # Escape single quotes
+        last_name = fake.last_name().replace("'", "''")
+        email = f"{first_name.lower()}.{last_name.lower()}.{i}@example.com"
+        phone = generate_phone_number()
+        
+        # Assign every customer to a store based on weighted distribution
+        # Use the same weighted store choice as orders for consistency
+        # Fallback to first store if lookup fails (should not happen)
+        primary_store_id = store_ids.get(weighted_store_choice(), store_rows[0]['store_id'])
+        
+        yield (first_name, last_name, email, phone, primary_store_id)
+
+async def insert_customers(conn, num_customers: int = 100000, loader: str = "insert"):
     """Insert customer data into the database"""
     try:
         logging.info(f"Generating {num_customers:,} customers...")
@@ -558,30 +682,13 @@ async def insert_customers(conn, num_customers: int = 100000):
         if not store_ids:
             raise Exception("No stores found! Please insert stores first.")
         
-        customers_data = []
-        
-        for i in range(1, num_customers + 1):
-            first_name = fake.first_name().replace("'", "''")  # Escape single quotes
-            last_name = fake.last_name().replace("'", "''")
-            email = f"{first_name.lower()}.{last_name.lower()}.{i}@example.com"
-            phone = generate_phone_number()
-            
-            # Assign every customer to a store based on weighted distribution
-            # Use the same weighted store choice as orders for consistency
-            preferred_store_name = weighted_store_choice()
-            primary_store_id = None
-            for row in store_rows:
-                if row['store_name'] == preferred_store_name:
-                    primary_store_id = row['store_id']
-                    break
-            
-            # Fallback to first store if lookup fails (should not happen)
-            if primary_store_id is None:
-                primary_store_id = store_rows[0]['store_id']
-            
-            customers_data.append((first_name, last_name, email, phone, primary_store_id))
-        
-        await batch_insert(conn, f"INSERT INTO {SCHEMA_NAME}.customers (first_name, last_name, email, phone, primary_store_id) VALUES ($1, $2, $3, $4, $5)", customers_data)
+        await bulk_load(
+            conn,
+            "customers",
+            ["first_name", "last_name", "email", "phone", "primary_store_id"],
+            generate_customer_rows(num_customers, store_rows),
+            loader,
+        )
         
         # Log customer distribution by store
         distribution = await conn.fetch(f"""
@@ -754,13 +861,46 @@ def get_store_multipliers(store_name):
 
 def get_yearly_weight(year):
     """Get the weight for each year to create growth pattern"""
-    return reference_data['year_weights'].get(str(year), 1.0)
+    year_weights = reference_data['year_weights']
+    first_year = min(int(y) for y in year_weights)
+    if year < first_year:
+        # Extend the growth pattern backwards for scale factors with a longer history
+        return year_weights[str(first_year)] * 0.9 ** (first_year - year)
+    return year_weights.get(str(year), 1.0)
 
 def weighted_year_choice():
     """Choose a year based on growth pattern weights"""
-    years = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
-    weights = [get_yearly_weight(year) for year in years]
-    return random.choices(years, weights=weights, k=1)[0]
+    weights = [get_yearly_weight(year) for year in ORDER_YEARS]
+    return random.choices(ORDER_YEARS, weights=weights, k=1)[0]
+
+def apply_scale_factor(scale_factor: int) -> int:
+    """Scale stores and the order date range for a scale factor preset
+    
+    Physical stores are cloned with the same weights (and their own manager ID), so the
+    customer and order distributions keep their shape as the dataset grows. The order
+    history is extended backwards from the last reference year.
+    
+    Returns:
+        Number of customers for the scale factor
+    """
+    global ORDER_YEARS
+    profile = SCALE_FACTORS[scale_factor]
+    
+    last_year = ORDER_YEARS[-1]
+    ORDER_YEARS = list(range(last_year - profile['years'] + 1, last_year + 1))
+    
+    reference_stores = [(name, config) for name, config in stores.items() if "online" not in name.lower()]
+    for copy_number in range(2, profile['store_copies'] + 1):
+        for store_name, store_config in reference_stores:
+            clone_name = f"{store_name} {copy_number}"
+            stores[clone_name] = {
+                **store_config,
+                'rls_user_id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"zava-store:{clone_name}")),
+            }
+    
+    logging.info(f"Scale factor SF{scale_factor}: {profile['customers']:,} customers, {len(stores)} stores, "
+                 f"orders from {ORDER_YEARS[0]} to {ORDER_YEARS[-1]}")
+    return profile['customers']
 
 async def get_store_id_by_name(conn, store_name):
     """Get store_id for a given store name"""
@@ -798,73 +938,64 @@ def choose_product_type(main_category):
         return None
     return random.choice(product_types)
 
-def extract_products_with_embeddings(product_data: Dict) -> List[Tuple[str, str, List[float]]]:
+def extract_products_with_embeddings(catalog: ProductCatalog) -> List[Tuple[str, str, np.ndarray]]:
     """
-    Extract products with image embeddings from the JSON structure.
+    Extract products with image embeddings from the catalog.
     
     Returns:
         List of tuples: (sku, image_path, image_embedding)
     """
     products_with_embeddings = []
     
-    for category_name, category_data in product_data.get('main_categories', {}).items():
-        for product_type, products in category_data.items():
-            # Skip non-product keys like seasonal multipliers
-            if not isinstance(products, list):
-                continue
-                
-            for product in products:
-                if isinstance(product, dict):
-                    sku = product.get('sku')
-                    image_path = product.get('image_path')
-                    image_embedding = product.get('image_embedding')
-                    
-                    if sku and image_path and image_embedding:
-                        products_with_embeddings.append((sku, image_path, image_embedding))
-                    else:
-                        logging.debug(f"Skipping product with missing data: SKU={sku}")
+    for _category_name, _product_type, product in catalog.products():
+        sku = product.get('sku')
+        image_path = product.get('image_path')
+        image_embedding = catalog.embedding(product, 'image_embedding') if sku and image_path else None
+        
+        if image_embedding is not None:
+            products_with_embeddings.append((sku, image_path, image_embedding))
+        else:
+            logging.debug(f"Skipping product with missing data: SKU={sku}")
     
     logging.info(f"Found {len(products_with_embeddings)} products with embeddings")
     return products_with_embeddings
 
-async def get_product_id_by_sku(conn: asyncpg.Connection, sku: str) -> Optional[int]:
-    """Get product_id for a given SKU"""
-    try:
-        result = await conn.fetchval(
-            f"SELECT product_id FROM {SCHEMA_NAME}.products WHERE sku = $1",
-            sku
-        )
-        return result
-    except Exception as e:
-        logging.error(f"Error getting product_id for SKU {sku}: {e}")
-        return None
+async def get_product_ids_by_sku(conn: asyncpg.Connection, skus: List[str]) -> Dict[str, int]:
+    """Resolve many SKUs to product IDs with a single query"""
+    rows = await conn.fetch(f"SELECT sku, product_id FROM {SCHEMA_NAME}.products WHERE sku = ANY($1::text[])", skus)
+    return {row['sku']: row['product_id'] for row in rows}
 
-async def insert_product_embedding(
-    conn: asyncpg.Connection, 
-    product_id: int, 
-    image_path: str, 
-    image_embedding: List[float]
-) -> bool:
-    """Insert a product embedding record"""
-    try:
-        # Store just the image filename without any path prefix
-        image_url = os.path.basename(image_path)
-        
-        # Convert the embedding list to a vector string format
-        embedding_str = f"[{','.join([str(x) for x in image_embedding])}]"
-        
-        await conn.execute(
-            f"""
-            INSERT INTO {SCHEMA_NAME}.product_image_embeddings 
-            (product_id, image_url, image_embedding) 
-            VALUES ($1, $2, $3::vector)
-            """,
-            product_id, image_url, embedding_str
-        )
-        return True
-    except Exception as e:
-        logging.error(f"Error inserting embedding for product_id {product_id}: {e}")
-        return False
+async def load_product_embeddings(conn: asyncpg.Connection, table: str, columns: List[str], rows: List[Tuple]) -> Tuple[int, int, int]:
+    """Load embedding rows keyed by SKU into an embeddings table with one SKU lookup and one COPY
+    
+    Args:
+        table: Embeddings table within SCHEMA_NAME
+        columns: Columns after product_id, matching the values after the SKU in each row
+        rows: Tuples of (sku, *values)
+    
+    Returns:
+        Tuple of (inserted, skipped because the product was not found, skipped because already present)
+    """
+    await register_vector_codec(conn)
+    product_ids = await get_product_ids_by_sku(conn, [row[0] for row in rows])
+    existing = {row['product_id'] for row in await conn.fetch(f"SELECT product_id FROM {SCHEMA_NAME}.{table}")}
+    
+    records = []
+    missing_count = 0
+    existing_count = 0
+    for sku, *values in rows:
+        product_id = product_ids.get(sku)
+        if product_id is None:
+            logging.debug(f"Product not found for SKU: {sku}")
+            missing_count += 1
+        elif product_id in existing:
+            existing_count += 1
+        else:
+            existing.add(product_id)
+            records.append((product_id, *values))
+    
+    inserted_count = await bulk_load(conn, table, ["product_id", *columns], records, loader="copy")
+    return inserted_count, missing_count, existing_count
 
 async def clear_existing_embeddings(conn: asyncpg.Connection) -> None:
     """Clear all existing product image embeddings"""
@@ -875,11 +1006,11 @@ async def clear_existing_embeddings(conn: asyncpg.Connection) -> None:
         logging.error(f"Error clearing existing embeddings: {e}")
         raise
 
-async def populate_product_image_embeddings(conn: asyncpg.Connection, clear_existing: bool = False, batch_size: int = 100) -> None:
+async def populate_product_image_embeddings(conn: asyncpg.Connection, clear_existing: bool = False) -> None:
     """Populate product image embeddings from product_data.json"""
     
     logging.info("Loading product data for embeddings...")
-    products_with_embeddings = extract_products_with_embeddings(product_data)
+    products_with_embeddings = extract_products_with_embeddings(product_catalog)
     
     if not products_with_embeddings:
         logging.warning("No products with embeddings found in the data")
@@ -891,36 +1022,20 @@ async def populate_product_image_embeddings(conn: asyncpg.Connection, clear_exis
             logging.info("Clearing existing product embeddings...")
             await clear_existing_embeddings(conn)
         
-        # Process products in batches
-        inserted_count = 0
-        skipped_count = 0
-        error_count = 0
-        
-        for i in range(0, len(products_with_embeddings), batch_size):
-            batch = products_with_embeddings[i:i + batch_size]
-            
-            logging.info(f"Processing embeddings batch {i//batch_size + 1}/{(len(products_with_embeddings) + batch_size - 1)//batch_size}")
-            
-            for sku, image_path, image_embedding in batch:
-                # Get product_id for this SKU
-                product_id = await get_product_id_by_sku(conn, sku)
-                
-                if product_id is None:
-                    logging.debug(f"Product not found for SKU: {sku}")
-                    skipped_count += 1
-                    continue
-                
-                # Insert the embedding
-                if await insert_product_embedding(conn, product_id, image_path, image_embedding):
-                    inserted_count += 1
-                else:
-                    error_count += 1
+        # Store just the image filename without any path prefix
+        rows = [
+            (sku, os.path.basename(image_path), image_embedding)
+            for sku, image_path, image_embedding in products_with_embeddings
+        ]
+        inserted_count, skipped_count, existing_count = await load_product_embeddings(
+            conn, "product_image_embeddings", ["image_url", "image_embedding"], rows
+        )
         
         # Summary
         logging.info("Product embeddings population complete!")
         logging.info(f"  Inserted: {inserted_count}")
         logging.info(f"  Skipped (product not found): {skipped_count}")
-        logging.info(f"  Errors: {error_count}")
+        logging.info(f"  Skipped (already present): {existing_count}")
         logging.info(f"  Total processed: {len(products_with_embeddings)}")
         
     except Exception as e:
@@ -972,57 +1087,27 @@ async def verify_embeddings_table(conn: asyncpg.Connection) -> None:
     except Exception as e:
         logging.error(f"Error verifying embeddings table: {e}")
 
-def extract_products_with_description_embeddings(product_data: Dict) -> List[Tuple[str, List[float]]]:
+def extract_products_with_description_embeddings(catalog: ProductCatalog) -> List[Tuple[str, np.ndarray]]:
     """
-    Extract products with description embeddings from the JSON structure.
+    Extract products with description embeddings from the catalog.
     
     Returns:
         List of tuples: (sku, description_embedding)
     """
     products_with_description_embeddings = []
     
-    for _category_name, category_data in product_data.get('main_categories', {}).items():
-        for _product_type, products in category_data.items():
-            # Skip non-product keys like seasonal multipliers
-            if not isinstance(products, list):
-                continue
-                
-            for product in products:
-                if isinstance(product, dict):
-                    sku = product.get('sku')
-                    description_embedding = product.get('description_embedding')
-                    
-                    if sku and description_embedding:
-                        products_with_description_embeddings.append((sku, description_embedding))
-                    else:
-                        logging.debug(f"Skipping product with missing description embedding: SKU={sku}")
+    for _category_name, _product_type, product in catalog.products():
+        sku = product.get('sku')
+        description_embedding = catalog.embedding(product, 'description_embedding') if sku else None
+        
+        if description_embedding is not None:
+            products_with_description_embeddings.append((sku, description_embedding))
+        else:
+            logging.debug(f"Skipping product with missing description embedding: SKU={sku}")
     
     logging.info(f"Found {len(products_with_description_embeddings)} products with description embeddings")
     return products_with_description_embeddings
 
-async def insert_product_description_embedding(
-    conn: asyncpg.Connection, 
-    product_id: int, 
-    description_embedding: List[float]
-) -> bool:
-    """Insert a product description embedding record"""
-    try:
-        # Convert the embedding list to a vector string format
-        embedding_str = f"[{','.join([str(x) for x in description_embedding])}]"
-        
-        await conn.execute(
-            f"""
-            INSERT INTO {SCHEMA_NAME}.product_description_embeddings 
-            (product_id, description_embedding) 
-            VALUES ($1, $2::vector)
-            """,
-            product_id, embedding_str
-        )
-        return True
-    except Exception as e:
-        logging.error(f"Error inserting description embedding for product_id {product_id}: {e}")
-        return False
-
 async def clear_existing_description_embeddings(conn: asyncpg.Connection) -> None:
     """Clear all existing product description embeddings"""
     try:
@@ -1032,11 +1117,11 @@ async def clear_existing_description_embeddings(conn: asyncpg.Connection) -> Non
         logging.error(f"Error clearing existing description embeddings: {e}")
         raise
 
-async def populate_product_description_embeddings(conn: asyncpg.Connection, clear_existing: bool = False, batch_size: int = 100) -> None:
+async def populate_product_description_embeddings(conn: asyncpg.Connection, clear_existing: bool = False) -> None:
     """Populate product description embeddings from product_data.json"""
     
     logging.info("Loading product data for description embeddings...")
-    products_with_description_embeddings = extract_products_with_description_embeddings(product_data)
+    products_with_description_embeddings = extract_products_with_description_embeddings(product_catalog)
     
     if not products_with_description_embeddings:
         logging.warning("No products with description embeddings found in the data")
@@ -1048,36 +1133,15 @@ async def populate_product_description_embeddings(conn: asyncpg.Connection, clea
             logging.info("Clearing existing product description embeddings...")
             await clear_existing_description_embeddings(conn)
         
-        # Process products in batches
-        inserted_count = 0
-        skipped_count = 0
-        error_count = 0
-        
-        for i in range(0, len(products_with_description_embeddings), batch_size):
-            batch = products_with_description_embeddings[i:i + batch_size]
-            
-            logging.info(f"Processing description embeddings batch {i//batch_size + 1}/{(len(products_with_description_embeddings) + batch_size - 1)//batch_size}")
-            
-            for sku, description_embedding in batch:
-                # Get product_id for this SKU
-                product_id = await get_product_id_by_sku(conn, sku)
-                
-                if product_id is None:
-                    logging.debug(f"Product not found for SKU: {sku}")
-                    skipped_count += 1
-                    continue
-                
-                # Insert the description embedding
-                if await insert_product_description_embedding(conn, product_id, description_embedding):
-                    inserted_count += 1
-                else:
-                    error_count += 1
+        inserted_count, skipped_count, existing_count = await load_product_embeddings(
+            conn, "product_description_embeddings", ["description_embedding"], products_with_description_embeddings
+        )
         
         # Summary
         logging.info("Product description embeddings population complete!")
         logging.info(f"  Inserted: {inserted_count}")
         logging.info(f"  Skipped (product not found): {skipped_count}")
-        logging.info(f"  Errors: {error_count}")
+        logging.info(f"  Skipped (already present): {existing_count}")
         logging.info(f"  Total processed: {len(products_with_description_embeddings)}")
         
     except Exception as e:
@@ -1129,7 +1193,31 @@ async def verify_description_embeddings_table(conn: asyncpg.Connection) -> None:
     except Exception as e:
         logging.error(f"Error verifying description embeddings table: {e}")
 
-async def insert_inventory(conn):
+def generate_inventory_rows(stores_data, products_data, category_seasonal_avg: Dict[str, float]) -> Iterator[Tuple]:
+    """Yield one inventory row per store and product without building the full matrix"""
+    for store in stores_data:
+        store_id = store['store_id']
+        store_name = store['store_name']
+        
+        # Get store configuration for inventory distribution
+        store_config = stores.get(store_name, {})
+        base_stock_multiplier = store_config.get('customer_distribution_weight', 1.0)
+        
+        for product in products_data:
+            product_id = product['product_id']
+            category_name = product['category_name']
+            
+            # Get seasonal multiplier for this category
+            seasonal_multiplier = category_seasonal_avg.get(category_name, 1.0)
+            
+            # Generate stock level based on store weight, seasonal trends, and random variation
+            base_stock = random.randint(10, 100)
+            stock_level = int(base_stock * base_stock_multiplier * seasonal_multiplier * random.uniform(0.5, 1.5))
+            stock_level = max(1, stock_level)  # Ensure at least 1 item in stock
+            
+            yield (store_id, product_id, stock_level)
+
+async def insert_inventory(conn, loader: str = "insert"):
     """Insert inventory data distributed across stores based on customer distribution weights and seasonal trends"""
     try:
         logging.info("Generating inventory with seasonal considerations...")
@@ -1153,33 +1241,15 @@ async def insert_inventory(conn):
             else:
                 category_seasonal_avg[category_name] = 1.0  # Default multiplier
         
-        inventory_data = []
-        
-        for store in stores_data:
-            store_id = store['store_id']
-            store_name = store['store_name']
-            
-            # Get store configuration for inventory distribution
-            store_config = stores.get(store_name, {})
-            base_stock_multiplier = store_config.get('customer_distribution_weight', 1.0)
-            
-            for product in products_data:
-                product_id = product['product_id']
-                category_name = product['category_name']
-                
-                # Get seasonal multiplier for this category
-                seasonal_multiplier = category_seasonal_avg.get(category_name, 1.0)
-                
-                # Generate stock level based on store weight, seasonal trends, and random variation
-                base_stock = random.randint(10, 100)
-                stock_level = int(base_stock * base_stock_multiplier * seasonal_multiplier * random.uniform(0.5, 1.5))
-                stock_level = max(1, stock_level)  # Ensure at least 1 item in stock
-                
-                inventory_data.append((store_id, product_id, stock_level))
-        
-        await batch_insert(conn, f"INSERT INTO {SCHEMA_NAME}.inventory (store_id, product_id, stock_level) VALUES ($1, $2, $3)", inventory_data)
+        inventory_count = await bulk_load(
+            conn,
+            "inventory",
+            ["store_id", "product_id", "stock_level"],
+            generate_inventory_rows(stores_data, products_data, category_seasonal_avg),
+            loader,
+        )
         
-        logging.info(f"Successfully inserted {len(inventory_data):,} inventory records with seasonal adjustments!")
+        logging.info(f"Successfully inserted {inventory_count:,} inventory records with seasonal adjustments!")
         
     except Exception as e:
         logging.error(f"Error inserting inventory: {e}")
@@ -1204,16 +1274,13 @@ async def build_product_lookup(conn):
     logging.info(f"Built product lookup with {len(product_lookup)} products")
     return product_lookup
 
-async def insert_orders(conn, num_customers: int = 100000, product_lookup: Optional[Dict] = None):
-    """Insert order data into the database with separate orders and order_items tables"""
-    
-    # Build product lookup if not provided
-    if product_lookup is None:
-        product_lookup = await build_product_lookup(conn)
-    
-    logging.info(f"Generating orders for {num_customers:,} customers...")
-    
-    # Get available product IDs for faster random selection and build category mapping
+async def build_store_id_map(conn) -> Dict[str, int]:
+    """Build a store name to store_id mapping with a single query"""
+    rows = await conn.fetch(f"SELECT store_id, store_name FROM {SCHEMA_NAME}.stores")
+    return {row['store_name']: row['store_id'] for row in rows}
+
+async def load_order_catalog(conn) -> Tuple[Dict[int, float], Dict[str, List[int]]]:
+    """Load product prices and the category to product ID mapping used for order generation"""
     product_rows = await conn.fetch(f"""
         SELECT p.product_id, p.cost, p.base_price, c.category_name 
         FROM {SCHEMA_NAME}.products p
@@ -1221,7 +1288,6 @@ async def insert_orders(conn, num_customers: int = 100000, product_lookup: Optio
     """)
     
     product_prices = {row['product_id']: float(row['base_price']) for row in product_rows}
-    available_product_ids = list(product_prices.keys())
     
     # Build category to product ID mapping for seasonal selection
     category_products = {}
@@ -1231,7 +1297,21 @@ async def insert_orders(conn, num_customers: int = 100000, product_lookup: Optio
             category_products[category_name] = []
         category_products[category_name].append(row['product_id'])
     
-    logging.info(f"Built category mapping with {len(category_products)} categories")
+    return product_prices, category_products
+
+def generate_order_batches(
+    num_customers: int,
+    store_ids: Dict[str, int],
+    product_prices: Dict[int, float],
+    category_products: Dict[str, List[int]],
+    batch_customers: int = 1000,
+):
+    """Generate orders and order items in batches of customers without any database I/O
+    
+    Yields:
+        Tuples of (last_customer_id, total_orders, orders_data, order_items_data)
+    """
+    available_product_ids = list(product_prices.keys())
     
     total_orders = 0
     orders_data = []
@@ -1240,7 +1320,9 @@ async def insert_orders(conn, num_customers: int = 100000, product_lookup: Optio
     for customer_id in range(1, num_customers + 1):
         # Determine store preference for this customer
         preferred_store = weighted_store_choice()
-        store_id = await get_store_id_by_name(conn, preferred_store)
+        store_id = store_ids.get(preferred_store)
+        if store_id is None:
+            raise ValueError(f"No store_id found for store: {preferred_store}")
         
         # Get store multipliers
         store_multipliers = get_store_multipliers(preferred_store)
@@ -1320,433 +1402,901 @@ async def insert_orders(conn, num_customers: int = 100000, product_lookup: Optio
                     discount_percent, discount_amount, total_amount
                 ))
         
-        # Batch insert every 1000 customers to manage memory
-        if customer_id % 1000 == 0:
-            if orders_data:
-                await batch_insert(conn, f"""
-                    INSERT INTO {SCHEMA_NAME}.orders (customer_id, store_id, order_date) 
-                    VALUES ($1, $2, $3)
-                """, orders_data)
-                orders_data = []
-            
-            if order_items_data:
-                await batch_insert(conn, f"""
-                    INSERT INTO {SCHEMA_NAME}.order_items 
-                    (order_id, store_id, product_id, quantity, unit_price, discount_percent, discount_amount, total_amount) 
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                """, order_items_data)
-                order_items_data = []
+        # Hand over a batch every batch_customers customers to manage memory
+        if customer_id % batch_customers == 0 or customer_id == num_customers:
+            yield customer_id, total_orders, orders_data, order_items_data
+            orders_data = []
+            order_items_data = []
+
+def build_vectorized_order_generator(
+    store_ids: Dict[str, int],
+    product_prices: Dict[int, float],
+    category_products: Dict[str, List[int]],
+) -> VectorizedOrderGenerator:
+    """Build the NumPy order generator from the reference data and loaded catalog"""
+    return VectorizedOrderGenerator.from_catalog(
+        stores=stores,
+        store_ids=store_ids,
+        year_weights={year: get_yearly_weight(year) for year in ORDER_YEARS},
+        categories={
+            name: config.get('washington_seasonal_multipliers') for name, config in main_categories.items()
+        },
+        category_products=category_products,
+        product_prices=product_prices,
+    )
+
+async def reset_order_id_sequence(conn):
+    """Move the orders.order_id sequence past explicitly loaded order IDs"""
+    await conn.execute(f"""
+        SELECT setval(pg_get_serial_sequence('{SCHEMA_NAME}.orders', 'order_id'),
+                      COALESCE((SELECT MAX(order_id) FROM {SCHEMA_NAME}.orders), 0) + 1, false)
+    """)
+
+async def load_order_shard(
+    conn,
+    order_generator: VectorizedOrderGenerator,
+    shard: OrderShard,
+    loader: str = "copy",
+) -> Tuple[int, int]:
+    """Generate one shard of orders and stream it over the given connection
+    
+    Orders and order items are streamed into one load each; the items pass redraws the
+    orders from the shard seed, so memory stays bounded by one batch of customers.
+    
+    Returns:
+        Tuple of (orders loaded, order items loaded)
+    """
+    shard_range = (shard.first_customer_id, shard.last_customer_id, shard.first_order_id, shard.seed)
+    total_orders = await bulk_load(
+        conn, "orders", ["order_id", *ORDER_COLUMNS], order_generator.iter_orders(*shard_range), loader
+    )
+    total_items = await bulk_load(
+        conn, "order_items", ORDER_ITEM_COLUMNS, order_generator.iter_order_items(*shard_range), loader
+    )
+    return total_orders, total_items
+
+async def _load_order_shard_worker(order_generator: VectorizedOrderGenerator, shard: OrderShard) -> Tuple[int, int]:
+    conn = await asyncpg.connect(**POSTGRES_CONFIG)
+    try:
+        return await load_order_shard(conn, order_generator, shard, loader="copy")
+    finally:
+        await conn.close()
+
+def load_order_shard_worker(order_generator: VectorizedOrderGenerator, shard: OrderShard) -> Tuple[int, int]:
+    """Process pool entry point: generate one shard and COPY it over the worker's own connection"""
+    return asyncio.run(_load_order_shard_worker(order_generator, shard))
+
+async def insert_orders_parallel(conn, order_generator: VectorizedOrderGenerator, shards: List[OrderShard], workers: int):
+    """Generate and load order shards in a pool of worker processes
+    
+    Every worker opens its own connection and loads with COPY, so both generation and
+    loading scale with the number of workers.
+    """
+    logging.info(f"Loading {len(shards)} shards with {workers} worker processes...")
+    loop = asyncio.get_running_loop()
+    total_orders = 0
+    total_items = 0
+    
+    # spawn: forked children would inherit the parent's event loop and open connection
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [
+            loop.run_in_executor(pool, load_order_shard_worker, order_generator, shard)
+            for shard in shards
+        ]
+        for completed, future in enumerate(asyncio.as_completed(futures), start=1):
+            shard_orders, shard_items = await future
+            total_orders += shard_orders
+            total_items += shard_items
+            logging.info(f"Loaded {completed}/{len(shards)} shards, {total_orders:,} orders and {total_items:,} order items")
+    
+    return total_orders
+
+async def insert_orders(
+    conn,
+    num_customers: int = 100000,
+    product_lookup: Optional[Dict] = None,
+    loader: str = "insert",
+    generator: str = "python",
+    seed: Optional[int] = None,
+    workers: int = 1,
+    shard_customers: int = DEFAULT_SHARD_CUSTOMERS,
+):
+    """Insert order data into the database with separate orders and order_items tables
+    
+    Args:
+        generator: "python" for the row-by-row generator, "numpy" for the vectorized generator
+        seed: Seed for the numpy generator (the python generator uses the global random state)
+        workers: Worker processes for the numpy generator; more than one loads shards in parallel with COPY
+        shard_customers: Customers per shard for the numpy generator
+    """
+    
+    # Build product lookup if not provided
+    if product_lookup is None:
+        product_lookup = await build_product_lookup(conn)
+    
+    logging.info(f"Generating orders for {num_customers:,} customers...")
+    
+    # Resolve everything the generator needs up front so the customer loop does no database I/O
+    store_ids = await build_store_id_map(conn)
+    product_prices, category_products = await load_order_catalog(conn)
+    
+    logging.info(f"Built category mapping with {len(category_products)} categories")
+    
+    if generator == "numpy":
+        # Shards carry their own seed and order ID block, so the dataset is the same for any worker count
+        order_generator = build_vectorized_order_generator(store_ids, product_prices, category_products)
+        shards = order_generator.plan_shards(num_customers, shard_customers, seed)
+        
+        if workers > 1:
+            total_orders = await insert_orders_parallel(conn, order_generator, shards, workers)
+        else:
+            total_orders = 0
+            for shard in shards:
+                shard_orders, _ = await load_order_shard(conn, order_generator, shard, loader)
+                total_orders += shard_orders
+                logging.info(f"Processed {shard.last_customer_id:,} customers, generated {total_orders:,} orders")
+        
+        # Order IDs were loaded explicitly
+        await reset_order_id_sequence(conn)
+    else:
+        total_orders = 0
+        for customer_id, total_orders, orders_data, order_items_data in generate_order_batches(
+            num_customers, store_ids, product_prices, category_products
+        ):
+            await bulk_load(conn, "orders", ORDER_COLUMNS, orders_data, loader)
+            await bulk_load(conn, "order_items", ORDER_ITEM_COLUMNS, order_items_data, loader)
             
             if customer_id % 5000 == 0:
                 logging.info(f"Processed {customer_id:,} customers, generated {total_orders:,} orders")
     
-    # Insert remaining data
-    if orders_data:
-        await batch_insert(conn, f"""
-            INSERT INTO {SCHEMA_NAME}.orders (customer_id, store_id, order_date) 
-            VALUES ($1, $2, $3)
-        """, orders_data)
-    
-    if order_items_data:
-        await batch_insert(conn, f"""
-            INSERT INTO {SCHEMA_NAME}.order_items 
-            (order_id, store_id, product_id, quantity, unit_price, discount_percent, discount_amount, total_amount) 
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        """, order_items_data)
-    
     logging.info(f"Successfully inserted {total_orders:,} orders!")
     
     # Get order items count
     order_items_count = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.order_items")
     logging.info(f"Successfully inserted {order_items_count:,} order items!")
 
-async def verify_database_contents(conn):
-    """Verify database contents and show key statistics"""
-    
-    logging.info("\n" + "=" * 60)
-    logging.info("DATABASE VERIFICATION & STATISTICS")
-    logging.info("=" * 60)
+async def benchmark_order_generation(conn, num_customers: int = 10000):
+    """Compare order generation time with per-customer store lookups (previous behaviour) and with the in-memory map
     
-    # Store distribution verification
-    logging.info("\n🏪 STORE SALES DISTRIBUTION:")
+    Nothing is written to the database. The "before" timing is the generation time plus the
+    one store lookup query per customer that insert_orders used to issue.
+    """
+    logging.info(f"Benchmarking order generation for {num_customers:,} customers...")
+    
+    store_ids = await build_store_id_map(conn)
+    product_prices, category_products = await load_order_catalog(conn)
+    
+    # Before: one round-trip per customer to resolve the preferred store
+    start = time.perf_counter()
+    for _ in range(num_customers):
+        await get_store_id_by_name(conn, weighted_store_choice())
+    lookup_seconds = time.perf_counter() - start
+    
+    # After: the generator resolves stores from the map built once above
+    start = time.perf_counter()
+    generated_orders = 0
+    generated_items = 0
+    for _, _, orders_data, order_items_data in generate_order_batches(
+        num_customers, store_ids, product_prices, category_products
+    ):
+        generated_orders += len(orders_data)
+        generated_items += len(order_items_data)
+    generation_seconds = time.perf_counter() - start
+    
+    # Vectorized: NumPy generator over the same catalog
+    start = time.perf_counter()
+    vectorized_orders = 0
+    for _, vectorized_orders, _, _ in build_vectorized_order_generator(
+        store_ids, product_prices, category_products
+    ).generate_batches(1, num_customers):
+        pass
+    vectorized_seconds = time.perf_counter() - start
+    
+    before_seconds = lookup_seconds + generation_seconds
+    logging.info(f"   Generated {generated_orders:,} orders and {generated_items:,} order items")
+    logging.info(f"   Before (per-customer store lookup): {before_seconds:8.2f}s")
+    logging.info(f"   After  (in-memory store map):       {generation_seconds:8.2f}s")
+    if generation_seconds > 0:
+        logging.info(f"   Speedup:                            {before_seconds / generation_seconds:8.1f}x")
+    logging.info(f"   Vectorized (NumPy, {vectorized_orders:,} orders): {vectorized_seconds:8.2f}s")
+
+# Verification checks run concurrently over this many pooled connections
+VERIFICATION_CONCURRENCY = 4
+
+# Fixed seed so sampled verification is repeatable
+VERIFICATION_SAMPLE_SEED = 42
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# A check takes a connection and the sample percentage and returns (log lines, results)
+CheckResult = Tuple[List[str], Dict]
+
+def sampled_table(table: str, alias: str, sample_percent: Optional[float]) -> str:
+    """Table reference for a FROM clause, with a repeatable TABLESAMPLE when verifying a sample"""
+    if not sample_percent:
+        return f"{SCHEMA_NAME}.{table} {alias}"
+    return f"{SCHEMA_NAME}.{table} {alias} TABLESAMPLE SYSTEM ({sample_percent}) REPEATABLE ({VERIFICATION_SAMPLE_SEED})"
+
+def sample_scale(sample_percent: Optional[float]) -> float:
+    """Factor to extrapolate sampled counts and sums to the full table"""
+    return 100.0 / sample_percent if sample_percent else 1.0
+
+async def create_verification_pool():
+    """Create the small connection pool verification checks run on"""
+    return await asyncpg.create_pool(**POSTGRES_CONFIG, min_size=1, max_size=VERIFICATION_CONCURRENCY)
+
+async def run_checks(pool, checks: List, sample_percent: Optional[float] = None) -> List[Dict]:
+    """Run independent checks concurrently, then log their output in order
+
+    Returns:
+        The results of each check, in order (empty for checks that failed)
+    """
+    async def run(check):
+        async with pool.acquire() as conn:
+            return await check(conn, sample_percent)
+    
+    outcomes = await asyncio.gather(*(run(check) for check in checks), return_exceptions=True)
+    
+    results = []
+    for check, outcome in zip(checks, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"Verification check {check.__name__} failed: {outcome}")
+            results.append({})
+            continue
+        lines, result = outcome
+        for line in lines:
+            logging.info(line)
+        results.append(result)
+    return results
+
+async def check_store_distribution(conn, sample_percent: Optional[float]) -> CheckResult:
+    scale = sample_scale(sample_percent)
     rows = await conn.fetch(f"""
-        SELECT s.store_name, 
-               COUNT(o.order_id) as orders,
-               ROUND(SUM(oi.total_amount)/1000.0, 1) || 'K' as revenue,
-               ROUND(100.0 * COUNT(o.order_id) / (SELECT COUNT(*) FROM {SCHEMA_NAME}.orders), 1) || '%' as order_pct
-        FROM {SCHEMA_NAME}.orders o 
+        SELECT s.store_name,
+               COUNT(DISTINCT o.order_id) AS orders,
+               SUM(oi.total_amount) AS revenue,
+               100.0 * COUNT(DISTINCT o.order_id) / SUM(COUNT(DISTINCT o.order_id)) OVER () AS order_pct
+        FROM {sampled_table('orders', 'o', sample_percent)}
         JOIN {SCHEMA_NAME}.stores s ON o.store_id = s.store_id
         JOIN {SCHEMA_NAME}.order_items oi ON o.order_id = oi.order_id
         GROUP BY s.store_id, s.store_name
         ORDER BY SUM(oi.total_amount) DESC
     """)
     
-    logging.info("   Store               Orders     Revenue    % of Orders")
-    logging.info("   " + "-" * 50)
+    lines = ["\n🏪 STORE SALES DISTRIBUTION:",
+             "   Store               Orders     Revenue    % of Orders",
+             "   " + "-" * 50]
     for row in rows:
-        logging.info(f"   {row['store_name']:<18} {row['orders']:>6}     ${row['revenue']:>6}    {row['order_pct']:>6}")
-    
-    # Year-over-year growth verification
-    logging.info("\n📈 YEAR-OVER-YEAR GROWTH PATTERN:")
+        lines.append(f"   {row['store_name']:<18} {row['orders'] * scale:>6,.0f}     "
+                     f"${float(row['revenue']) * scale / 1000:>6.1f}K    {row['order_pct']:>5.1f}%")
+    return lines, {}
+
+async def check_yearly_growth(conn, sample_percent: Optional[float]) -> CheckResult:
+    scale = sample_scale(sample_percent)
     rows = await conn.fetch(f"""
-        SELECT EXTRACT(YEAR FROM o.order_date) as year,
-               COUNT(DISTINCT o.order_id) as orders,
-               ROUND(SUM(oi.total_amount)/1000.0, 1) || 'K' as revenue
-        FROM {SCHEMA_NAME}.orders o
+        SELECT EXTRACT(YEAR FROM o.order_date)::int AS year,
+               COUNT(DISTINCT o.order_id) AS orders,
+               SUM(oi.total_amount) AS revenue,
+               100.0 * (SUM(oi.total_amount) / NULLIF(LAG(SUM(oi.total_amount)) OVER (ORDER BY EXTRACT(YEAR FROM o.order_date)), 0) - 1) AS growth_pct
+        FROM {sampled_table('orders', 'o', sample_percent)}
         JOIN {SCHEMA_NAME}.order_items oi ON o.order_id = oi.order_id
         GROUP BY EXTRACT(YEAR FROM o.order_date)
         ORDER BY year
     """)
     
-    logging.info("   Year    Orders     Revenue    Growth")
-    logging.info("   " + "-" * 35)
-    prev_revenue = None
+    lines = ["\n📈 YEAR-OVER-YEAR GROWTH PATTERN:",
+             "   Year    Orders     Revenue    Growth",
+             "   " + "-" * 35]
     for row in rows:
-        revenue_num = float(row['revenue'].replace('K', ''))
-        growth = ""
-        if prev_revenue is not None:
-            growth_pct = ((revenue_num - prev_revenue) / prev_revenue) * 100
-            growth = f"{growth_pct:+.1f}%"
-        logging.info(f"   {int(row['year'])}    {row['orders']:>6}     ${row['revenue']:>6}    {growth:>6}")
-        prev_revenue = revenue_num
-    
-    # Product category distribution
-    logging.info("\n🛍️  TOP PRODUCT CATEGORIES:")
+        growth = f"{row['growth_pct']:+.1f}%" if row['growth_pct'] is not None else ""
+        lines.append(f"   {row['year']}    {row['orders'] * scale:>6,.0f}     "
+                     f"${float(row['revenue']) * scale / 1000:>6.1f}K    {growth:>6}")
+    return lines, {}
+
+async def check_top_categories(conn, sample_percent: Optional[float]) -> CheckResult:
+    scale = sample_scale(sample_percent)
     rows = await conn.fetch(f"""
         SELECT c.category_name,
-               COUNT(DISTINCT o.order_id) as orders,
-               ROUND(SUM(oi.total_amount)/1000.0, 1) || 'K' as revenue
-        FROM {SCHEMA_NAME}.categories c
-        JOIN {SCHEMA_NAME}.products p ON c.category_id = p.category_id
-        JOIN {SCHEMA_NAME}.order_items oi ON p.product_id = oi.product_id
-        JOIN {SCHEMA_NAME}.orders o ON oi.order_id = o.order_id
+               COUNT(DISTINCT o.order_id) AS orders,
+               SUM(oi.total_amount) AS revenue
+        FROM {sampled_table('orders', 'o', sample_percent)}
+        JOIN {SCHEMA_NAME}.order_items oi ON oi.order_id = o.order_id
+        JOIN {SCHEMA_NAME}.products p ON p.product_id = oi.product_id
+        JOIN {SCHEMA_NAME}.categories c ON c.category_id = p.category_id
         GROUP BY c.category_id, c.category_name
         ORDER BY SUM(oi.total_amount) DESC
         LIMIT 5
     """)
     
-    logging.info("   Category             Orders     Revenue")
-    logging.info("   " + "-" * 40)
+    lines = ["\n🛍️  TOP PRODUCT CATEGORIES:",
+             "   Category             Orders     Revenue",
+             "   " + "-" * 40]
     for row in rows:
-        logging.info(f"   {row['category_name']:<18} {row['orders']:>6}     ${row['revenue']:>6}")
-    
-    # Final summary
-    customers = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.customers")
-    products = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.products")
-    orders = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.orders")
-    order_items = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.order_items")
-    embeddings = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA_NAME}.product_image_embeddings")
-    total_revenue = await conn.fetchval(f"SELECT SUM(total_amount) FROM {SCHEMA_NAME}.order_items")
-    
-    # Gross margin analysis
-    logging.info("\n💰 GROSS MARGIN ANALYSIS:")
-    margin_stats = await conn.fetch(f"""
-        SELECT 
-            COUNT(*) as product_count,
-            AVG(cost) as avg_cost,
-            AVG(base_price) as avg_selling_price,
-            AVG((base_price - cost) / base_price * 100) as avg_gross_margin_percent,
-            MIN((base_price - cost) / base_price * 100) as min_gross_margin_percent,
-            MAX((base_price - cost) / base_price * 100) as max_gross_margin_percent
+        lines.append(f"   {row['category_name']:<18} {row['orders'] * scale:>6,.0f}     "
+                     f"${float(row['revenue']) * scale / 1000:>6.1f}K")
+    return lines, {}
+
+async def check_gross_margin(conn, sample_percent: Optional[float]) -> CheckResult:
+    scale = sample_scale(sample_percent)
+    stats = await conn.fetchrow(f"""
+        SELECT AVG(cost) AS avg_cost,
+               AVG(base_price) AS avg_selling_price,
+               AVG((base_price - cost) / base_price * 100) AS avg_gross_margin_percent,
+               MIN((base_price - cost) / base_price * 100) AS min_gross_margin_percent,
+               MAX((base_price - cost) / base_price * 100) AS max_gross_margin_percent
         FROM {SCHEMA_NAME}.products
     """)
-    
-    if margin_stats:
-        stats = margin_stats[0]
-        logging.info(f"   Average Cost:           ${stats['avg_cost']:.2f}")
-        logging.info(f"   Average Selling Price:  ${stats['avg_selling_price']:.2f}")
-        logging.info(f"   Average Gross Margin:   {stats['avg_gross_margin_percent']:.1f}%")
-        logging.info(f"   Margin Range:           {stats['min_gross_margin_percent']:.1f}% - {stats['max_gross_margin_percent']:.1f}%")
-    
-    # Calculate total cost and gross profit from actual sales
-    sales_margin = await conn.fetchrow(f"""
-        SELECT 
-            SUM(oi.total_amount) as total_revenue,
-            SUM(p.cost * oi.quantity) as total_cost,
-            SUM(oi.total_amount) - SUM(p.cost * oi.quantity) as total_gross_profit
-        FROM {SCHEMA_NAME}.order_items oi
+    sales = await conn.fetchrow(f"""
+        SELECT SUM(oi.total_amount) AS total_revenue,
+               SUM(p.cost * oi.quantity) AS total_cost
+        FROM {sampled_table('order_items', 'oi', sample_percent)}
         JOIN {SCHEMA_NAME}.products p ON oi.product_id = p.product_id
     """)
     
-    if sales_margin and sales_margin['total_revenue']:
-        actual_margin_pct = (sales_margin['total_gross_profit'] / sales_margin['total_revenue']) * 100
-        logging.info(f"   Actual Sales Margin:    {actual_margin_pct:.1f}%")
-        logging.info(f"   Total Cost of Goods:    ${sales_margin['total_cost']:.2f}")
-        logging.info(f"   Total Gross Profit:     ${sales_margin['total_gross_profit']:.2f}")
-
-    logging.info("\n✅ DATABASE SUMMARY:")
-    logging.info(f"   Customers:          {customers:>8,}")
-    logging.info(f"   Products:           {products:>8,}")
-    logging.info(f"   Product Embeddings: {embeddings:>8,}")
-    logging.info(f"   Orders:             {orders:>8,}")
-    logging.info(f"   Order Items:        {order_items:>8,}")
+    lines = ["\n💰 GROSS MARGIN ANALYSIS:"]
+    if stats and stats['avg_cost'] is not None:
+        lines += [
+            f"   Average Cost:           ${stats['avg_cost']:.2f}",
+            f"   Average Selling Price:  ${stats['avg_selling_price']:.2f}",
+            f"   Average Gross Margin:   {stats['avg_gross_margin_percent']:.1f}%",
+            f"   Margin Range:           {stats['min_gross_margin_percent']:.1f}% - {stats['max_gross_margin_percent']:.1f}%",
+        ]
+    if sales and sales['total_revenue']:
+        total_revenue = float(sales['total_revenue']) * scale
+        total_cost = float(sales['total_cost']) * scale
+        lines += [
+            f"   Actual Sales Margin:    {(total_revenue - total_cost) / total_revenue * 100:.1f}%",
+            f"   Total Cost of Goods:    ${total_cost:.2f}",
+            f"   Total Gross Profit:     ${total_revenue - total_cost:.2f}",
+        ]
+    return lines, {}
+
+async def check_table_counts(conn, sample_percent: Optional[float]) -> CheckResult:
+    """Row counts and revenue; planner estimates and a sampled sum when verifying a sample"""
+    tables = ["customers", "products", "product_image_embeddings", "orders", "order_items"]
+    if sample_percent:
+        rows = await conn.fetch(
+            "SELECT relname, reltuples::bigint AS row_count FROM pg_class WHERE oid = ANY($1::text[]::regclass[])",
+            [f"{SCHEMA_NAME}.{table}" for table in tables],
+        )
+        counts = {row['relname']: max(row['row_count'], 0) for row in rows}
+    else:
+        row = await conn.fetchrow("SELECT " + ", ".join(
+            f"(SELECT COUNT(*) FROM {SCHEMA_NAME}.{table}) AS {table}" for table in tables
+        ))
+        counts = dict(row)
+    total_revenue = await conn.fetchval(
+        f"SELECT SUM(oi.total_amount) FROM {sampled_table('order_items', 'oi', sample_percent)}"
+    )
+    total_revenue = float(total_revenue or 0) * sample_scale(sample_percent)
+    
+    customers, orders, order_items = counts['customers'], counts['orders'], counts['order_items']
+    lines = ["\n✅ DATABASE SUMMARY" + (f" (estimated from a {sample_percent}% sample):" if sample_percent else ":"),
+             f"   Customers:          {customers:>8,}",
+             f"   Products:           {counts['products']:>8,}",
+             f"   Product Embeddings: {counts['product_image_embeddings']:>8,}",
+             f"   Orders:             {orders:>8,}",
+             f"   Order Items:        {order_items:>8,}"]
     if total_revenue and orders:
-        logging.info(f"   Total Revenue:      ${total_revenue/1000:.1f}K")
-        logging.info(f"   Avg Order:          ${total_revenue/orders:.2f}")
-        logging.info(f"   Orders/Customer:    {orders/customers:.1f}")
-        logging.info(f"   Items/Order:        {order_items/orders:.1f}")
-
-async def verify_seasonal_patterns(conn):
-    """Verify that orders and inventory follow seasonal patterns from product_data.json"""
+        lines += [f"   Total Revenue:      ${total_revenue/1000:.1f}K",
+                  f"   Avg Order:          ${total_revenue/orders:.2f}"]
+        if customers:
+            lines.append(f"   Orders/Customer:    {orders/customers:.1f}")
+        lines.append(f"   Items/Order:        {order_items/orders:.1f}")
+    return lines, counts
+
+async def check_order_seasonality(conn, sample_percent: Optional[float]) -> CheckResult:
+    """Compare peak and low order months per category with the seasonal multipliers, in SQL"""
+    seasonal = [(name, config['washington_seasonal_multipliers']) for name, config in main_categories.items()
+                if 'washington_seasonal_multipliers' in config]
+    lines = ["\n📊 ORDER SEASONALITY BY CATEGORY:",
+             "   Testing if orders follow seasonal multipliers from product_data.json"]
+    if not seasonal:
+        return lines, {'matches': 0, 'total': 0}
     
-    logging.info("\n" + "=" * 60)
-    logging.info("🌱 SEASONAL PATTERNS VERIFICATION")
-    logging.info("=" * 60)
-    
-    try:
-        # Test 1: Order seasonality by category and month
-        logging.info("\n📊 ORDER SEASONALITY BY CATEGORY:")
-        logging.info("   Testing if orders follow seasonal multipliers from product_data.json")
-        
-        # Get actual orders by month and category
-        rows = await conn.fetch(f"""
+    rows = await conn.fetch(f"""
+        WITH monthly AS (
             SELECT c.category_name,
-                   EXTRACT(MONTH FROM o.order_date) as month,
-                   COUNT(DISTINCT o.order_id) as order_count,
-                   ROUND(AVG(oi.total_amount), 2) as avg_order_value
-            FROM {SCHEMA_NAME}.orders o
+                   EXTRACT(MONTH FROM o.order_date)::int AS month,
+                   COUNT(DISTINCT o.order_id) AS order_count
+            FROM {sampled_table('orders', 'o', sample_percent)}
             JOIN {SCHEMA_NAME}.order_items oi ON o.order_id = oi.order_id
             JOIN {SCHEMA_NAME}.products p ON oi.product_id = p.product_id
             JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
             GROUP BY c.category_name, EXTRACT(MONTH FROM o.order_date)
-            HAVING COUNT(DISTINCT o.order_id) > 0
-            ORDER BY c.category_name, month
-        """)
-        
-        # Organize data by category
-        category_data = {}
-        for row in rows:
-            category = row['category_name']
-            month = int(row['month'])
-            if category not in category_data:
-                category_data[category] = {}
-            category_data[category][month] = {
-                'order_count': row['order_count'],
-                'avg_order_value': float(row['avg_order_value'])
-            }
-        
-        # Compare with seasonal multipliers
-        seasonal_matches = 0
-        total_seasonal_categories = 0
-        
-        month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", 
-                       "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        
-        for category_name, category_config in main_categories.items():
-            if 'washington_seasonal_multipliers' not in category_config:
-                continue
-                
-            total_seasonal_categories += 1
-            seasonal_multipliers = category_config['washington_seasonal_multipliers']
-            
-            if category_name not in category_data:
-                logging.warning(f"   ⚠️  No orders found for seasonal category: {category_name}")
-                continue
-            
-            # Find peak and low months from data
-            data_months = category_data[category_name]
-            if len(data_months) < 6:  # Need reasonable sample size
-                logging.warning(f"   ⚠️  Insufficient data for {category_name} ({len(data_months)} months)")
-                continue
-            
-            # Get peak months from multipliers and data
-            multiplier_peak_month = seasonal_multipliers.index(max(seasonal_multipliers)) + 1
-            multiplier_low_month = seasonal_multipliers.index(min(seasonal_multipliers)) + 1
-            
-            data_peak_month = max(data_months.keys(), key=lambda m: data_months[m]['order_count'])
-            data_low_month = min(data_months.keys(), key=lambda m: data_months[m]['order_count'])
-            
-            # Check if peaks align (within 3 months tolerance for seasonality to account for data variation)
-            peak_match = abs(multiplier_peak_month - data_peak_month) <= 3 or \
-                        abs(multiplier_peak_month - data_peak_month) >= 9  # Account for year wraparound
-            
-            low_match = abs(multiplier_low_month - data_low_month) <= 3 or \
-                       abs(multiplier_low_month - data_low_month) >= 9
-            
-            # Also check if the actual seasonal trend direction is correct (high vs low months)
-            data_peak_count = data_months[data_peak_month]['order_count']
-            data_low_count = data_months[data_low_month]['order_count']
-            
-            # Verify the trend direction is correct (peak > low by reasonable margin)
-            trend_correct = data_peak_count > data_low_count * 1.1  # At least 10% difference
-            
-            if (peak_match or low_match) and trend_correct:
-                seasonal_matches += 1
-                status = "✅"
-            elif peak_match or low_match or trend_correct:
-                seasonal_matches += 0.5  # Partial credit for trend direction
-                status = "⚠️ "
-            else:
-                status = "❌"
-            
-            logging.info(f"   {status} {category_name}:")
-            logging.info(f"      Expected peak: {month_names[multiplier_peak_month-1]} ({max(seasonal_multipliers):.1f})")
-            logging.info(f"      Actual peak:   {month_names[data_peak_month-1]} ({data_months[data_peak_month]['order_count']} orders)")
-            logging.info(f"      Expected low:  {month_names[multiplier_low_month-1]} ({min(seasonal_multipliers):.1f})")
-            logging.info(f"      Actual low:    {month_names[data_low_month-1]} ({data_months[data_low_month]['order_count']} orders)")
-        
-        # Test 2: Inventory seasonality
-        logging.info("\n📦 INVENTORY SEASONALITY:")
-        logging.info("   Testing if inventory levels reflect seasonal patterns")
-        
-        # Initialize inventory tracking variables
-        inventory_matches = 0
-        total_inventory_categories = 0
-        inventory_match_rate = 0
-        
-        # Get average inventory by category
-        inventory_rows = await conn.fetch(f"""
+        ),
+        actual AS (
+            SELECT category_name,
+                   COUNT(*) AS months_with_data,
+                   MAX(month) FILTER (WHERE peak_rank = 1) AS peak_month,
+                   MAX(order_count) AS peak_count,
+                   MAX(month) FILTER (WHERE low_rank = 1) AS low_month,
+                   MIN(order_count) AS low_count
+            FROM (
+                SELECT category_name, month, order_count,
+                       ROW_NUMBER() OVER (PARTITION BY category_name ORDER BY order_count DESC, month) AS peak_rank,
+                       ROW_NUMBER() OVER (PARTITION BY category_name ORDER BY order_count, month) AS low_rank
+                FROM monthly
+            ) ranked
+            GROUP BY category_name
+        ),
+        expected AS (
+            SELECT category_name,
+                   MAX(month) FILTER (WHERE peak_rank = 1) AS peak_month,
+                   MAX(multiplier) AS peak_multiplier,
+                   MAX(month) FILTER (WHERE low_rank = 1) AS low_month,
+                   MIN(multiplier) AS low_multiplier
+            FROM (
+                SELECT category_name, month, multiplier,
+                       ROW_NUMBER() OVER (PARTITION BY category_name ORDER BY multiplier DESC, month) AS peak_rank,
+                       ROW_NUMBER() OVER (PARTITION BY category_name ORDER BY multiplier, month) AS low_rank
+                FROM unnest($1::text[], $2::int[], $3::float8[]) AS m(category_name, month, multiplier)
+            ) ranked
+            GROUP BY category_name
+        )
+        SELECT e.category_name,
+               e.peak_month AS expected_peak_month, e.peak_multiplier,
+               e.low_month AS expected_low_month, e.low_multiplier,
+               a.months_with_data, a.peak_month, a.peak_count, a.low_month, a.low_count,
+               -- Months are compared on a circle (Dec and Jan are one month apart), within 3 months
+               LEAST(ABS(e.peak_month - a.peak_month), 12 - ABS(e.peak_month - a.peak_month)) <= 3 AS peak_match,
+               LEAST(ABS(e.low_month - a.low_month), 12 - ABS(e.low_month - a.low_month)) <= 3 AS low_match,
+               a.peak_count > a.low_count * 1.1 AS trend_correct
+        FROM expected e
+        LEFT JOIN actual a ON a.category_name = e.category_name
+    """,
+        [name for name, multipliers in seasonal for _ in multipliers],
+        [month for _, multipliers in seasonal for month in range(1, len(multipliers) + 1)],
+        [float(value) for _, multipliers in seasonal for value in multipliers],
+    )
+    by_category = {row['category_name']: row for row in rows}
+    
+    matches = 0
+    for category_name, _ in seasonal:
+        row = by_category[category_name]
+        if row['months_with_data'] is None:
+            lines.append(f"   ⚠️  No orders found for seasonal category: {category_name}")
+            continue
+        if row['months_with_data'] < 6:  # Need reasonable sample size
+            lines.append(f"   ⚠️  Insufficient data for {category_name} ({row['months_with_data']} months)")
+            continue
+        
+        if (row['peak_match'] or row['low_match']) and row['trend_correct']:
+            matches += 1
+            status = "✅"
+        elif row['peak_match'] or row['low_match'] or row['trend_correct']:
+            matches += 0.5  # Partial credit for trend direction
+            status = "⚠️ "
+        else:
+            status = "❌"
+        
+        lines += [
+            f"   {status} {category_name}:",
+            f"      Expected peak: {MONTH_NAMES[row['expected_peak_month']-1]} ({row['peak_multiplier']:.1f})",
+            f"      Actual peak:   {MONTH_NAMES[row['peak_month']-1]} ({row['peak_count']} orders)",
+            f"      Expected low:  {MONTH_NAMES[row['expected_low_month']-1]} ({row['low_multiplier']:.1f})",
+            f"      Actual low:    {MONTH_NAMES[row['low_month']-1]} ({row['low_count']} orders)",
+        ]
+    return lines, {'matches': matches, 'total': len(seasonal)}
+
+async def check_inventory_seasonality(conn, sample_percent: Optional[float]) -> CheckResult:
+    """Compare average stock per category with the average seasonal multiplier, relative to the lowest category"""
+    expected = {name: sum(config['washington_seasonal_multipliers']) / len(config['washington_seasonal_multipliers'])
+                for name, config in main_categories.items() if 'washington_seasonal_multipliers' in config}
+    lines = ["\n📦 INVENTORY SEASONALITY:",
+             "   Testing if inventory levels reflect seasonal patterns"]
+    if not expected:
+        return lines, {'matches': 0, 'total': 0}
+    
+    # Inventory is stores x products, small enough to always verify in full
+    rows = await conn.fetch(f"""
+        WITH actual AS (
             SELECT c.category_name,
-                   AVG(i.stock_level) as avg_stock,
-                   COUNT(*) as product_count
+                   AVG(i.stock_level) AS avg_stock,
+                   MIN(AVG(i.stock_level)) OVER () AS base_stock
             FROM {SCHEMA_NAME}.inventory i
             JOIN {SCHEMA_NAME}.products p ON i.product_id = p.product_id
             JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
             GROUP BY c.category_name
-            ORDER BY avg_stock DESC
-        """)
-        
-        # Calculate expected inventory ratios based on seasonal averages
-        expected_inventory = {}
-        for category_name, category_config in main_categories.items():
-            if 'washington_seasonal_multipliers' in category_config:
-                seasonal_multipliers = category_config['washington_seasonal_multipliers']
-                avg_multiplier = sum(seasonal_multipliers) / len(seasonal_multipliers)
-                expected_inventory[category_name] = avg_multiplier
-        
-        # Compare actual vs expected inventory ratios
-        inventory_data = {row['category_name']: float(row['avg_stock']) for row in inventory_rows}
-        
-        if expected_inventory and inventory_data:
-            # Normalize both to relative ratios
-            base_expected = min(expected_inventory.values())
-            base_actual = min(inventory_data.values())
-            
-            for category_name in expected_inventory:
-                if category_name not in inventory_data:
-                    continue
-                    
-                total_inventory_categories += 1
-                expected_ratio = expected_inventory[category_name] / base_expected
-                actual_ratio = inventory_data[category_name] / base_actual
-                
-                # Allow 30% tolerance for inventory matching
-                ratio_diff = abs(expected_ratio - actual_ratio) / expected_ratio
-                if ratio_diff <= 0.3:
-                    inventory_matches += 1
-                    status = "✅"
-                else:
-                    status = "❌"
-                
-                logging.info(f"   {status} {category_name}:")
-                logging.info(f"      Expected ratio: {expected_ratio:.2f}")
-                logging.info(f"      Actual ratio:   {actual_ratio:.2f}")
-                logging.info(f"      Avg stock:      {inventory_data[category_name]:.1f}")
-        
-        # Calculate inventory match rate
-        if total_inventory_categories > 0:
-            inventory_match_rate = (inventory_matches / total_inventory_categories) * 100
-        
-        # Test 3: Monthly order distribution
-        logging.info("\n📈 MONTHLY ORDER DISTRIBUTION:")
-        monthly_totals = await conn.fetch(f"""
-            SELECT EXTRACT(MONTH FROM o.order_date) as month,
-                   COUNT(DISTINCT o.order_id) as total_orders
-            FROM {SCHEMA_NAME}.orders o
-            GROUP BY EXTRACT(MONTH FROM o.order_date)
-            ORDER BY month
-        """)
-        
-        if monthly_totals:
-            total_orders = sum(row['total_orders'] for row in monthly_totals)
-            logging.info("   Month    Orders    % of Total")
-            logging.info("   " + "-" * 30)
-            for row in monthly_totals:
-                month_num = int(row['month'])
-                pct = (row['total_orders'] / total_orders) * 100
-                logging.info(f"   {month_names[month_num-1]:<6} {row['total_orders']:>8}    {pct:>6.1f}%")
-        
-        # Summary
-        logging.info("\n🎯 SEASONAL VERIFICATION SUMMARY:")
-        if total_seasonal_categories > 0:
-            order_match_rate = (seasonal_matches / total_seasonal_categories) * 100
-            logging.info(f"   Order seasonality match rate: {seasonal_matches}/{total_seasonal_categories} ({order_match_rate:.1f}%)")
-        
-        if total_inventory_categories > 0:
-            logging.info(f"   Inventory seasonality match rate: {inventory_matches}/{total_inventory_categories} ({inventory_match_rate:.1f}%)")
-        
-        # Overall assessment
-        if total_seasonal_categories > 0 and seasonal_matches >= total_seasonal_categories * 0.7:
-            logging.info("   ✅ SEASONAL PATTERNS VERIFIED: Orders follow expected seasonal trends")
-        else:
-            logging.info("   ⚠️  SEASONAL PATTERNS PARTIAL: Some discrepancies found in seasonal trends")
-        
-        if inventory_match_rate >= 70:
-            logging.info("   ✅ INVENTORY SEASONALITY VERIFIED: Stock levels reflect seasonal patterns")
-        else:
-            logging.info("   ⚠️  INVENTORY SEASONALITY PARTIAL: Some discrepancies in seasonal stock levels")
-            
-    except Exception as e:
-        logging.error(f"Error verifying seasonal patterns: {e}")
-        raise
+        ),
+        ratios AS (
+            SELECT e.category_name,
+                   a.avg_stock::float8 AS avg_stock,
+                   e.multiplier / MIN(e.multiplier) OVER () AS expected_ratio,
+                   (a.avg_stock / a.base_stock)::float8 AS actual_ratio
+            FROM unnest($1::text[], $2::float8[]) AS e(category_name, multiplier)
+            JOIN actual a ON a.category_name = e.category_name
+        )
+        SELECT *,
+               -- Allow 30% tolerance for inventory matching
+               ABS(expected_ratio - actual_ratio) / expected_ratio <= 0.3 AS matches
+        FROM ratios
+    """, list(expected), list(expected.values()))
+    by_category = {row['category_name']: row for row in rows}
+    
+    matches = 0
+    for category_name in expected:
+        row = by_category.get(category_name)
+        if row is None:
+            continue
+        matches += row['matches']
+        lines += [
+            f"   {'✅' if row['matches'] else '❌'} {category_name}:",
+            f"      Expected ratio: {row['expected_ratio']:.2f}",
+            f"      Actual ratio:   {row['actual_ratio']:.2f}",
+            f"      Avg stock:      {row['avg_stock']:.1f}",
+        ]
+    return lines, {'matches': matches, 'total': len(by_category)}
+
+async def check_monthly_distribution(conn, sample_percent: Optional[float]) -> CheckResult:
+    scale = sample_scale(sample_percent)
+    rows = await conn.fetch(f"""
+        SELECT EXTRACT(MONTH FROM o.order_date)::int AS month,
+               COUNT(*) AS total_orders,
+               100.0 * COUNT(*) / SUM(COUNT(*)) OVER () AS pct
+        FROM {sampled_table('orders', 'o', sample_percent)}
+        GROUP BY EXTRACT(MONTH FROM o.order_date)
+        ORDER BY month
+    """)
+    
+    lines = ["\n📈 MONTHLY ORDER DISTRIBUTION:",
+             "   Month    Orders    % of Total",
+             "   " + "-" * 30]
+    for row in rows:
+        lines.append(f"   {MONTH_NAMES[row['month']-1]:<6} {row['total_orders'] * scale:>8,.0f}    {row['pct']:>6.1f}%")
+    return lines, {}
+
+async def verify_database_contents(pool, sample_percent: Optional[float] = None):
+    """Verify database contents and show key statistics
+
+    Args:
+        pool: Connection pool the independent checks run on concurrently
+        sample_percent: Verify a TABLESAMPLE of orders and order items instead of the full tables
+    """
+    logging.info("\n" + "=" * 60)
+    logging.info("DATABASE VERIFICATION & STATISTICS")
+    if sample_percent:
+        logging.info(f"(sampling {sample_percent}% of orders and order items, counts and sums are extrapolated)")
+    logging.info("=" * 60)
+    
+    await run_checks(pool, [
+        check_store_distribution,
+        check_yearly_growth,
+        check_top_categories,
+        check_gross_margin,
+        check_table_counts,
+    ], sample_percent)
+
+async def verify_seasonal_patterns(pool, sample_percent: Optional[float] = None):
+    """Verify that orders and inventory follow seasonal patterns from product_data.json
+
+    Args:
+        pool: Connection pool the independent checks run on concurrently
+        sample_percent: Verify a TABLESAMPLE of orders instead of the full table
+    """
+    logging.info("\n" + "=" * 60)
+    logging.info("🌱 SEASONAL PATTERNS VERIFICATION")
+    logging.info("=" * 60)
+    
+    orders_result, inventory_result, _ = await run_checks(pool, [
+        check_order_seasonality,
+        check_inventory_seasonality,
+        check_monthly_distribution,
+    ], sample_percent)
+    
+    seasonal_matches = orders_result.get('matches', 0)
+    total_seasonal_categories = orders_result.get('total', 0)
+    inventory_matches = inventory_result.get('matches', 0)
+    total_inventory_categories = inventory_result.get('total', 0)
+    inventory_match_rate = (inventory_matches / total_inventory_categories) * 100 if total_inventory_categories else 0
+    
+    # Summary
+    logging.info("\n🎯 SEASONAL VERIFICATION SUMMARY:")
+    if total_seasonal_categories > 0:
+        order_match_rate = (seasonal_matches / total_seasonal_categories) * 100
+        logging.info(f"   Order seasonality match rate: {seasonal_matches}/{total_seasonal_categories} ({order_match_rate:.1f}%)")
+    
+    if total_inventory_categories > 0:
+        logging.info(f"   Inventory seasonality match rate: {inventory_matches}/{total_inventory_categories} ({inventory_match_rate:.1f}%)")
+    
+    # Overall assessment
+    if total_seasonal_categories > 0 and seasonal_matches >= total_seasonal_categories * 0.7:
+        logging.info("   ✅ SEASONAL PATTERNS VERIFIED: Orders follow expected seasonal trends")
+    else:
+        logging.info("   ⚠️  SEASONAL PATTERNS PARTIAL: Some discrepancies found in seasonal trends")
+    
+    if inventory_match_rate >= 70:
+        logging.info("   ✅ INVENTORY SEASONALITY VERIFIED: Stock levels reflect seasonal patterns")
+    else:
+        logging.info("   ⚠️  INVENTORY SEASONALITY PARTIAL: Some discrepancies in seasonal stock levels")
+
+async def verify_generated_data(sample_percent: Optional[float] = None, seasonal_only: bool = False):
+    """Run the verification checks on their own connection pool"""
+    pool = await create_verification_pool()
+    try:
+        if not seasonal_only:
+            await verify_database_contents(pool, sample_percent)
+        await verify_seasonal_patterns(pool, sample_percent)
+    finally:
+        await pool.close()
+
+# =============================================================================
+# STAGED GENERATION PIPELINE
+# =============================================================================
+
+# Checkpoints live outside SCHEMA_NAME so they survive the schema stage dropping it
+CHECKPOINT_TABLE = "public.zava_generation_checkpoints"
+
+def log_section(title: str) -> None:
+    logging.info("\n" + "=" * 50)
+    logging.info(title)
+    logging.info("=" * 50)
+
+async def stage_schema(conn, params: Dict) -> None:
+    """Drop and recreate the schema (indexes and RLS are deferred for the copy loader)"""
+    logging.info("Dropping existing tables if they exist...")
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA_NAME} CASCADE")
+    await create_database_schema(conn, deferred=params['loader'] == "copy", unlogged=params['unlogged'])
+
+async def stage_reference(conn, params: Dict) -> None:
+    """Load stores, categories and product types"""
+    await conn.execute(f"TRUNCATE {SCHEMA_NAME}.stores, {SCHEMA_NAME}.categories, {SCHEMA_NAME}.product_types RESTART IDENTITY CASCADE")
+    await insert_stores(conn)
+    await insert_categories(conn)
+    await insert_product_types(conn)
+
+async def stage_customers(conn, params: Dict) -> None:
+    await conn.execute(f"TRUNCATE {SCHEMA_NAME}.customers RESTART IDENTITY CASCADE")
+    await insert_customers(conn, params['num_customers'], loader=params['loader'])
+
+async def stage_products(conn, params: Dict) -> None:
+    await conn.execute(f"TRUNCATE {SCHEMA_NAME}.products RESTART IDENTITY CASCADE")
+    await insert_products(conn)
+
+async def stage_embeddings(conn, params: Dict) -> None:
+    """Populate and verify product embeddings from product_data.json"""
+    await populate_product_image_embeddings(conn, clear_existing=True)
+    await populate_product_description_embeddings(conn, clear_existing=True)
+    await verify_embeddings_table(conn)
+    await verify_description_embeddings_table(conn)
+
+async def stage_inventory(conn, params: Dict) -> None:
+    await conn.execute(f"TRUNCATE {SCHEMA_NAME}.inventory")
+    await insert_inventory(conn, loader=params['loader'])
+
+async def stage_orders(conn, params: Dict) -> None:
+    await conn.execute(f"TRUNCATE {SCHEMA_NAME}.order_items, {SCHEMA_NAME}.orders RESTART IDENTITY")
+    await insert_orders(
+        conn,
+        params['num_customers'],
+        loader=params['loader'],
+        generator=params['generator'],
+        seed=params['seed'],
+        workers=params['workers'],
+        shard_customers=params['shard_customers'],
+    )
+
+async def stage_finalize(conn, params: Dict) -> None:
+    """Switch tables to LOGGED, build indexes and RLS policies (no-ops if they exist) and ANALYZE"""
+    # Building indexes once over loaded data is much cheaper than maintaining them row by row
+    await set_bulk_tables_logged(conn)
+    await create_performance_indexes(conn)
+    await create_rls_policies(conn)
+    await conn.execute("ANALYZE")
+
+async def stage_verification(conn, params: Dict) -> None:
+    await verify_generated_data(params['verify_sample'])
+
+# Pipeline stages in run order: the stages each depends on, and the parameters that change its output.
+# Stages marked after_data also run whenever an earlier stage ran, so the database is
+# never left without indexes or RLS policies after a partial run.
+PIPELINE_STAGES = {
+    'schema': {'run': stage_schema, 'title': "CREATING SCHEMA", 'depends_on': [], 'params': ['loader', 'unlogged']},
+    'reference': {'run': stage_reference, 'title': "INSERTING REFERENCE DATA", 'depends_on': ['schema'], 'params': ['scale_factor']},
+    'customers': {'run': stage_customers, 'title': "INSERTING CUSTOMERS", 'depends_on': ['reference'], 'params': ['num_customers', 'seed']},
+    'products': {'run': stage_products, 'title': "INSERTING PRODUCTS", 'depends_on': ['reference'], 'params': []},
+    'embeddings': {'run': stage_embeddings, 'title': "POPULATING PRODUCT EMBEDDINGS", 'depends_on': ['products'], 'params': []},
+    'inventory': {'run': stage_inventory, 'title': "INSERTING INVENTORY DATA", 'depends_on': ['products'], 'params': ['seed']},
+    'orders': {
+        'run': stage_orders,
+        'title': "INSERTING ORDER DATA",
+        'depends_on': ['customers', 'products'],
+        'params': ['num_customers', 'scale_factor', 'generator', 'seed', 'shard_customers'],
+    },
+    'finalize': {
+        'run': stage_finalize,
+        'title': "BUILDING INDEXES AND RLS POLICIES",
+        'depends_on': ['customers', 'embeddings', 'inventory', 'orders'],
+        'params': [],
+        'after_data': True,
+    },
+    'verification': {
+        'run': stage_verification,
+        'title': "FINAL DATABASE VERIFICATION",
+        'depends_on': ['finalize'],
+        'params': [],
+        'after_data': True,
+    },
+}
 
-async def generate_postgresql_database(num_customers: int = 50000):
-    """Generate complete PostgreSQL database"""
+def stage_dependents(stage: str) -> List[str]:
+    """All stages that directly or transitively depend on a stage"""
+    dependents = []
+    for name, config in PIPELINE_STAGES.items():
+        if any(dependency == stage or dependency in dependents for dependency in config['depends_on']):
+            dependents.append(name)
+    return dependents
+
+async def ensure_checkpoint_table(conn) -> None:
+    await conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            stage TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            params JSONB NOT NULL DEFAULT '{{}}',
+            started_at TIMESTAMPTZ,
+            completed_at TIMESTAMPTZ,
+            duration_seconds DOUBLE PRECISION,
+            error TEXT
+        )
+    """)
+
+async def load_checkpoints(conn) -> Dict[str, Dict]:
+    """Load the recorded checkpoint of every stage"""
+    await ensure_checkpoint_table(conn)
+    rows = await conn.fetch(f"SELECT * FROM {CHECKPOINT_TABLE}")
+    return {row['stage']: {**dict(row), 'params': json.loads(row['params'])} for row in rows}
+
+async def record_checkpoint(conn, stage: str, status: str, params: Dict, duration_seconds: Optional[float] = None, error: Optional[str] = None) -> None:
+    await conn.execute(f"""
+        INSERT INTO {CHECKPOINT_TABLE} (stage, status, params, started_at, completed_at, duration_seconds, error)
+        VALUES ($1, $2, $3::jsonb, CURRENT_TIMESTAMP, CASE WHEN $2 = 'completed' THEN CURRENT_TIMESTAMP END, $4, $5)
+        ON CONFLICT (stage) DO UPDATE SET
+            status = EXCLUDED.status,
+            params = EXCLUDED.params,
+            started_at = CASE WHEN EXCLUDED.status = 'running' THEN EXCLUDED.started_at ELSE {CHECKPOINT_TABLE}.started_at END,
+            completed_at = EXCLUDED.completed_at,
+            duration_seconds = EXCLUDED.duration_seconds,
+            error = EXCLUDED.error
+    """, stage, status, json.dumps(params), duration_seconds, error)
+
+def stage_params(stage: str, params: Dict) -> Dict:
+    return {key: params[key] for key in PIPELINE_STAGES[stage]['params']}
+
+def is_stage_complete(checkpoint: Optional[Dict], stage: str, params: Dict) -> bool:
+    """A stage is complete if it finished with the same output-affecting parameters"""
+    return (
+        checkpoint is not None
+        and checkpoint['status'] == 'completed'
+        and checkpoint['params'] == stage_params(stage, params)
+    )
+
+async def run_generation_pipeline(conn, params: Dict, stages: Optional[List[str]] = None, resume: bool = False) -> None:
+    """Run pipeline stages in order, recording a checkpoint for each one
+
+    Args:
+        params: Generation parameters (see generate_postgresql_database)
+        stages: Stages to (re-)run; defaults to all stages unless resuming
+        resume: Also run every stage that has not completed with the current parameters
+
+    Running a stage invalidates the checkpoints of the stages that depend on it, so a
+    later --resume picks them up. Finalize and verification always follow a stage that
+    ran, because finalize is idempotent and the tables it indexes were just reloaded.
+    """
+    checkpoints = await load_checkpoints(conn)
+    run_all = stages is None and not resume
+    requested = set(stages or [])
+    ran_stage = False
+    
+    for stage, config in PIPELINE_STAGES.items():
+        if not (
+            run_all
+            or stage in requested
+            or (config.get('after_data') and ran_stage)
+            or (resume and not is_stage_complete(checkpoints.get(stage), stage, params))
+        ):
+            logging.info(f"⏭️  Skipping stage '{stage}' (completed)")
+            continue
+        ran_stage = True
+        
+        # Stage seeds are derived per stage so re-running one stage reproduces its data
+        if params['seed'] is not None:
+            random.seed(f"{params['seed']}:{stage}")
+            Faker.seed(f"{params['seed']}:{stage}")
+        
+        log_section(config['title'])
+        await record_checkpoint(conn, stage, 'running', stage_params(stage, params))
+        start = time.perf_counter()
+        try:
+            await config['run'](conn, params)
+        except Exception as e:
+            await record_checkpoint(conn, stage, 'failed', stage_params(stage, params), time.perf_counter() - start, str(e))
+            raise
+        await record_checkpoint(conn, stage, 'completed', stage_params(stage, params), time.perf_counter() - start)
+        checkpoints[stage] = {'status': 'completed', 'params': stage_params(stage, params)}
+        logging.info(f"✅ Stage '{stage}' completed in {time.perf_counter() - start:.1f}s")
+        
+        dependents = stage_dependents(stage)
+        if dependents:
+            await conn.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE stage = ANY($1::text[])", dependents)
+            for dependent in dependents:
+                checkpoints.pop(dependent, None)
+    
+    pending = [stage for stage in PIPELINE_STAGES if not is_stage_complete(checkpoints.get(stage), stage, params)]
+    if pending:
+        logging.info(f"Stages not yet completed: {', '.join(pending)} (run with --resume to complete them)")
+
+async def show_checkpoints() -> None:
+    """Log the checkpoint status of every pipeline stage"""
+    conn = await create_connection()
+    try:
+        checkpoints = await load_checkpoints(conn)
+        logging.info("Generation pipeline checkpoints:")
+        for stage in PIPELINE_STAGES:
+            checkpoint = checkpoints.get(stage)
+            if checkpoint is None:
+                logging.info(f"  {stage:<13} pending")
+                continue
+            duration = f"{checkpoint['duration_seconds']:.1f}s" if checkpoint['duration_seconds'] is not None else "-"
+            error = f" error: {checkpoint['error']}" if checkpoint['error'] else ""
+            logging.info(f"  {stage:<13} {checkpoint['status']:<10} {duration:>9}  {json.dumps(checkpoint['params'])}{error}")
+    finally:
+        await conn.close()
+
+async def generate_postgresql_database(
+    num_customers: int = 50000,
+    loader: str = "insert",
+    unlogged: bool = False,
+    generator: str = "python",
+    seed: Optional[int] = None,
+    workers: int = 1,
+    shard_customers: int = DEFAULT_SHARD_CUSTOMERS,
+    scale_factor: Optional[int] = None,
+    stages: Optional[List[str]] = None,
+    resume: bool = False,
+    verify_sample: Optional[float] = None,
+):
+    """Generate complete PostgreSQL database as a staged pipeline
+
+    Args:
+        num_customers: Number of customers to generate
+        loader: "insert" (batched executemany) or "copy" (binary COPY, indexes and RLS built after loading)
+        unlogged: Load bulk tables as UNLOGGED and switch them to LOGGED afterwards (copy loader only)
+        generator: Order generator, "python" or "numpy" (vectorized)
+        seed: Seed for reproducible datasets
+        workers: Worker processes for parallel order generation (implies the numpy generator)
+        shard_customers: Customers per order generation shard
+        scale_factor: Scale factor preset (overrides num_customers, implies the numpy generator)
+        stages: Only (re-)run these stages (see PIPELINE_STAGES)
+        resume: Run the stages that have not completed with the current parameters
+        verify_sample: Verify a TABLESAMPLE percentage of orders instead of the full tables
+    """
+    if scale_factor:
+        num_customers = apply_scale_factor(scale_factor)
+        generator = "numpy"
+    if workers > 1 and generator != "numpy":
+        logging.info("Parallel order generation uses the numpy generator")
+        generator = "numpy"
+    
+    params = {
+        'num_customers': num_customers,
+        'loader': loader,
+        'unlogged': unlogged and loader == "copy",
+        'generator': generator,
+        'seed': seed,
+        'workers': workers,
+        'shard_customers': shard_customers,
+        'scale_factor': scale_factor,
+        'verify_sample': verify_sample,
+    }
     try:
         # Create connection
         conn = await create_connection()
         
         try:
-            # Drop existing tables to start fresh (optional)
-            logging.info("Dropping existing tables if they exist...")
-            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA_NAME} CASCADE")
-            
-            await create_database_schema(conn)
-            await insert_stores(conn)
-            await insert_categories(conn)
-            await insert_product_types(conn)
-            await insert_customers(conn, num_customers)
-            await insert_products(conn)
-            
-            # Populate product embeddings from product_data.json
-            logging.info("\n" + "=" * 50)
-            logging.info("POPULATING PRODUCT EMBEDDINGS")
-            logging.info("=" * 50)
-            await populate_product_image_embeddings(conn, clear_existing=True)
-            await populate_product_description_embeddings(conn, clear_existing=True)
-            
-            # Verify embeddings were populated
-            logging.info("\n" + "=" * 50)
-            logging.info("VERIFYING PRODUCT EMBEDDINGS")
-            logging.info("=" * 50)
-            await verify_embeddings_table(conn)
-            await verify_description_embeddings_table(conn)
-            
-            # Insert inventory data
-            logging.info("\n" + "=" * 50)
-            logging.info("INSERTING INVENTORY DATA")
-            logging.info("=" * 50)
-            await insert_inventory(conn)
-            
-            # Insert order data
-            logging.info("\n" + "=" * 50)
-            logging.info("INSERTING ORDER DATA")
-            logging.info("=" * 50)
-            await insert_orders(conn, num_customers)
-            
-            # Verify the database was created and has data
-            logging.info("\n" + "=" * 50)
-            logging.info("FINAL DATABASE VERIFICATION")
-            logging.info("=" * 50)
-            await verify_database_contents(conn)
-            
-            # Verify seasonal patterns are working
-            await verify_seasonal_patterns(conn)
-            
-            logging.info("\n" + "=" * 50)
-            logging.info("DATABASE GENERATION COMPLETE")
-            logging.info("=" * 50)
+            await run_generation_pipeline(conn, params, stages=stages, resume=resume)
             
+            log_section("DATABASE GENERATION COMPLETE")
             logging.info("Database generation completed successfully.")
         except Exception as e:
             logging.error(f"Error during database generation: {e}")
@@ -1812,6 +2362,14 @@ async def show_database_stats():
     finally:
         await conn.close()
 
+def parse_stages(value: str) -> List[str]:
+    """Parse a comma-separated list of pipeline stage names"""
+    stages = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in PIPELINE_STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown stage(s): {', '.join(unknown)}. Choose from: {', '.join(PIPELINE_STAGES)}")
+    return stages
+
 async def main():
     """Main function to handle command line arguments"""
     import argparse
@@ -1820,18 +2378,42 @@ async def main():
     parser = argparse.ArgumentParser(description='Generate PostgreSQL database with product embeddings')
     parser.add_argument('--show-stats', action='store_true', 
                        help='Show database statistics instead of generating')
+    parser.add_argument('--show-checkpoints', action='store_true',
+                       help='Show the checkpoint status of each generation stage')
+    parser.add_argument('--stages', type=parse_stages, metavar='STAGE[,STAGE...]',
+                       help=f'Only (re-)run these generation stages: {", ".join(PIPELINE_STAGES)}')
+    parser.add_argument('--resume', action='store_true',
+                       help='Run only the stages that have not completed with the current options')
     parser.add_argument('--embeddings-only', action='store_true',
                        help='Only populate product embeddings (database must already exist)')
     parser.add_argument('--verify-embeddings', action='store_true',
                        help='Only verify embeddings table and show sample data')
     parser.add_argument('--verify-seasonal', action='store_true',
                        help='Only verify seasonal patterns in existing database')
+    parser.add_argument('--verify-sample', type=float, metavar='PERCENT',
+                       help='Verify a TABLESAMPLE percentage of orders instead of the full tables (for very large datasets)')
     parser.add_argument('--clear-embeddings', action='store_true',
                        help='Clear existing embeddings before populating (used with --embeddings-only)')
     parser.add_argument('--batch-size', type=int, default=100,
-                       help='Batch size for processing embeddings (default: 100)')
+                       help='Deprecated and ignored: embeddings are loaded with a single COPY')
     parser.add_argument('--num-customers', type=int, default=50000,
                        help='Number of customers to generate (default: 50000)')
+    parser.add_argument('--scale-factor', type=int, choices=sorted(SCALE_FACTORS),
+                       help='TPC-style preset scaling customers, stores and order history together (overrides --num-customers, uses the numpy generator)')
+    parser.add_argument('--benchmark-orders', type=int, metavar='N',
+                       help='Benchmark order generation for N customers against an existing database (no writes)')
+    parser.add_argument('--loader', choices=['insert', 'copy'], default='insert',
+                       help='Bulk loading method: batched INSERTs or binary COPY with deferred indexes (default: insert)')
+    parser.add_argument('--generator', choices=['python', 'numpy'], default='python',
+                       help='Order generator: row-by-row Python or vectorized NumPy (default: python)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for reproducible datasets')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for order generation; more than 1 generates customer shards in parallel, each loading over its own COPY connection (default: 1)')
+    parser.add_argument('--shard-customers', type=int, default=DEFAULT_SHARD_CUSTOMERS,
+                       help=f'Customers per order generation shard for the numpy generator (default: {DEFAULT_SHARD_CUSTOMERS})')
+    parser.add_argument('--unlogged', action='store_true',
+                       help='Load bulk tables as UNLOGGED and switch them to LOGGED afterwards (used with --loader copy)')
     
     args = parser.parse_args()
     
@@ -1839,6 +2421,8 @@ async def main():
         if args.show_stats:
             # Show database statistics
             await show_database_stats()
+        elif args.show_checkpoints:
+            await show_checkpoints()
         elif args.verify_embeddings:
             # Verify embeddings only
             conn = await create_connection()
@@ -1849,17 +2433,20 @@ async def main():
                 await conn.close()
         elif args.verify_seasonal:
             # Verify seasonal patterns only
+            await verify_generated_data(args.verify_sample, seasonal_only=True)
+        elif args.benchmark_orders:
+            # Benchmark order generation only
             conn = await create_connection()
             try:
-                await verify_seasonal_patterns(conn)
+                await benchmark_order_generation(conn, args.benchmark_orders)
             finally:
                 await conn.close()
         elif args.embeddings_only:
             # Populate embeddings only
             conn = await create_connection()
             try:
-                await populate_product_image_embeddings(conn, clear_existing=args.clear_embeddings, batch_size=args.batch_size)
-                await populate_product_description_embeddings(conn, clear_existing=args.clear_embeddings, batch_size=args.batch_size)
+                await populate_product_image_embeddings(conn, clear_existing=args.clear_embeddings)
+                await populate_product_description_embeddings(conn, clear_existing=args.clear_embeddings)
                 await verify_embeddings_table(conn)
                 await verify_description_embeddings_table(conn)
             finally:
@@ -1868,7 +2455,19 @@ async def main():
             # Generate the complete database
             logging.info(f"Database will be created at {POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}/{POSTGRES_CONFIG['database']}")
             logging.info(f"Schema: {SCHEMA_NAME}")
-            await generate_postgresql_database(num_customers=args.num_customers)
+            await generate_postgresql_database(
+                num_customers=args.num_customers,
+                loader=args.loader,
+                unlogged=args.unlogged,
+                generator=args.generator,
+                seed=args.seed,
+                workers=args.workers,
+                shard_customers=args.shard_customers,
+                scale_factor=args.scale_factor,
+                stages=args.stages,
+                resume=args.resume,
+                verify_sample=args.verify_sample,
+            )
             
             logging.info("\nDatabase generated successfully!")
             logging.info(f"Host: {POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}")
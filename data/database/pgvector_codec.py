@@ -0,0 +1,31 @@
+"""
+Binary codec for the pgvector vector type.
+
+asyncpg has no built-in codec for vector, so embeddings would otherwise be sent as text
+literals. Registering this codec lets embeddings be loaded with binary COPY.
+
+USAGE:
+    await register_vector_codec(conn)
+    await conn.copy_records_to_table('product_image_embeddings', records=rows, columns=[...])
+"""
+
+import struct
+
+import asyncpg
+import numpy as np
+
+
+def encode_vector(values) -> bytes:
+    """Encode a sequence of floats in the pgvector binary format (dimensions, unused, float4 values)"""
+    array = np.asarray(values, dtype='>f4')
+    return struct.pack('>HH', len(array), 0) + array.tobytes()
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """Decode a pgvector binary value into a float32 array"""
+    dimensions, _ = struct.unpack_from('>HH', data)
+    return np.frombuffer(data, dtype='>f4', count=dimensions, offset=4).astype(np.float32)
+
+async def register_vector_codec(conn: asyncpg.Connection) -> None:
+    """Register a binary codec for the pgvector vector type so embeddings can be loaded with COPY"""
+    vector_schema = await conn.fetchval("SELECT typnamespace::regnamespace::text FROM pg_type WHERE typname = 'vector'")
+    await conn.set_type_codec('vector', schema=vector_schema, encoder=encode_vector, decoder=decode_vector, format='binary')
@@ -0,0 +1,337 @@
+"""
+Shared loader for product_data.json with embeddings kept in sidecar files.
+
+product_data.json used to carry a 512-float image embedding and a 1536-float description
+embedding inline for every product, so every script spent most of its startup parsing
+floats it never used. Embeddings now live next to the JSON in one store per field:
+
+    product_data.image_embedding.f32        float32 matrix, one row per entry
+    product_data.image_embedding.skus       dimension header, then SKU, content hash and model of each row
+    product_data.description_embedding.f32
+    product_data.description_embedding.skus
+
+The matrix is memory-mapped and rows are only decoded when an embedding is requested,
+so loading the catalog costs about as much as parsing names, descriptions and prices.
+Stores are append-only: saving a new embedding writes one row, not the whole catalog.
+
+Each row records a hash of the content it was computed from and the model that computed
+it, so embedding scripts can re-embed only products whose text, image or model changed.
+
+A product_data.json that still has inline embedding arrays keeps working (inline values
+take precedence); run format_embeddings.py once to move them into the stores.
+
+USAGE:
+    from product_catalog import ProductCatalog
+
+    catalog = ProductCatalog.load()
+    for category_name, product_type, product in catalog.products():
+        embedding = catalog.embedding(product, "image_embedding")
+
+    source = EmbeddingSource(content_hash(text), "text-embedding-3-small")
+    if catalog.needs_embedding(product, "description_embedding", source):
+        catalog.set_embedding(product, "description_embedding", vector, source)  # appends one row
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "product_data.json"
+
+# Product fields whose values are stored as embedding matrices instead of JSON arrays
+EMBEDDING_FIELDS = ("image_embedding", "description_embedding")
+
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+# First line of a SKU index, followed by the number of float32 values per row
+INDEX_HEADER = "#dimension="
+
+
+class EmbeddingSource(NamedTuple):
+    """What an embedding was computed from: a hash of the embedded content and the model"""
+
+    content_hash: str
+    model: str
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    """SHA-256 of embedded text or image bytes"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only float32 embedding matrix with a SKU index, memory-mapped for reads.
+
+    Each index line is a SKU, optionally followed by the tab-separated content hash and
+    model of its row. Adding an embedding appends one row to the matrix and then one line to the index, so
+    an interrupted write leaves at most a trailing row without a SKU, which is ignored and
+    overwritten by the next append. Re-adding a SKU appends a new row that supersedes the
+    old one; compact() drops superseded rows.
+    """
+
+    def __init__(self, matrix_path: Path, index_path: Path) -> None:
+        self.matrix_path = matrix_path
+        self.index_path = index_path
+        self._dimension: Optional[int] = None
+        self._skus: Optional[List[str]] = None
+        self._rows: Dict[str, int] = {}
+        self._sources: Dict[str, EmbeddingSource] = {}
+        self._matrix: Optional[np.ndarray] = None
+
+    @classmethod
+    def for_field(cls, catalog_path: Path, field: str) -> "EmbeddingStore":
+        """Store for an embedding field next to a catalog JSON file"""
+        base = catalog_path.with_suffix("")
+        return cls(base.with_name(f"{base.name}.{field}.f32"), base.with_name(f"{base.name}.{field}.skus"))
+
+    def exists(self) -> bool:
+        return self.index_path.exists() and self.matrix_path.exists()
+
+    def _load(self) -> None:
+        if self._skus is not None:
+            return
+
+        self._dimension = None
+        lines = []
+        if self.exists():
+            lines = self.index_path.read_text(encoding="utf-8").splitlines()
+            if lines and lines[0].startswith(INDEX_HEADER):
+                self._dimension = int(lines[0][len(INDEX_HEADER):])
+                lines = lines[1:]
+            if self._dimension:
+                # Ignore index lines whose row never made it to the matrix
+                complete_rows = self.matrix_path.stat().st_size // (self._dimension * EMBEDDING_DTYPE.itemsize)
+                del lines[complete_rows:]
+            else:
+                lines = []
+
+        self._skus = []
+        self._rows = {}
+        self._sources = {}
+        for row, line in enumerate(lines):
+            sku, *source = line.split("\t")
+            self._skus.append(sku)
+            # Later rows for the same SKU replace earlier ones
+            self._rows[sku] = row
+            if len(source) == 2:
+                self._sources[sku] = EmbeddingSource(*source)
+            else:
+                self._sources.pop(sku, None)
+        self._matrix = None
+
+    def _mapped(self) -> np.ndarray:
+        if self._matrix is None or len(self._matrix) != len(self._skus):
+            if self._skus:
+                self._matrix = np.memmap(self.matrix_path, dtype=EMBEDDING_DTYPE, mode="r",
+                                         shape=(len(self._skus), self._dimension))
+            else:
+                self._matrix = np.empty((0, self._dimension or 0), dtype=EMBEDDING_DTYPE)
+        return self._matrix
+
+    @property
+    def dimension(self) -> Optional[int]:
+        self._load()
+        return self._dimension
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._rows)
+
+    def __contains__(self, sku: str) -> bool:
+        self._load()
+        return sku in self._rows
+
+    def skus(self) -> List[str]:
+        self._load()
+        return list(self._rows)
+
+    def get(self, sku: str) -> Optional[np.ndarray]:
+        """Decode the embedding for a SKU, or None if it has none"""
+        self._load()
+        row = self._rows.get(sku)
+        if row is None:
+            return None
+        return np.array(self._mapped()[row], dtype=np.float32)
+
+    def source(self, sku: str) -> Optional[EmbeddingSource]:
+        """Content hash and model the SKU's embedding was computed from, if recorded"""
+        self._load()
+        return self._sources.get(sku)
+
+    @staticmethod
+    def _index_line(sku: str, source: Optional[EmbeddingSource]) -> str:
+        return f"{sku}\t{source.content_hash}\t{source.model}\n" if source else f"{sku}\n"
+
+    def append(self, sku: str, embedding: Union[List[float], np.ndarray],
+               source: Optional[EmbeddingSource] = None) -> None:
+        """Add or replace the embedding for a SKU by appending a single row"""
+        self.append_many([(sku, embedding)], [source])
+
+    def append_many(self, items: List[Tuple[str, Union[List[float], np.ndarray]]],
+                    sources: Optional[List[Optional[EmbeddingSource]]] = None) -> None:
+        """Add or replace embeddings for several SKUs with one write to each file"""
+        if not items:
+            return
+        sources = sources or [None] * len(items)
+        self._load()
+        matrix = np.asarray([embedding for _, embedding in items], dtype=EMBEDDING_DTYPE)
+        if self._dimension is None:
+            self._dimension = matrix.shape[1]
+            self.index_path.write_text(f"{INDEX_HEADER}{self._dimension}\n", encoding="utf-8")
+            self.matrix_path.write_bytes(b"")
+        elif matrix.ndim != 2 or matrix.shape[1] != self._dimension:
+            raise ValueError(f"Embeddings have shape {matrix.shape}, store has {self._dimension} dimensions")
+
+        first_row = len(self._skus)
+        with self.matrix_path.open("r+b") as f:
+            # Drop any partial or orphaned row left by an interrupted append
+            f.truncate(first_row * self._dimension * EMBEDDING_DTYPE.itemsize)
+            f.seek(0, 2)
+            f.write(matrix.tobytes())
+        with self.index_path.open("a", encoding="utf-8") as f:
+            f.write("".join(self._index_line(sku, source) for (sku, _), source in zip(items, sources)))
+
+        for offset, ((sku, _), source) in enumerate(zip(items, sources)):
+            self._skus.append(sku)
+            self._rows[sku] = first_row + offset
+            if source:
+                self._sources[sku] = source
+            else:
+                self._sources.pop(sku, None)
+
+    def write(self, embeddings: Dict[str, Union[List[float], np.ndarray]],
+              sources: Optional[Dict[str, EmbeddingSource]] = None) -> None:
+        """Replace the store contents with the given SKU to embedding mapping"""
+        sources = sources or {}
+        matrix = np.asarray(list(embeddings.values()), dtype=EMBEDDING_DTYPE)
+        dimension = matrix.shape[1] if matrix.ndim == 2 else 0
+        # Release the mapping before the file underneath it is replaced
+        self._matrix = None
+        self.matrix_path.write_bytes(matrix.tobytes())
+        index = "".join(self._index_line(sku, sources.get(sku)) for sku in embeddings)
+        self.index_path.write_text(f"{INDEX_HEADER}{dimension}\n" + index, encoding="utf-8")
+        self._skus = None
+
+    def compact(self) -> int:
+        """Rewrite the store without superseded rows
+
+        Returns:
+            Number of rows removed
+        """
+        self._load()
+        superseded = len(self._skus) - len(self._rows)
+        if superseded:
+            self.write({sku: self.get(sku) for sku in self._rows}, dict(self._sources))
+        return superseded
+
+
+class ProductCatalog:
+    """product_data.json contents with lazily decoded embeddings."""
+
+    def __init__(self, data: Dict[str, Any], path: Path = DEFAULT_CATALOG_PATH) -> None:
+        self.data = data
+        self.path = Path(path)
+        self._stores: Dict[str, EmbeddingStore] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = DEFAULT_CATALOG_PATH) -> "ProductCatalog":
+        """Load the catalog JSON; embedding stores are opened on first use"""
+        path = Path(path)
+        with path.open("r", encoding="utf-8") as f:
+            return cls(json.load(f), path)
+
+    @property
+    def main_categories(self) -> Dict[str, Any]:
+        return self.data.get("main_categories", {})
+
+    def products(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (category_name, product_type, product) for every product"""
+        for category_name, category_data in self.main_categories.items():
+            for product_type, products in category_data.items():
+                # Skip non-product keys like seasonal multipliers
+                if not isinstance(products, list):
+                    continue
+                for product in products:
+                    if isinstance(product, dict):
+                        yield category_name, product_type, product
+
+    def store(self, field: str) -> EmbeddingStore:
+        """Embedding store for a field such as "image_embedding" """
+        if field not in self._stores:
+            self._stores[field] = EmbeddingStore.for_field(self.path, field)
+        return self._stores[field]
+
+    def embedding(self, product: Dict[str, Any], field: str) -> Optional[np.ndarray]:
+        """Embedding of a product, from an inline JSON array if present, else from the store"""
+        inline = product.get(field)
+        if inline:
+            return np.asarray(inline, dtype=np.float32)
+        sku = product.get("sku")
+        return self.store(field).get(sku) if sku else None
+
+    def set_embedding(self, product: Dict[str, Any], field: str, embedding: Union[List[float], np.ndarray],
+                      source: Optional[EmbeddingSource] = None) -> None:
+        """Store an embedding for a product by appending it to the field's store"""
+        self.set_embeddings(field, [(product, embedding)], [source])
+
+    def set_embeddings(self, field: str, items: List[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]],
+                       sources: Optional[List[Optional[EmbeddingSource]]] = None) -> None:
+        """Store embeddings for several products with a single append to the field's store"""
+        self.store(field).append_many([(product["sku"], embedding) for product, embedding in items], sources)
+        # An inline array would take precedence over the stored row
+        for product, _ in items:
+            product.pop(field, None)
+
+    def has_embedding(self, product: Dict[str, Any], field: str) -> bool:
+        if product.get(field):
+            return True
+        sku = product.get("sku")
+        return bool(sku) and sku in self.store(field)
+
+    def needs_embedding(self, product: Dict[str, Any], field: str, source: EmbeddingSource) -> bool:
+        """Whether a product has no embedding computed from this content with this model
+
+        Inline arrays and rows stored without a source cannot be checked and count as stale.
+        """
+        sku = product.get("sku")
+        if product.get(field) or not sku:
+            return True
+        return self.store(field).source(sku) != source
+
+    def save(self) -> None:
+        """Write the catalog JSON (embedding stores are written separately)"""
+        with self.path.open("w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+
+    def move_embeddings_to_stores(self) -> Dict[str, int]:
+        """Move inline embedding arrays into the sidecar stores and drop them from the JSON
+
+        Stores are rewritten without superseded rows even when nothing was moved.
+
+        Returns:
+            Number of embeddings moved per field
+        """
+        moved = {}
+        for field in EMBEDDING_FIELDS:
+            store = self.store(field)
+            embeddings = {sku: store.get(sku) for sku in store.skus()}
+            sources = {sku: store.source(sku) for sku in embeddings if store.source(sku)}
+            count = 0
+            for _, _, product in self.products():
+                inline = product.pop(field, None)
+                if inline and product.get("sku"):
+                    embeddings[product["sku"]] = np.asarray(inline, dtype=np.float32)
+                    # Inline arrays carry no record of what they were computed from
+                    sources.pop(product["sku"], None)
+                    count += 1
+            if count:
+                store.write(embeddings, sources)
+            else:
+                store.compact()
+            moved[field] = count
+        return moved
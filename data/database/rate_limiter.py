@@ -0,0 +1,139 @@
+"""
+Client-side rate limiting for concurrent embedding requests.
+
+Azure OpenAI deployments have a tokens-per-minute and a requests-per-minute quota and
+answer with 429 plus a retry-after header once either is exceeded. RateLimiter keeps
+requests under configured quotas with token buckets, and backs off on throttling by
+pausing every worker for the retry-after period and halving the number of requests in
+flight. Concurrency grows back one slot at a time as requests succeed.
+
+USAGE:
+    limiter = RateLimiter(max_concurrency=8, tokens_per_minute=350_000)
+
+    async with limiter.slot(estimated_tokens):
+        response = await client.embeddings.create(...)
+    await limiter.succeeded()
+    # or, on a 429: limiter.throttled(retry_after_seconds(error, default=1.0))
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+
+class TokenBucket:
+    """Bucket refilled continuously at a per-minute rate; acquire() waits until enough is available."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.available = per_minute
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount: float) -> None:
+        # A request larger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        # Waiters are served in arrival order while the lock is held
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+
+class RateLimiter:
+    """Token-bucket quotas plus adaptive concurrency that backs off on 429 responses."""
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int = 0, requests_per_minute: int = 0) -> None:
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.resume_at = 0.0
+        self.condition = asyncio.Condition()
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[None]:
+        """Wait for a concurrency slot, any retry-after pause and quota for one request"""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            while (delay := self.resume_at - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            if self.request_bucket:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket:
+                await self.token_bucket.acquire(tokens)
+            yield
+        finally:
+            async with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def throttled(self, retry_after: float) -> None:
+        """Pause all requests for retry_after seconds and halve concurrency"""
+        self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+        self.concurrency = max(1, self.concurrency // 2)
+        self.successes = 0
+
+    async def succeeded(self) -> None:
+        """Record a successful request; a full round of successes adds a concurrency slot"""
+        self.successes += 1
+        if self.concurrency < self.max_concurrency and self.successes >= self.concurrency:
+            self.concurrency += 1
+            self.successes = 0
+            async with self.condition:
+                self.condition.notify_all()
+
+
+def retry_after_seconds(error: Exception, default: float) -> float:
+    """Delay requested by a throttled response's retry-after-ms or retry-after header"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                # retry-after may also be an HTTP date; fall back to the default
+                pass
+    return default
+
+
+@dataclass
+class ThroughputStats:
+    """Running totals for embedding requests."""
+
+    started: float = field(default_factory=time.perf_counter)
+    items: int = 0
+    tokens: int = 0
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+
+    def record(self, items: int, tokens: int) -> None:
+        self.items += items
+        self.tokens += tokens
+        self.requests += 1
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def rates(self) -> str:
+        return f"{self.items / self.elapsed:.1f} items/s, {self.tokens / self.elapsed:.0f} tokens/s"
+
+    def summary(self) -> str:
+        return (f"{self.items} items, {self.tokens} tokens in {self.requests} requests over {self.elapsed:.1f}s "
+                f"({self.rates()}); {self.throttled} throttled, {self.retries} retried")
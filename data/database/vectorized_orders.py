@@ -0,0 +1,387 @@
+"""
+Vectorized order and order item generator for the Zava database generator.
+
+Draws the same distributions as generate_order_batches() in generate_zava_postgres.py
+(store assignment, orders per customer, yearly growth, Washington seasonal categories,
+products, quantities, price variation and discounts) but as NumPy arrays for a whole
+batch of customers at once, instead of one Python-level random call per value.
+
+The generator holds only plain data, so it can be pickled and sent to worker processes.
+Given the same seed it produces the same dataset. plan_shards() splits the customer range
+into independently seeded shards with non-overlapping order IDs for parallel generation.
+
+Customers, orders and order items are drawn from separate random streams, so orders and
+order items can be streamed into two COPY commands one after the other (iter_orders() and
+iter_order_items()) with memory bounded by one batch of customers.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+# Distributions shared with the pure-Python generator
+ORDERS_PER_CUSTOMER = ([0, 1, 2, 3, 4, 5], [20, 40, 20, 10, 7, 3])
+ITEMS_PER_ORDER = ([1, 2, 3, 4, 5], [40, 30, 15, 10, 5])
+QUANTITY_PER_ITEM = ([1, 2, 3, 4, 5], [60, 25, 10, 3, 2])
+DISCOUNT_PERCENTS = [5, 10, 15, 20, 25]
+SEASONAL_CATEGORY_PROBABILITY = 0.85
+SEASONAL_PRODUCT_PROBABILITY = 0.9
+DISCOUNT_PROBABILITY = 0.15
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+OrderBatch = Tuple[int, int, List[Tuple], List[Tuple]]
+SeedLike = Optional[Union[int, np.random.SeedSequence]]
+
+
+def _probabilities(weights) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights / weights.sum()
+
+
+def _split_seed(seed: SeedLike) -> Tuple[np.random.SeedSequence, ...]:
+    """Derive independent seeds for the customer, order and order item random streams.
+
+    Built from the entropy and spawn key rather than SeedSequence.spawn(), which is
+    stateful and would give different children on every call.
+    """
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return tuple(
+        np.random.SeedSequence(sequence.entropy, spawn_key=(*sequence.spawn_key, stream)) for stream in range(3)
+    )
+
+
+class OrderArrays(NamedTuple):
+    """Column arrays for a batch of orders"""
+
+    order_ids: np.ndarray
+    customer_ids: np.ndarray
+    store_ids: np.ndarray
+    order_dates: np.ndarray
+    categories: np.ndarray
+
+
+@dataclass(frozen=True)
+class OrderShard:
+    """A customer range generated by one worker, with its own seed and order ID block"""
+
+    index: int
+    first_customer_id: int
+    last_customer_id: int
+    first_order_id: int
+    seed: np.random.SeedSequence
+
+
+@dataclass
+class VectorizedOrderGenerator:
+    """Generates orders and order items for ranges of customers with NumPy.
+
+    Attributes:
+        store_ids: Database store_id per store, in the same order as store_weights
+        store_weights: Customer distribution weight per store
+        store_order_multipliers: Order frequency multiplier per store
+        years: Candidate order years
+        year_weights: Growth weight per year
+        category_month_weights: (num_categories, 12) seasonal weights, 1.0 for non-seasonal categories
+        category_products: Positions into product_ids per category, in the same order as category_month_weights
+        product_ids: All product IDs
+        product_prices: Base price per product, aligned with product_ids
+        seasonal: Whether seasonal trends are active
+    """
+
+    store_ids: np.ndarray
+    store_weights: np.ndarray
+    store_order_multipliers: np.ndarray
+    years: np.ndarray
+    year_weights: np.ndarray
+    category_month_weights: np.ndarray
+    category_products: List[np.ndarray]
+    product_ids: np.ndarray
+    product_prices: np.ndarray
+    seasonal: bool
+    _category_sizes: np.ndarray = field(init=False, repr=False)
+    _category_offsets: np.ndarray = field(init=False, repr=False)
+    _category_flat: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Flatten the per-category product positions for vectorized lookup
+        self._category_sizes = np.array([len(positions) for positions in self.category_products], dtype=np.int64)
+        self._category_offsets = np.concatenate(([0], np.cumsum(self._category_sizes)[:-1])).astype(np.int64)
+        self._category_flat = (
+            np.concatenate(self.category_products).astype(np.int64) if self.category_products else np.array([], np.int64)
+        )
+
+    @classmethod
+    def from_catalog(
+        cls,
+        stores: Dict[str, Dict],
+        store_ids: Dict[str, int],
+        year_weights: Dict[int, float],
+        categories: Dict[str, Optional[List[float]]],
+        category_products: Dict[str, List[int]],
+        product_prices: Dict[int, float],
+    ) -> "VectorizedOrderGenerator":
+        """Build a generator from the reference data and the loaded product catalog.
+
+        Args:
+            stores: Store configuration keyed by store name (reference_data.json)
+            store_ids: Store name to store_id mapping
+            year_weights: Growth weight per order year
+            categories: Category name to its 12 monthly seasonal multipliers, or None
+            category_products: Category name to product IDs
+            product_prices: Product ID to base price
+        """
+        store_names = list(stores.keys())
+        missing_stores = [name for name in store_names if name not in store_ids]
+        if missing_stores:
+            raise ValueError(f"No store_id found for store(s): {', '.join(missing_stores)}")
+        product_ids = list(product_prices.keys())
+        position = {pid: i for i, pid in enumerate(product_ids)}
+        month_weights = [multipliers if multipliers else [1.0] * 12 for multipliers in categories.values()]
+
+        return cls(
+            store_ids=np.array([store_ids[name] for name in store_names], dtype=np.int64),
+            store_weights=np.array([stores[name]["customer_distribution_weight"] for name in store_names], dtype=np.float64),
+            store_order_multipliers=np.array(
+                [stores[name].get("order_frequency_multiplier", 1.0) for name in store_names], dtype=np.float64
+            ),
+            years=np.array(list(year_weights.keys()), dtype=np.int64),
+            year_weights=np.array(list(year_weights.values()), dtype=np.float64),
+            category_month_weights=np.array(month_weights, dtype=np.float64),
+            category_products=[
+                np.array([position[pid] for pid in category_products.get(name, [])], dtype=np.int64)
+                for name in categories
+            ],
+            product_ids=np.array(product_ids, dtype=np.int64),
+            product_prices=np.array([product_prices[pid] for pid in product_ids], dtype=np.float64),
+            seasonal=any(multipliers for multipliers in categories.values()),
+        )
+
+    def draw_customers(self, num_customers: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw the preferred store and number of orders for each customer.
+
+        Returns:
+            Tuple of (store index per customer, orders per customer)
+        """
+        store_index = rng.choice(len(self.store_ids), size=num_customers, p=_probabilities(self.store_weights))
+        base_orders = rng.choice(ORDERS_PER_CUSTOMER[0], size=num_customers, p=_probabilities(ORDERS_PER_CUSTOMER[1]))
+        orders_per_customer = np.maximum(
+            1, np.floor(base_orders * self.store_order_multipliers[store_index]).astype(np.int64)
+        )
+        return store_index, orders_per_customer
+
+    def draw_orders(
+        self,
+        first_customer_id: int,
+        store_index: np.ndarray,
+        orders_per_customer: np.ndarray,
+        first_order_id: int,
+        rng: np.random.Generator,
+    ) -> OrderArrays:
+        """Draw the orders of consecutive customers starting at first_customer_id.
+
+        Order IDs are assigned consecutively starting at first_order_id.
+
+        Args:
+            first_customer_id: Customer ID of the first entry in store_index
+            store_index: Preferred store per customer, from draw_customers()
+            orders_per_customer: Number of orders per customer, from draw_customers()
+            first_order_id: Order ID of the first generated order
+            rng: Random generator for the order level draws
+        """
+        customer_ids = np.arange(first_customer_id, first_customer_id + len(store_index), dtype=np.int64)
+        num_orders = int(orders_per_customer.sum())
+
+        # Date with yearly growth, seasonal category for the month
+        years = self.years[rng.choice(len(self.years), size=num_orders, p=_probabilities(self.year_weights))]
+        months = rng.integers(1, 13, size=num_orders)
+        categories = self._choose_categories(months, rng)
+
+        days_in_month = DAYS_IN_MONTH[months - 1] + ((months == 2) & (years % 4 == 0))
+        days = 1 + np.floor(rng.random(num_orders) * days_in_month).astype(np.int64)
+        order_dates = (
+            (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+            + (months - 1).astype("timedelta64[M]")
+        ).astype("datetime64[D]") + (days - 1).astype("timedelta64[D]")
+
+        return OrderArrays(
+            order_ids=np.arange(first_order_id, first_order_id + num_orders, dtype=np.int64),
+            customer_ids=np.repeat(customer_ids, orders_per_customer),
+            store_ids=np.repeat(self.store_ids[store_index], orders_per_customer),
+            order_dates=order_dates,
+            categories=categories,
+        )
+
+    def order_item_rows(self, orders: OrderArrays, rng: np.random.Generator) -> Iterator[Tuple]:
+        """Draw the items of a batch of orders: products from the order's category, quantity, price and discount.
+
+        Returns:
+            Iterator of row tuples matching ORDER_ITEM_COLUMNS
+        """
+        items_per_order = rng.choice(ITEMS_PER_ORDER[0], size=len(orders.order_ids), p=_probabilities(ITEMS_PER_ORDER[1]))
+        item_order_index = np.repeat(np.arange(len(orders.order_ids)), items_per_order)
+        num_items = len(item_order_index)
+
+        product_index = self._choose_products(orders.categories[item_order_index], rng)
+        quantities = rng.choice(QUANTITY_PER_ITEM[0], size=num_items, p=_probabilities(QUANTITY_PER_ITEM[1]))
+        unit_prices = self.product_prices[product_index] * rng.uniform(0.8, 1.2, size=num_items)
+
+        discounted = rng.random(num_items) < DISCOUNT_PROBABILITY
+        discount_percents = np.where(discounted, rng.choice(DISCOUNT_PERCENTS, size=num_items), 0)
+        discount_amounts = unit_prices * quantities * discount_percents / 100
+        total_amounts = unit_prices * quantities - discount_amounts
+
+        return zip(
+            orders.order_ids[item_order_index].tolist(),
+            orders.store_ids[item_order_index].tolist(),
+            self.product_ids[product_index].tolist(),
+            quantities.tolist(),
+            unit_prices.tolist(),
+            discount_percents.tolist(),
+            discount_amounts.tolist(),
+            total_amounts.tolist(),
+        )
+
+    @staticmethod
+    def order_rows(orders: OrderArrays) -> Iterator[Tuple]:
+        """Row tuples for (order_id, customer_id, store_id, order_date)"""
+        return zip(
+            orders.order_ids.tolist(),
+            orders.customer_ids.tolist(),
+            orders.store_ids.tolist(),
+            orders.order_dates.tolist(),
+        )
+
+    def count_orders(self, first_customer_id: int, last_customer_id: int, seed: SeedLike = None) -> int:
+        """Number of orders generated for a customer range and seed, without generating them"""
+        customer_seed, _, _ = _split_seed(seed)
+        _, orders_per_customer = self.draw_customers(
+            last_customer_id - first_customer_id + 1, np.random.default_rng(customer_seed)
+        )
+        return int(orders_per_customer.sum())
+
+    def _order_batches(
+        self,
+        first_customer_id: int,
+        last_customer_id: int,
+        first_order_id: int,
+        seed: SeedLike,
+        batch_customers: int,
+    ) -> Iterator[Tuple[int, OrderArrays]]:
+        customer_seed, order_seed, _ = _split_seed(seed)
+        store_index, orders_per_customer = self.draw_customers(
+            last_customer_id - first_customer_id + 1, np.random.default_rng(customer_seed)
+        )
+        rng = np.random.default_rng(order_seed)
+        next_order_id = first_order_id
+
+        for batch_start in range(first_customer_id, last_customer_id + 1, batch_customers):
+            batch_end = min(batch_start + batch_customers - 1, last_customer_id)
+            offset = batch_start - first_customer_id
+            batch = slice(offset, offset + batch_end - batch_start + 1)
+            orders = self.draw_orders(batch_start, store_index[batch], orders_per_customer[batch], next_order_id, rng)
+            next_order_id += len(orders.order_ids)
+            yield batch_end, orders
+
+    def generate_batches(
+        self,
+        first_customer_id: int,
+        last_customer_id: int,
+        first_order_id: int = 1,
+        seed: SeedLike = None,
+        batch_customers: int = 1000,
+    ) -> Iterator[OrderBatch]:
+        """Generate orders and order items for a customer range (inclusive) in batches.
+
+        Yields:
+            Tuples of (last_customer_id, total_orders, orders_data, order_items_data),
+            where total_orders counts the orders generated so far in this range
+        """
+        _, _, item_seed = _split_seed(seed)
+        item_rng = np.random.default_rng(item_seed)
+        total_orders = 0
+
+        for batch_end, orders in self._order_batches(
+            first_customer_id, last_customer_id, first_order_id, seed, batch_customers
+        ):
+            total_orders += len(orders.order_ids)
+            yield batch_end, total_orders, list(self.order_rows(orders)), list(self.order_item_rows(orders, item_rng))
+
+    def iter_orders(
+        self,
+        first_customer_id: int,
+        last_customer_id: int,
+        first_order_id: int = 1,
+        seed: SeedLike = None,
+        batch_customers: int = 1000,
+    ) -> Iterator[Tuple]:
+        """Stream the order rows of a customer range, holding one batch of customers in memory"""
+        for _, orders in self._order_batches(first_customer_id, last_customer_id, first_order_id, seed, batch_customers):
+            yield from self.order_rows(orders)
+
+    def iter_order_items(
+        self,
+        first_customer_id: int,
+        last_customer_id: int,
+        first_order_id: int = 1,
+        seed: SeedLike = None,
+        batch_customers: int = 1000,
+    ) -> Iterator[Tuple]:
+        """Stream the order item rows of a customer range, holding one batch of customers in memory.
+
+        Orders are redrawn from the same seed, so the items match the rows of iter_orders()
+        and of generate_batches() without keeping the orders around.
+        """
+        _, _, item_seed = _split_seed(seed)
+        item_rng = np.random.default_rng(item_seed)
+        for _, orders in self._order_batches(first_customer_id, last_customer_id, first_order_id, seed, batch_customers):
+            yield from self.order_item_rows(orders, item_rng)
+
+    def plan_shards(self, num_customers: int, shard_customers: int, seed: Optional[int] = None) -> List[OrderShard]:
+        """Split customers 1..num_customers into shards that can be generated independently.
+
+        Each shard gets its own seed derived from the root seed and a contiguous block of
+        order IDs sized by count_orders(), so shards never overlap and the dataset depends
+        only on the seed and shard size, not on how many workers generate it.
+        """
+        root = np.random.SeedSequence(seed)
+        shards = []
+        next_order_id = 1
+
+        for index, first_customer_id in enumerate(range(1, num_customers + 1, shard_customers)):
+            last_customer_id = min(first_customer_id + shard_customers - 1, num_customers)
+            shard_seed = np.random.SeedSequence(root.entropy, spawn_key=(index,))
+            shards.append(OrderShard(index, first_customer_id, last_customer_id, next_order_id, shard_seed))
+            next_order_id += self.count_orders(first_customer_id, last_customer_id, shard_seed)
+
+        return shards
+
+    def _choose_categories(self, months: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Pick a category per order, seasonally weighted by month with probability 0.85"""
+        num_categories = len(self.category_month_weights)
+        uniform = rng.integers(0, num_categories, size=len(months))
+        if not self.seasonal:
+            return uniform
+
+        # Inverse-CDF sampling with a different distribution for each month
+        cdf = np.cumsum(self.category_month_weights.T, axis=1)
+        cdf /= cdf[:, -1:]
+        draws = rng.random(len(months))
+        seasonal = np.minimum((draws[:, None] >= cdf[months - 1]).sum(axis=1), num_categories - 1)
+        return np.where(rng.random(len(months)) < SEASONAL_CATEGORY_PROBABILITY, seasonal, uniform)
+
+    def _choose_products(self, item_categories: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Pick a product index per item, from the order's category with probability 0.9"""
+        num_items = len(item_categories)
+        product_index = rng.integers(0, len(self.product_ids), size=num_items)
+        if not self.seasonal:
+            return product_index
+
+        if len(self._category_flat) == 0:
+            return product_index
+
+        item_sizes = self._category_sizes[item_categories]
+        from_category = (rng.random(num_items) < SEASONAL_PRODUCT_PROBABILITY) & (item_sizes > 0)
+        within = np.floor(rng.random(num_items) * np.maximum(item_sizes, 1)).astype(np.int64)
+        flat_index = np.minimum(self._category_offsets[item_categories] + within, len(self._category_flat) - 1)
+        return np.where(from_category, self._category_flat[flat_index], product_index)
@@ -6,15 +6,23 @@ Generates realistic safety documentation for hardware products:
 - Product compliance certificates
 - Installation safety guidelines
 - Environmental impact statements
+
+Document text is generated in the main process; the PDFs are rendered in a process pool
+(--workers, one ReportLab stylesheet built per worker) so rendering the whole catalog
+scales with the number of cores.
 """
 
+import argparse
+import asyncio
 import json
 import logging
 import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import asyncpg
 import markdown
@@ -30,6 +38,13 @@ from reportlab.platypus.flowables import KeepTogether
 fake = Faker()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+DEFAULT_OUTPUT_DIR = "/workspace/manuals"
+DEFAULT_RENDER_WORKERS = os.cpu_count() or 1
+PROGRESS_LOG_INTERVAL_SECONDS = 5.0
+
+# Stylesheet shared by every PDF rendered in this process, see get_stylesheet()
+_stylesheet = None
+
 SDS_TEMPLATE = """
 # SAFETY DATA SHEET
 ## {product_name}
@@ -639,20 +654,8 @@ def markdown_to_pdf_paragraphs(markdown_text: str, styles) -> List:
     
     return paragraphs
 
-def create_pdf_document(content: str, filename: str, output_dir: str = "/workspace/manuals") -> str:
-    """Create a PDF document from markdown content"""
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Full path for the PDF
-    pdf_path = Path(output_dir) / filename
-    
-    # Create the PDF document
-    doc = SimpleDocTemplate(str(pdf_path), pagesize=letter,
-                          rightMargin=72, leftMargin=72,
-                          topMargin=72, bottomMargin=18)
-    
-    # Get styles and create custom ones
+def build_stylesheet():
+    """Build the ReportLab sample stylesheet with the Zava custom styles added"""
     styles = getSampleStyleSheet()
     
     # Create custom styles that won't conflict
@@ -687,6 +690,30 @@ def create_pdf_document(content: str, filename: str, output_dir: str = "/workspa
     styles.add(title_style)
     styles.add(header_style)
     styles.add(subheader_style)
+    return styles
+
+def get_stylesheet():
+    """Stylesheet for this process, built on first use and reused for every document"""
+    global _stylesheet
+    if _stylesheet is None:
+        _stylesheet = build_stylesheet()
+    return _stylesheet
+
+def create_pdf_document(content: str, filename: str, output_dir: str = DEFAULT_OUTPUT_DIR) -> str:
+    """Create a PDF document from markdown content"""
+    # Create output directory if it doesn't exist
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    # Full path for the PDF
+    pdf_path = Path(output_dir) / filename
+    
+    # Create the PDF document
+    doc = SimpleDocTemplate(str(pdf_path), pagesize=letter,
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=18)
+    
+    # Styles are only read while building, so one stylesheet serves every document
+    styles = get_stylesheet()
     
     # Build content
     content_paragraphs = []
@@ -723,7 +750,92 @@ def create_pdf_document(content: str, filename: str, output_dir: str = "/workspa
     
     return str(pdf_path)
 
-async def generate_safety_documents(conn: asyncpg.Connection, max_products: Optional[int] = None) -> None:
+def build_product_documents(product: Dict) -> List[Tuple[str, str]]:
+    """Generate the markdown documents for one product as (content, PDF filename) pairs"""
+    product_dict = dict(product)
+    sku = product['sku'].replace('/', '_').replace(' ', '_')  # Sanitize SKU for filename
+    documents = []
+    
+    # Generate SDS
+    sds_content = generate_sds_content(product_dict, product['category'])
+    sds_document = SDS_TEMPLATE.format(
+        product_name=product['name'],
+        sku=product['sku'],
+        revision_date=fake.date_between(start_date='-2y', end_date='today').strftime('%Y-%m-%d'),
+        sds_number=f"{random.randint(1000, 9999)}",
+        version="1.0",
+        **sds_content
+    )
+    documents.append((sds_document, f"{sku}_SDS.pdf"))
+    
+    # Generate compliance certificate
+    compliance_content = generate_compliance_content(product_dict, product['category'])
+    compliance_document = COMPLIANCE_TEMPLATE.format(
+        product_name=product['name'],
+        sku=product['sku'],
+        cert_number=f"{random.randint(10000, 99999)}",
+        issue_date=fake.date_between(start_date='-1y', end_date='today').strftime('%Y-%m-%d'),
+        expiry_date=(datetime.now() + timedelta(days=730)).strftime('%Y-%m-%d'),
+        manufacturing_date=fake.date_between(start_date='-6m', end_date='today').strftime('%Y-%m-%d'),
+        batch_number=f"LOT-{random.randint(100000, 999999)}",
+        **compliance_content
+    )
+    documents.append((compliance_document, f"{sku}_COMPLIANCE.pdf"))
+    
+    # Generate Zava-specific installation quirks document
+    if random.random() < 0.4:  # 40% of products get quirks document
+        quirks_document = generate_zava_quirks_document(product_dict, product['category'])
+        documents.append((quirks_document, f"{sku}_QUIRKS.pdf"))
+    
+    # Generate environmental impact statement for some products
+    if random.random() < 0.3:  # 30% get environmental statements
+        env_document = generate_environmental_statement(product_dict, product['category'])
+        documents.append((env_document, f"{sku}_ENVIRONMENTAL.pdf"))
+    
+    return documents
+
+def log_render_progress(done: int, total: int, started: float) -> None:
+    """Log how many PDFs have been rendered and the current rate"""
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    logging.info(f"Rendered {done}/{total} PDFs ({done / total:.0%}, {done / elapsed:.1f} PDFs/s)")
+
+async def render_pdf_documents(documents: List[Tuple[str, str]], output_dir: str, workers: int) -> List[str]:
+    """Render (content, filename) documents to PDF, in a process pool when workers > 1"""
+    total = len(documents)
+    started = time.perf_counter()
+    last_report = started
+    
+    if workers <= 1 or total <= 1:
+        created_files = []
+        for content, filename in documents:
+            created_files.append(create_pdf_document(content, filename, output_dir))
+            if time.perf_counter() - last_report >= PROGRESS_LOG_INTERVAL_SECONDS:
+                last_report = time.perf_counter()
+                log_render_progress(len(created_files), total, started)
+        log_render_progress(total, total, started)
+        return created_files
+    
+    loop = asyncio.get_running_loop()
+    # Each worker builds its stylesheet once when it starts, not once per document
+    with ProcessPoolExecutor(max_workers=min(workers, total), initializer=get_stylesheet) as pool:
+        futures = [
+            loop.run_in_executor(pool, create_pdf_document, content, filename, output_dir)
+            for content, filename in documents
+        ]
+        done = 0
+        for future in asyncio.as_completed(futures):
+            await future
+            done += 1
+            if time.perf_counter() - last_report >= PROGRESS_LOG_INTERVAL_SECONDS:
+                last_report = time.perf_counter()
+                log_render_progress(done, total, started)
+    
+    log_render_progress(total, total, started)
+    # Report files in product order rather than completion order
+    return [future.result() for future in futures]
+
+async def generate_safety_documents(conn: asyncpg.Connection, max_products: Optional[int] = None,
+                                    output_dir: str = DEFAULT_OUTPUT_DIR, workers: int = DEFAULT_RENDER_WORKERS) -> None:
     """Generate safety documentation for products as PDF files"""
     
     # Get ALL products for safety documentation
@@ -749,67 +861,16 @@ async def generate_safety_documents(conn: asyncpg.Connection, max_products: Opti
     
     logging.info(f"Generating safety documents for {len(products)} products...")
     
-    pdf_count = 0
-    created_files = []
-    
+    # Text generation stays in this process so Faker/random output doesn't depend on the worker count
+    documents = []
     for product in products:
-        product_dict = dict(product)
-        sku = product['sku'].replace('/', '_').replace(' ', '_')  # Sanitize SKU for filename
-        
-        # Generate SDS
-        sds_content = generate_sds_content(product_dict, product['category'])
-        sds_document = SDS_TEMPLATE.format(
-            product_name=product['name'],
-            sku=product['sku'],
-            revision_date=fake.date_between(start_date='-2y', end_date='today').strftime('%Y-%m-%d'),
-            sds_number=f"{random.randint(1000, 9999)}",
-            version="1.0",
-            **sds_content
-        )
-        
-        # Create SDS PDF
-        sds_filename = f"{sku}_SDS.pdf"
-        sds_path = create_pdf_document(sds_document, sds_filename, "/workspace/manuals")
-        created_files.append(sds_path)
-        pdf_count += 1
-        
-        # Generate compliance certificate
-        compliance_content = generate_compliance_content(product_dict, product['category'])
-        compliance_document = COMPLIANCE_TEMPLATE.format(
-            product_name=product['name'],
-            sku=product['sku'],
-            cert_number=f"{random.randint(10000, 99999)}",
-            issue_date=fake.date_between(start_date='-1y', end_date='today').strftime('%Y-%m-%d'),
-            expiry_date=(datetime.now() + timedelta(days=730)).strftime('%Y-%m-%d'),
-            manufacturing_date=fake.date_between(start_date='-6m', end_date='today').strftime('%Y-%m-%d'),
-            batch_number=f"LOT-{random.randint(100000, 999999)}",
-            **compliance_content
-        )
-        
-        # Create Compliance PDF
-        compliance_filename = f"{sku}_COMPLIANCE.pdf"
-        compliance_path = create_pdf_document(compliance_document, compliance_filename, "/workspace/manuals")
-        created_files.append(compliance_path)
-        pdf_count += 1
-        
-        # Generate Zava-specific installation quirks document
-        if random.random() < 0.4:  # 40% of products get quirks document
-            quirks_document = generate_zava_quirks_document(product_dict, product['category'])
-            quirks_filename = f"{sku}_QUIRKS.pdf"
-            quirks_path = create_pdf_document(quirks_document, quirks_filename, "/workspace/manuals")
-            created_files.append(quirks_path)
-            pdf_count += 1
-        
-        # Generate environmental impact statement for some products
-        if random.random() < 0.3:  # 30% get environmental statements
-            env_document = generate_environmental_statement(product_dict, product['category'])
-            env_filename = f"{sku}_ENVIRONMENTAL.pdf"
-            env_path = create_pdf_document(env_document, env_filename, "/workspace/manuals")
-            created_files.append(env_path)
-            pdf_count += 1
+        documents.extend(build_product_documents(product))
     
-    logging.info(f"Safety document generation complete! Created {pdf_count} PDF files.")
-    logging.info(f"Files saved in: /workspace/manuals/ directory")
+    logging.info(f"Rendering {len(documents)} PDF files with {workers} worker(s)...")
+    created_files = await render_pdf_documents(documents, output_dir, workers)
+    
+    logging.info(f"Safety document generation complete! Created {len(created_files)} PDF files.")
+    logging.info(f"Files saved in: {output_dir}/ directory")
     
     # Show some sample filenames
     if created_files:
@@ -821,6 +882,15 @@ async def generate_safety_documents(conn: asyncpg.Connection, max_products: Opti
 
 async def main() -> None:
     """Main function to generate safety documents as PDFs"""
+    parser = argparse.ArgumentParser(description="Generate safety and compliance PDF documents for products")
+    parser.add_argument("--workers", type=int, default=DEFAULT_RENDER_WORKERS,
+                        help=f"Processes rendering PDFs in parallel, 1 renders serially (default: {DEFAULT_RENDER_WORKERS})")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help=f"Directory the PDF files are written to (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--max-products", type=int, default=None,
+                        help="Only generate documents for the first N products (default: all)")
+    args = parser.parse_args()
+    
     try:
         POSTGRES_CONFIG = {
             'host': 'db',
@@ -833,10 +903,11 @@ async def main() -> None:
         conn = await asyncpg.connect(**POSTGRES_CONFIG)
         logging.info("Connected to PostgreSQL for safety document generation")
         
-        await generate_safety_documents(conn)  # Generate for ALL products
+        await generate_safety_documents(conn, max_products=args.max_products,
+                                        output_dir=args.output_dir, workers=args.workers)
         
         # Show directory contents
-        manuals_path = Path("/workspace/manuals")
+        manuals_path = Path(args.output_dir)
         if manuals_path.exists():
             pdf_files = list(manuals_path.glob("*.pdf"))
             logging.info(f"Total PDF files created: {len(pdf_files)}")
@@ -860,5 +931,4 @@ async def main() -> None:
         raise
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
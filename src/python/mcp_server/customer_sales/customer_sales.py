@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 from typing import Annotated, Optional
 
 from customer_sales_postgres import PostgreSQLCustomerSales
+from customer_sales_semantic_search_image_embeddings import SemanticSearchImageEmbedding
 from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 
@@ -20,9 +21,10 @@ RLS_USER_ID = None
 
 @dataclass
 class AppContext:
-    """Application context containing database connection."""
+    """Application context containing database connection and the local image embedder."""
 
     db: PostgreSQLCustomerSales
+    image_search: SemanticSearchImageEmbedding
 
 
 @asynccontextmanager
@@ -30,11 +32,12 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     """Manage application lifecycle with type-safe context"""
 
     db = PostgreSQLCustomerSales()
+    image_search = SemanticSearchImageEmbedding()
     # Use connection pool instead of single connection for HTTP server
     await db.create_pool()
 
     try:
-        yield AppContext(db=db)
+        yield AppContext(db=db, image_search=image_search)
     finally:
         # Cleanup on shutdown
         try:
@@ -77,15 +80,20 @@ def get_rls_user_id(ctx: Context) -> str:
     return rls_user_id
 
 
-def get_db_provider() -> PostgreSQLCustomerSales:
-    """Get the database provider instance from context."""
+def get_app_context() -> AppContext:
+    """Get the application context from MCP context."""
     ctx = mcp.get_context()
     app_context = ctx.request_context.lifespan_context
     if isinstance(app_context, AppContext):
-        return app_context.db
+        return app_context
     raise RuntimeError("Invalid lifespan context type")
 
 
+def get_db_provider() -> PostgreSQLCustomerSales:
+    """Get the database provider instance from context."""
+    return get_app_context().db
+
+
 @mcp.tool()
 async def get_products_by_name(
     ctx: Context,
@@ -117,6 +125,53 @@ async def get_products_by_name(
         return f"Error executing database query: {e!s}"
 
 
+@mcp.tool()
+async def search_products_by_image(
+    ctx: Context,
+    image: Annotated[str, Field(description="The customer's photo: an uploaded file URL (e.g. /uploads/<name>), a data URL or base64 image data.")],
+    max_rows: Annotated[int, Field(
+        description="Maximum number of rows to return.")] = 5,
+    similarity_threshold: Annotated[float, Field(
+        description="Minimum image similarity (0-100) to consider a product a match.")] = 50.0
+) -> str:
+    """Find products that look like a customer's photo. The image is embedded locally with the same CLIP model used for the catalog images
+    and matched against the product image index, so the photo does not need to be described first.
+
+    Args:
+        image: The customer's photo as an uploaded file URL, data URL or base64 image data.
+        max_rows: Maximum number of rows to return.
+
+    Returns:
+        Query results with image similarity scores as a string.
+    """
+
+    rls_user_id = get_rls_user_id(ctx)
+
+    print(f"Image search, Manager ID: {rls_user_id}")
+    print(f"Max Rows: {max_rows}")
+
+    try:
+        app_context = get_app_context()
+
+        if not app_context.image_search.is_available():
+            return "Error: Image search is not available. Install torch and transformers to enable it."
+
+        try:
+            image_bytes = await app_context.image_search.load_image(image)
+        except Exception as e:
+            return f"Error: Could not read the image: {e!s}"
+
+        image_embedding = await app_context.image_search.generate_image_embedding(image_bytes)
+        if not image_embedding:
+            return "Error: Failed to generate embedding for the image. Please try another photo."
+
+        result = await app_context.db.search_products_by_image_similarity(image_embedding, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+        return f"Image Search Results:\n{result}"
+
+    except Exception as e:
+        return f"Error executing image search: {e!s}"
+
+
 @mcp.tool()
 async def get_current_utc_date() -> str:
     """Get the current UTC date and time in ISO format. Useful for date-based queries, filtering recent data, or understanding the current context for time-sensitive analysis.
@@ -37,6 +37,22 @@ POSTGRES_URL = os.getenv(
 SCHEMA_NAME = "retail"
 MANAGER_ID = ""
 
+# Reciprocal rank fusion constant: a product ranked r in a list contributes 1 / (RRF_K + r)
+RRF_K = 60
+# Candidates taken from each of the lexical and vector rankings before fusion
+HYBRID_MIN_CANDIDATES = 50
+HYBRID_MAX_CANDIDATES = 200
+
+# Queries accepted by one batch similarity search
+MAX_BATCH_QUERIES = 20
+
+# Nearest images read from the index per requested row; the surplus covers products
+# hidden by inventory RLS or below the similarity threshold
+IMAGE_SEARCH_CANDIDATE_FACTOR = 4
+
+# Must match idx_products_fulltext in data/database/generate_zava_postgres.py so the GIN index is used
+PRODUCT_TSVECTOR = "to_tsvector('english', p.product_name || ' ' || p.product_description)"
+
 
 class PostgreSQLCustomerSales:
     """Provides PostgreSQL database connection and product search functionality."""
@@ -250,6 +266,425 @@ class PostgreSQLCustomerSales:
             if conn:
                 await self.release_connection(conn)
 
+    async def search_products_by_similarity_batch(self, query_texts: list[str], query_embeddings: list[list[float]], rls_user_id: str, max_rows: int = 10, similarity_threshold: float = 50.0) -> str:
+        """Run several similarity searches in one round-trip, returning the results grouped per query.
+
+        Each query runs the same search as search_products_by_similarity inside a LATERAL
+        join over the array of query vectors.
+
+        Args:
+            query_texts: The queries, used to label the result groups
+            query_embeddings: One embedding per query, in the same order
+            rls_user_id: Row-level security user ID
+            max_rows: Maximum number of rows to return per query
+            similarity_threshold: Minimum similarity percentage (0-100) to include in results. Default is 50%.
+        """
+        conn = None
+        try:
+            if len(query_texts) != len(query_embeddings):
+                raise ValueError("query_texts and query_embeddings must have the same length")
+            if len(query_embeddings) > MAX_BATCH_QUERIES:
+                raise ValueError(f"At most {MAX_BATCH_QUERIES} queries can be searched in one batch")
+
+            max_rows = min(max_rows, 100)  # Limit to 100 for performance
+            distance_threshold = 1.0 - (similarity_threshold / 100.0)
+
+            conn = await self.get_connection()
+
+            await conn.execute(
+                "SELECT set_config('app.current_rls_user_id', $1, false)", rls_user_id)
+
+            embedding_strs = ['[' + ','.join(map(str, embedding)) + ']' for embedding in query_embeddings]
+
+            query = f"""
+                SELECT q.query_index, m.*
+                FROM unnest($1::text[]) WITH ORDINALITY AS q(embedding, query_index)
+                CROSS JOIN LATERAL (
+                    SELECT
+                        p.product_name,
+                        p.product_description,
+                        p.base_price as price,
+                        p.sku,
+                        c.category_name,
+                        pt.type_name,
+                        SUM(i.stock_level) AS total_stock,
+                        (pde.description_embedding <=> q.embedding::vector) as similarity_distance
+                    FROM {SCHEMA_NAME}.product_description_embeddings pde
+                    JOIN {SCHEMA_NAME}.products p ON pde.product_id = p.product_id
+                    JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
+                    JOIN {SCHEMA_NAME}.product_types pt ON p.type_id = pt.type_id
+                    JOIN {SCHEMA_NAME}.inventory i ON p.product_id = i.product_id
+                    WHERE (pde.description_embedding <=> q.embedding::vector) <= $3
+                    GROUP BY p.product_name, p.product_description, p.base_price, p.sku, c.category_name, pt.type_name, pde.description_embedding
+                    ORDER BY pde.description_embedding <=> q.embedding::vector
+                    LIMIT $2
+                ) m
+                ORDER BY q.query_index, m.similarity_distance
+            """
+
+            rows = await conn.fetch(query, embedding_strs, max_rows, distance_threshold)
+
+            groups = [{"query": query_text, "results": [], "row_count": 0} for query_text in query_texts]
+            for row in rows:
+                row_dict = dict(row)
+                group = groups[row_dict.pop('query_index') - 1]
+                similarity_distance = row_dict.get('similarity_distance', 1.0)
+                row_dict['similarity_percent'] = round(max(0, (1 - similarity_distance) * 100), 1)
+                group["results"].append(row_dict)
+                group["row_count"] += 1
+
+            for group in groups:
+                if not group["results"]:
+                    group["message"] = f"No products found with similarity threshold >= {similarity_threshold}%. Try a lower threshold or different search query."
+
+            columns = [column for column in rows[0].keys() if column != 'query_index'] if rows else []
+            if columns:
+                columns.append('similarity_percent')
+
+            return json.dumps(
+                {"queries": groups, "query_count": len(groups), "columns": columns}, indent=2, default=str
+            )
+
+        except Exception as e:
+            return json.dumps(
+                {
+                    "error": f"PostgreSQL batch semantic search failed: {e!s}",
+                    "queries": [],
+                    "query_count": 0,
+                    "columns": [],
+                }
+            )
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    async def get_description_embeddings(self) -> list[asyncpg.Record]:
+        """Fetch every product description embedding as (product_id, embedding) for an in-memory index."""
+        conn = None
+        try:
+            conn = await self.get_connection()
+            # Description embeddings are visible to every RLS user, so no user needs to be set
+            return await conn.fetch(f"""
+                SELECT product_id, description_embedding::real[] AS embedding
+                FROM {SCHEMA_NAME}.product_description_embeddings
+                WHERE description_embedding IS NOT NULL
+                ORDER BY product_id
+            """)
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    async def get_products_by_similarity_ranking(self, ranked_products: list[tuple[int, float]], rls_user_id: str, max_rows: int = 10, similarity_threshold: float = 50.0) -> str:
+        """Fetch details and stock for products already ranked by similarity elsewhere, keeping their order.
+
+        Returns the same format as search_products_by_similarity. Products the RLS user has no
+        inventory for drop out, which is why callers pass more candidates than max_rows.
+
+        Args:
+            ranked_products: (product_id, cosine distance) pairs, nearest first
+            rls_user_id: Row-level security user ID
+            max_rows: Maximum number of rows to return
+            similarity_threshold: Similarity percentage the candidates were filtered with, for the empty result message
+        """
+        conn = None
+        try:
+            max_rows = min(max_rows, 100)  # Limit to 100 for performance
+
+            if not ranked_products:
+                return json.dumps(
+                    {
+                        "results": [],
+                        "row_count": 0,
+                        "columns": [],
+                        "message": f"No products found with similarity threshold >= {similarity_threshold}%. Try a lower threshold or different search query.",
+                    }
+                )
+
+            product_ids = [product_id for product_id, _ in ranked_products]
+            distances = [distance for _, distance in ranked_products]
+
+            conn = await self.get_connection()
+
+            await conn.execute(
+                "SELECT set_config('app.current_rls_user_id', $1, false)", rls_user_id)
+
+            query = f"""
+                SELECT
+                    p.product_name,
+                    p.product_description,
+                    p.base_price as price,
+                    p.sku,
+                    c.category_name,
+                    pt.type_name,
+                    SUM(i.stock_level) AS total_stock,
+                    r.similarity_distance
+                FROM unnest($1::int[], $2::float8[]) WITH ORDINALITY AS r(product_id, similarity_distance, position)
+                JOIN {SCHEMA_NAME}.products p ON r.product_id = p.product_id
+                JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
+                JOIN {SCHEMA_NAME}.product_types pt ON p.type_id = pt.type_id
+                JOIN {SCHEMA_NAME}.inventory i ON p.product_id = i.product_id
+                GROUP BY p.product_name, p.product_description, p.base_price, p.sku, c.category_name, pt.type_name, r.similarity_distance, r.position
+                ORDER BY r.position
+                LIMIT $3
+            """
+
+            rows = await conn.fetch(query, product_ids, distances, max_rows)
+
+            if not rows:
+                return json.dumps(
+                    {
+                        "results": [],
+                        "row_count": 0,
+                        "columns": [],
+                        "message": f"No products found with similarity threshold >= {similarity_threshold}%. Try a lower threshold or different search query.",
+                    }
+                )
+
+            results = []
+            for row in rows:
+                row_dict = dict(row)
+                similarity_distance = row_dict.get('similarity_distance', 1.0)
+                row_dict['similarity_percent'] = round(max(0, (1 - similarity_distance) * 100), 1)
+                results.append(row_dict)
+
+            columns = list(rows[0].keys())
+            columns.append('similarity_percent')
+
+            return json.dumps(
+                {"results": results, "row_count": len(results), "columns": columns}, indent=2, default=str
+            )
+
+        except Exception as e:
+            return json.dumps(
+                {
+                    "error": f"PostgreSQL semantic search failed: {e!s}",
+                    "results": [],
+                    "row_count": 0,
+                    "columns": [],
+                }
+            )
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    async def search_products_hybrid(self, query_text: str, query_embedding: Optional[list[float]], rls_user_id: str, max_rows: int = 10, rrf_k: int = RRF_K) -> str:
+        """Search for products with full-text and vector similarity together, fused with reciprocal rank fusion.
+
+        Both candidate lists are computed and fused in a single query, so one round-trip
+        returns one ranked list.
+
+        Args:
+            query_text: Natural language or keyword query for the full-text ranking
+            query_embedding: Embedding of query_text for the vector ranking, or None for full-text only
+            rls_user_id: Row-level security user ID
+            max_rows: Maximum number of rows to return
+            rrf_k: Reciprocal rank fusion constant; larger values flatten the rank weighting
+        """
+        conn = None
+        try:
+            max_rows = min(max_rows, 100)  # Limit to 100 for performance
+            candidates = min(max(max_rows * 5, HYBRID_MIN_CANDIDATES), HYBRID_MAX_CANDIDATES)
+
+            conn = await self.get_connection()
+
+            await conn.execute(
+                "SELECT set_config('app.current_rls_user_id', $1, false)", rls_user_id)
+
+            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']' if query_embedding else None
+
+            # Lexical terms are OR-ed so natural language questions still match on their
+            # keywords; ts_rank_cd rewards products matching more of them. The 'simple'
+            # config keeps the already stemmed lexemes from plainto_tsquery as they are
+            query = f"""
+                WITH lexical AS (
+                    SELECT product_id, ROW_NUMBER() OVER (ORDER BY text_rank DESC) AS rank
+                    FROM (
+                        SELECT p.product_id, ts_rank_cd({PRODUCT_TSVECTOR}, terms) AS text_rank
+                        FROM {SCHEMA_NAME}.products p,
+                             to_tsquery('simple', replace(plainto_tsquery('english', $1)::text, '&', '|')) AS terms
+                        WHERE {PRODUCT_TSVECTOR} @@ terms
+                        ORDER BY text_rank DESC
+                        LIMIT $3
+                    ) matches
+                ),
+                semantic AS (
+                    SELECT product_id, similarity_distance, ROW_NUMBER() OVER (ORDER BY similarity_distance) AS rank
+                    FROM (
+                        SELECT pde.product_id, (pde.description_embedding <=> $2::vector) AS similarity_distance
+                        FROM {SCHEMA_NAME}.product_description_embeddings pde
+                        WHERE $2::vector IS NOT NULL
+                        ORDER BY pde.description_embedding <=> $2::vector
+                        LIMIT $3
+                    ) nearest
+                ),
+                fused AS (
+                    SELECT
+                        COALESCE(l.product_id, s.product_id) AS product_id,
+                        l.rank AS lexical_rank,
+                        s.rank AS semantic_rank,
+                        s.similarity_distance,
+                        COALESCE(1.0 / ($4 + l.rank), 0) + COALESCE(1.0 / ($4 + s.rank), 0) AS rrf_score
+                    FROM lexical l
+                    FULL OUTER JOIN semantic s ON l.product_id = s.product_id
+                )
+                SELECT
+                    p.product_name,
+                    p.product_description,
+                    p.base_price as price,
+                    p.sku,
+                    c.category_name,
+                    pt.type_name,
+                    SUM(i.stock_level) AS total_stock,
+                    f.lexical_rank,
+                    f.semantic_rank,
+                    f.similarity_distance,
+                    f.rrf_score
+                FROM fused f
+                JOIN {SCHEMA_NAME}.products p ON f.product_id = p.product_id
+                JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
+                JOIN {SCHEMA_NAME}.product_types pt ON p.type_id = pt.type_id
+                JOIN {SCHEMA_NAME}.inventory i ON p.product_id = i.product_id
+                GROUP BY p.product_name, p.product_description, p.base_price, p.sku, c.category_name, pt.type_name,
+                         f.lexical_rank, f.semantic_rank, f.similarity_distance, f.rrf_score
+                ORDER BY f.rrf_score DESC, p.product_name
+                LIMIT $5
+            """
+
+            rows = await conn.fetch(query, query_text, embedding_str, candidates, rrf_k, max_rows)
+
+            if not rows:
+                return json.dumps(
+                    {
+                        "results": [],
+                        "row_count": 0,
+                        "columns": [],
+                        "message": "No products matched the query by keywords or meaning. Try a different search query.",
+                    }
+                )
+
+            results = []
+            for row in rows:
+                row_dict = dict(row)
+                similarity_distance = row_dict.get('similarity_distance')
+                row_dict['similarity_percent'] = (
+                    round(max(0, (1 - similarity_distance) * 100), 1) if similarity_distance is not None else None
+                )
+                row_dict['rrf_score'] = round(float(row_dict['rrf_score']), 5)
+                results.append(row_dict)
+
+            columns = list(rows[0].keys())
+            columns.append('similarity_percent')
+
+            return json.dumps(
+                {"results": results, "row_count": len(results), "columns": columns}, indent=2, default=str
+            )
+
+        except Exception as e:
+            return json.dumps(
+                {
+                    "error": f"PostgreSQL hybrid search failed: {e!s}",
+                    "results": [],
+                    "row_count": 0,
+                    "columns": [],
+                }
+            )
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
+    async def search_products_by_image_similarity(self, image_embedding: list[float], rls_user_id: str, max_rows: int = 10, similarity_threshold: float = 50.0) -> str:
+        """Search for products whose catalog image is similar to a query image, using pgvector cosine similarity.
+
+        Args:
+            image_embedding: CLIP embedding of the query image
+            max_rows: Maximum number of rows to return
+            rls_user_id: Row-level security user ID
+            similarity_threshold: Minimum similarity percentage (0-100) to include in results. Default is 50%.
+        """
+        conn = None
+        try:
+            max_rows = min(max_rows, 100)  # Limit to 100 for performance
+            distance_threshold = 1.0 - (similarity_threshold / 100.0)
+
+            conn = await self.get_connection()
+
+            await conn.execute(
+                "SELECT set_config('app.current_rls_user_id', $1, false)", rls_user_id)
+
+            embedding_str = '[' + ','.join(map(str, image_embedding)) + ']'
+
+            # The nearest images come from the ivfflat index first; stock is only
+            # aggregated for those candidates. The index sees every product, so it is
+            # over-fetched and the final LIMIT applies after the RLS inventory join
+            query = f"""
+                WITH nearest AS (
+                    SELECT pie.product_id, pie.image_url,
+                           (pie.image_embedding <=> $1::vector) AS similarity_distance
+                    FROM {SCHEMA_NAME}.product_image_embeddings pie
+                    ORDER BY pie.image_embedding <=> $1::vector
+                    LIMIT $4
+                )
+                SELECT
+                    p.product_name,
+                    p.product_description,
+                    p.base_price as price,
+                    p.sku,
+                    c.category_name,
+                    pt.type_name,
+                    n.image_url,
+                    SUM(i.stock_level) AS total_stock,
+                    n.similarity_distance
+                FROM nearest n
+                JOIN {SCHEMA_NAME}.products p ON n.product_id = p.product_id
+                JOIN {SCHEMA_NAME}.categories c ON p.category_id = c.category_id
+                JOIN {SCHEMA_NAME}.product_types pt ON p.type_id = pt.type_id
+                JOIN {SCHEMA_NAME}.inventory i ON p.product_id = i.product_id
+                WHERE n.similarity_distance <= $3
+                GROUP BY p.product_name, p.product_description, p.base_price, p.sku, c.category_name, pt.type_name, n.image_url, n.similarity_distance
+                ORDER BY n.similarity_distance
+                LIMIT $2
+            """
+
+            rows = await conn.fetch(
+                query, embedding_str, max_rows, distance_threshold, max_rows * IMAGE_SEARCH_CANDIDATE_FACTOR)
+
+            if not rows:
+                return json.dumps(
+                    {
+                        "results": [],
+                        "row_count": 0,
+                        "columns": [],
+                        "message": f"No products found with image similarity >= {similarity_threshold}%. Try a lower threshold or a clearer photo of the product.",
+                    }
+                )
+
+            results = []
+            for row in rows:
+                row_dict = dict(row)
+                similarity_distance = row_dict.get('similarity_distance', 1.0)
+                row_dict['similarity_percent'] = round(max(0, (1 - similarity_distance) * 100), 1)
+                results.append(row_dict)
+
+            columns = list(rows[0].keys())
+            columns.append('similarity_percent')
+
+            return json.dumps(
+                {"results": results, "row_count": len(results), "columns": columns}, indent=2, default=str
+            )
+
+        except Exception as e:
+            return json.dumps(
+                {
+                    "error": f"PostgreSQL image search failed: {e!s}",
+                    "results": [],
+                    "row_count": 0,
+                    "columns": [],
+                }
+            )
+        finally:
+            if conn:
+                await self.release_connection(conn)
+
 
 async def test_connection() -> bool:
     """Test PostgreSQL connection and return success status."""
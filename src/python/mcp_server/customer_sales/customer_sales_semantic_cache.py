@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Semantic Search Result Cache
+
+Different phrasings of the same question ("outdoor electrical box waterproof" and
+"waterproof outdoor electrical box") produce nearly identical embeddings. This cache keeps
+recent similarity search results and serves a new query from the closest previous query
+whose embedding is within a cosine similarity threshold, so near-duplicate questions skip
+the database entirely.
+
+Results are partitioned by everything else that changes them (the RLS user, max_rows and
+the similarity threshold), expire after a TTL so stock levels stay fresh, and the oldest
+entries are evicted once the cache is full.
+
+Usage:
+    cache = SemanticResultCache(similarity_threshold=0.97, ttl_seconds=300)
+    key = (rls_user_id, max_rows, similarity_threshold)
+    result = cache.get(key, query_embedding)
+    if result is None:
+        result = await search(...)
+        cache.put(key, query_embedding, result)
+    print(cache.stats())
+
+Requirements:
+    - numpy
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class _CacheEntry:
+    partition: Hashable
+    vector: np.ndarray
+    result: str
+    expires_at: float
+
+
+class SemanticResultCache:
+    """Search results looked up by query embedding proximity, with a TTL and a size bound."""
+
+    def __init__(self, similarity_threshold: float = 0.97, ttl_seconds: float = 300.0, max_entries: int = 1000) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Insertion order is expiry order, since every entry gets the same TTL
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._partitions: Dict[Hashable, Dict[int, None]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        partition = self._partitions[entry.partition]
+        del partition[entry_id]
+        if not partition:
+            del self._partitions[entry.partition]
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._remove(entry_id)
+
+    def get(self, partition: Hashable, query_embedding: List[float]) -> Optional[str]:
+        """Return the result of the most similar cached query in the partition, or None."""
+        self._expire(time.monotonic())
+
+        query = self._normalize(query_embedding)
+        entry_ids = list(self._partitions.get(partition, ()))
+        if query is not None and entry_ids:
+            vectors = np.stack([self._entries[entry_id].vector for entry_id in entry_ids])
+            similarities = vectors @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                self.hits += 1
+                return self._entries[entry_ids[best]].result
+
+        self.misses += 1
+        return None
+
+    def put(self, partition: Hashable, query_embedding: List[float], result: str) -> None:
+        """Cache a result for a query embedding."""
+        vector = self._normalize(query_embedding)
+        if vector is None or self.max_entries <= 0:
+            return
+
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _CacheEntry(partition, vector, result, time.monotonic() + self.ttl_seconds)
+        self._partitions.setdefault(partition, {})[entry_id] = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        return (f"{self.hits} hits / {self.hits + self.misses} lookups ({self.hit_rate:.1%} hit rate), "
+                f"{len(self._entries)} cached results")
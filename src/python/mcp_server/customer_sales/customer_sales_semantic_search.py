@@ -1,31 +1,53 @@
 #!/usr/bin/env python3
 """
 Provides comprehensive customer sales database access with semantic search functionality for Zava Retail DIY Business.
-This MCP server combines traditional product name search with AI-powered semantic search using embeddings.
+This MCP server combines traditional product name search with AI-powered semantic search using embeddings,
+and matches customer photos to catalog products by CLIP image similarity.
 """
 
 import argparse
 import asyncio
+import json
+import os
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Annotated, Optional
 
-from customer_sales_postgres import PostgreSQLCustomerSales
+from customer_sales_postgres import MAX_BATCH_QUERIES, PostgreSQLCustomerSales
+from customer_sales_semantic_cache import SemanticResultCache
+from customer_sales_semantic_search_image_embeddings import SemanticSearchImageEmbedding
 from customer_sales_semantic_search_text_embeddings import SemanticSearchTextEmbedding
+from customer_sales_vector_index import InMemoryVectorIndex
 from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 
 RLS_USER_ID = None
 
+# Rank products by description similarity in process instead of with a pgvector scan
+IN_MEMORY_VECTOR_INDEX = os.getenv("IN_MEMORY_VECTOR_INDEX", "true").lower() == "true"
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "600"))
+# RLS hides products without inventory in the user's store, so more candidates than
+# max_rows are ranked in memory and the database keeps the visible ones
+VECTOR_INDEX_CANDIDATE_FACTOR = 4
+
+# Serve near-duplicate queries from earlier results (cosine similarity of the query embeddings)
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "true").lower() == "true"
+SEMANTIC_CACHE_SIMILARITY = float(os.getenv("SEMANTIC_CACHE_SIMILARITY", "0.97"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "300"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+
 
 @dataclass
 class AppContext:
-    """Application context containing database connection and semantic search tool."""
+    """Application context containing database connection and semantic search tools."""
 
     db: PostgreSQLCustomerSales
     semantic_search: SemanticSearchTextEmbedding
+    image_search: SemanticSearchImageEmbedding
+    vector_index: Optional[InMemoryVectorIndex] = None
+    result_cache: Optional[SemanticResultCache] = None
 
 
 @asynccontextmanager
@@ -34,14 +56,37 @@ async def app_lifespan(_server: FastMCP) -> AsyncIterator[AppContext]:
 
     db = PostgreSQLCustomerSales()
     semantic_search = SemanticSearchTextEmbedding()
+    image_search = SemanticSearchImageEmbedding()
 
     # Use connection pool instead of single connection for HTTP server
     await db.create_pool()
 
+    vector_index = None
+    refresh_task = None
+    if IN_MEMORY_VECTOR_INDEX:
+        vector_index = InMemoryVectorIndex(VECTOR_INDEX_REFRESH_SECONDS)
+        try:
+            await vector_index.refresh(db)
+        except Exception as e:
+            # Searches fall back to pgvector until a scheduled refresh succeeds
+            print(f"⚠️  Could not load in-memory vector index: {e}")
+        refresh_task = asyncio.create_task(vector_index.run_refresh(db))
+
+    result_cache = None
+    if SEMANTIC_CACHE:
+        result_cache = SemanticResultCache(SEMANTIC_CACHE_SIMILARITY, SEMANTIC_CACHE_TTL_SECONDS, SEMANTIC_CACHE_MAX_ENTRIES)
+
     try:
-        yield AppContext(db=db, semantic_search=semantic_search)
+        yield AppContext(db=db, semantic_search=semantic_search, image_search=image_search,
+                         vector_index=vector_index, result_cache=result_cache)
     finally:
         # Cleanup on shutdown
+        if refresh_task:
+            refresh_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await refresh_task
+        if result_cache:
+            print(f"Semantic cache: {result_cache.stats()}")
         try:
             await db.close_pool()
         except Exception as e:
@@ -92,6 +137,41 @@ def get_app_context() -> AppContext:
     raise RuntimeError("Invalid lifespan context type")
 
 
+async def find_similar_products(app_context: AppContext, query_embedding: list[float], rls_user_id: str, max_rows: int, similarity_threshold: float) -> str:
+    """Rank products with the in-memory index when it is loaded, otherwise with pgvector.
+
+    Results are served from the semantic cache when a near-identical query was answered
+    recently for the same RLS user and search parameters.
+    """
+
+    result_cache = app_context.result_cache
+    cache_key = (rls_user_id, max_rows, similarity_threshold)
+    if result_cache is not None:
+        cached = result_cache.get(cache_key, query_embedding)
+        print(f"Semantic cache {'hit' if cached is not None else 'miss'}: {result_cache.stats()}")
+        if cached is not None:
+            return cached
+
+    result = None
+    vector_index = app_context.vector_index
+    if vector_index is not None and vector_index.is_ready():
+        max_candidates = min(max_rows, 100) * VECTOR_INDEX_CANDIDATE_FACTOR
+        ranked_products = vector_index.search(
+            query_embedding, max_candidates=max_candidates, similarity_threshold=similarity_threshold)
+        result = await app_context.db.get_products_by_similarity_ranking(ranked_products, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+        # If RLS hid so many candidates that max_rows were not filled and more matches were
+        # cut off by the candidate limit, pgvector ranks the visible products instead
+        if len(ranked_products) == max_candidates and json.loads(result).get("row_count", 0) < min(max_rows, 100):
+            result = None
+    if result is None:
+        result = await app_context.db.search_products_by_similarity(query_embedding, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+
+    # Failed queries are retried next time rather than cached
+    if result_cache is not None and "error" not in json.loads(result):
+        result_cache.put(cache_key, query_embedding, result)
+    return result
+
+
 @mcp.tool()
 async def semantic_search_products(
     ctx: Context,
@@ -133,13 +213,150 @@ async def semantic_search_products(
             return "Error: Failed to generate embedding for the query. Please try again."
 
         # Search for similar products using the embedding
-        result = await app_context.db.search_products_by_similarity(query_embedding, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+        result = await find_similar_products(app_context, query_embedding, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
         return f"Semantic Search Results:\n{result}"
 
     except Exception as e:
         return f"Error executing semantic search: {e!s}"
 
 
+@mcp.tool()
+async def semantic_search_products_batch(
+    ctx: Context,
+    query_descriptions: Annotated[list[str], Field(description=f"Natural language descriptions of several products to find, one per item (at most {MAX_BATCH_QUERIES}).")],
+    max_rows: Annotated[int, Field(
+        description="Maximum number of rows to return per query.")] = 5,
+    similarity_threshold: Annotated[float, Field(
+        description="Minimum similarity threshold (0-100) to consider a product a match.")] = 50.0
+) -> str:
+    """Search for several products at once using semantic similarity. Use this instead of calling semantic_search_products repeatedly, for example
+    for every item of a project shopping list ("drop cloth", "tray liner", "brush", "primer"). All queries are embedded and searched together.
+
+    Args:
+        query_descriptions: Natural language descriptions of the products to find, one per item.
+        max_rows: Maximum number of rows to return per query.
+
+    Returns:
+        Query results with similarity scores, grouped per query, as a string.
+    """
+
+    rls_user_id = get_rls_user_id(ctx)
+
+    print(f"Batch semantic search queries: {query_descriptions}")
+    print(f"Manager ID: {rls_user_id}")
+    print(f"Max Rows: {max_rows}")
+
+    try:
+        app_context = get_app_context()
+
+        if not app_context.semantic_search.is_available():
+            return "Error: Semantic search is not available. Azure OpenAI endpoint not configured."
+
+        if not query_descriptions:
+            return "Error: Provide at least one query description."
+        if len(query_descriptions) > MAX_BATCH_QUERIES:
+            return f"Error: At most {MAX_BATCH_QUERIES} queries can be searched in one call."
+
+        # One embeddings request and one database round-trip for all queries
+        query_embeddings = app_context.semantic_search.generate_query_embeddings(query_descriptions)
+        if not query_embeddings:
+            return "Error: Failed to generate embeddings for the queries. Please try again."
+
+        result = await app_context.db.search_products_by_similarity_batch(
+            query_descriptions, query_embeddings, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+        return f"Batch Semantic Search Results:\n{result}"
+
+    except Exception as e:
+        return f"Error executing batch semantic search: {e!s}"
+
+
+@mcp.tool()
+async def hybrid_search_products(
+    ctx: Context,
+    query: Annotated[str, Field(description="Product name, keywords or a natural language description of what the customer needs.")],
+    max_rows: Annotated[int, Field(
+        description="Maximum number of rows to return.")] = 10
+) -> str:
+    """Search for products by keywords and by meaning at the same time. Products matching the words of the query (full-text search) and products
+    with a similar description (AI embeddings) are merged into a single ranked list with reciprocal rank fusion, so one call covers both exact product
+    names and descriptive questions.
+
+    Args:
+        query: Product name, keywords or a natural language description (e.g., "paint sprayer", "something to hang heavy pictures on drywall").
+        max_rows: Maximum number of rows to return.
+
+    Returns:
+        Fused query results with lexical and semantic ranks as a string.
+    """
+
+    rls_user_id = get_rls_user_id(ctx)
+
+    print(f"Hybrid search query: {query}")
+    print(f"Manager ID: {rls_user_id}")
+    print(f"Max Rows: {max_rows}")
+
+    try:
+        app_context = get_app_context()
+
+        # Without embeddings the search still returns the full-text ranking
+        query_embedding = None
+        if app_context.semantic_search.is_available():
+            query_embedding = app_context.semantic_search.generate_query_embedding(query)
+
+        result = await app_context.db.search_products_hybrid(query, query_embedding, rls_user_id=rls_user_id, max_rows=max_rows)
+        return f"Hybrid Search Results:\n{result}"
+
+    except Exception as e:
+        return f"Error executing hybrid search: {e!s}"
+
+
+@mcp.tool()
+async def search_products_by_image(
+    ctx: Context,
+    image: Annotated[str, Field(description="The customer's photo: an uploaded file URL (e.g. /uploads/<name>), a data URL or base64 image data.")],
+    max_rows: Annotated[int, Field(
+        description="Maximum number of rows to return.")] = 5,
+    similarity_threshold: Annotated[float, Field(
+        description="Minimum image similarity (0-100) to consider a product a match.")] = 50.0
+) -> str:
+    """Find products that look like a photo. The image is embedded locally with the same CLIP model used for the catalog images and matched against
+    the product image index, so a photo of a product can be identified without describing it first.
+
+    Args:
+        image: The customer's photo as an uploaded file URL, data URL or base64 image data.
+        max_rows: Maximum number of rows to return.
+
+    Returns:
+        Query results with image similarity scores as a string.
+    """
+
+    rls_user_id = get_rls_user_id(ctx)
+
+    print(f"Image search, Manager ID: {rls_user_id}")
+    print(f"Max Rows: {max_rows}")
+
+    try:
+        app_context = get_app_context()
+
+        if not app_context.image_search.is_available():
+            return "Error: Image search is not available. Install torch and transformers to enable it."
+
+        try:
+            image_bytes = await app_context.image_search.load_image(image)
+        except Exception as e:
+            return f"Error: Could not read the image: {e!s}"
+
+        image_embedding = await app_context.image_search.generate_image_embedding(image_bytes)
+        if not image_embedding:
+            return "Error: Failed to generate embedding for the image. Please try another photo."
+
+        result = await app_context.db.search_products_by_image_similarity(image_embedding, rls_user_id=rls_user_id, max_rows=max_rows, similarity_threshold=similarity_threshold)
+        return f"Image Search Results:\n{result}"
+
+    except Exception as e:
+        return f"Error executing image search: {e!s}"
+
+
 @mcp.tool()
 async def get_current_utc_date() -> str:
     """Get the current UTC date and time in ISO format. Useful for date-based queries, filtering recent data, or understanding the current context for time-sensitive analysis.
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Customer Sales Image Search Tool
+
+This module embeds customer photos locally with the same CLIP model that produced the
+product image embeddings (openai/clip-vit-base-patch32), so a photo can be matched against
+the product_image_embeddings pgvector index without a round-trip to a vision model.
+
+Usage:
+    from customer_sales_semantic_search_image_embeddings import SemanticSearchImageEmbedding
+
+    tool = SemanticSearchImageEmbedding()
+    image_bytes = await tool.load_image("data:image/jpeg;base64,...")
+    embedding = await tool.generate_image_embedding(image_bytes)
+
+Requirements:
+    - torch and transformers (optional; image search is disabled without them)
+    - pillow
+    - httpx (only for http(s) image URLs from hosts in IMAGE_SEARCH_ALLOWED_HOSTS)
+"""
+
+import asyncio
+import base64
+import binascii
+import io
+import os
+from pathlib import Path
+from typing import Any, List, Optional
+from urllib.parse import urlsplit
+
+# Must match the model used by data/database/add_image_embeddings.py
+CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
+
+# Local image files may only be read from this directory. The default is the web app's
+# upload folder; both processes read IMAGE_UPLOAD_DIR so they agree when it is set.
+IMAGE_UPLOAD_DIR = Path(os.getenv("IMAGE_UPLOAD_DIR", str(Path(__file__).resolve().parents[2] / "web_app" / "uploads")))
+MAX_IMAGE_BYTES = int(os.getenv("IMAGE_SEARCH_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_FETCH_TIMEOUT_SECONDS = 10.0
+# Remote images are only fetched from these hosts (comma separated); empty disables URL fetching
+IMAGE_SEARCH_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.getenv("IMAGE_SEARCH_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
+
+class SemanticSearchImageEmbedding:
+    """Embeds query images with CLIP for similarity search over product images."""
+
+    def __init__(self) -> None:
+        """Check that the CLIP dependencies are installed; the model itself is loaded on first use."""
+        self.model_name = CLIP_MODEL_NAME
+        self.model: Any = None
+        self.processor: Any = None
+        self._load_lock = asyncio.Lock()
+
+        try:
+            import torch  # noqa: F401
+            import transformers  # noqa: F401
+            from PIL import Image  # noqa: F401
+            self.dependencies_available = True
+        except ImportError as e:
+            print(f"Warning: {e}. Image search will not work (pip install torch transformers pillow).")
+            self.dependencies_available = False
+
+    def _load_model(self) -> None:
+        """Load the CLIP model and processor from HuggingFace."""
+        from transformers import CLIPModel, CLIPProcessor
+
+        print(f"Loading CLIP model {self.model_name}...")
+        self.processor = CLIPProcessor.from_pretrained(self.model_name)
+        model = CLIPModel.from_pretrained(self.model_name)
+        model.eval()
+        self.model = model
+        print("✓ CLIP model loaded")
+
+    async def ensure_model(self) -> bool:
+        """Load the CLIP model once, off the event loop. Returns False if it is unavailable."""
+        if not self.dependencies_available:
+            return False
+        if self.model is None:
+            async with self._load_lock:
+                if self.model is None:
+                    try:
+                        await asyncio.to_thread(self._load_model)
+                    except Exception as e:
+                        print(f"Failed to load CLIP model: {e}")
+                        self.dependencies_available = False
+                        return False
+        return True
+
+    async def load_image(self, image: str) -> bytes:
+        """
+        Read a query image from a data URL, raw base64, an uploaded file name, or an
+        https URL on a host listed in IMAGE_SEARCH_ALLOWED_HOSTS.
+
+        Raises:
+            ValueError: If the image cannot be read, is too large or its URL is not allowed
+        """
+        image = image.strip()
+        if image.startswith(("http://", "https://")):
+            data = await self._fetch_image(image)
+        elif image.startswith("data:"):
+            data = self._decode_base64(image.partition(",")[2])
+        else:
+            # "/uploads/<name>" as returned by the web app, or a bare file name
+            candidate = IMAGE_UPLOAD_DIR / Path(image).name
+            if candidate.is_file():
+                data = await asyncio.to_thread(candidate.read_bytes)
+            else:
+                data = self._decode_base64(image)
+
+        if len(data) > MAX_IMAGE_BYTES:
+            raise ValueError(f"Image is larger than {MAX_IMAGE_BYTES} bytes")
+        return data
+
+    @staticmethod
+    async def _fetch_image(url: str) -> bytes:
+        """Download an image from an allowlisted host, stopping as soon as it passes MAX_IMAGE_BYTES."""
+        parts = urlsplit(url)
+        if parts.scheme != "https" or (parts.hostname or "").lower() not in IMAGE_SEARCH_ALLOWED_HOSTS:
+            raise ValueError("Image URLs are not allowed; upload the photo or pass it as a data URL")
+
+        import httpx
+
+        # No redirects: a redirect could point the server at a host outside the allowlist
+        async with httpx.AsyncClient(timeout=IMAGE_FETCH_TIMEOUT_SECONDS, follow_redirects=False) as client:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                content_length = response.headers.get("content-length")
+                if content_length and content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+                    raise ValueError(f"Image is larger than {MAX_IMAGE_BYTES} bytes")
+
+                data = bytearray()
+                async for chunk in response.aiter_bytes():
+                    data.extend(chunk)
+                    if len(data) > MAX_IMAGE_BYTES:
+                        raise ValueError(f"Image is larger than {MAX_IMAGE_BYTES} bytes")
+                return bytes(data)
+
+    @staticmethod
+    def _decode_base64(value: str) -> bytes:
+        try:
+            return base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError("Image must be a data URL, base64 data or an uploaded file name") from e
+
+    def _embed(self, image_bytes: bytes) -> List[float]:
+        import torch
+        from PIL import Image
+
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            inputs = self.processor(images=img.convert("RGB"), return_tensors="pt")
+        with torch.inference_mode():
+            features = self.model.get_image_features(pixel_values=inputs["pixel_values"])
+        return features[0].tolist()
+
+    async def generate_image_embedding(self, image_bytes: bytes) -> Optional[List[float]]:
+        """
+        Generate a CLIP embedding for an image.
+
+        Args:
+            image_bytes: Encoded image (JPEG, PNG, ...)
+
+        Returns:
+            List of float values representing the embedding, or None if failed
+        """
+        if not await self.ensure_model():
+            print("CLIP model not available. Cannot generate image embeddings.")
+            return None
+
+        try:
+            # Decoding and the forward pass are CPU bound; keep the event loop free
+            embedding = await asyncio.to_thread(self._embed, image_bytes)
+            print(f"✓ Generated image embedding (dimension: {len(embedding)})")
+            return embedding
+        except Exception as e:
+            print(f"Error generating image embedding: {e}")
+            return None
+
+    def is_available(self) -> bool:
+        """Check if the image search functionality is available."""
+        return self.dependencies_available
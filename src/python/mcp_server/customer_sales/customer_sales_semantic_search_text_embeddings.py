@@ -115,6 +115,37 @@ class SemanticSearchTextEmbedding:
             print(f"Error generating embedding: {e}")
             return None
     
+    def generate_query_embeddings(self, query_texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Generate embeddings for several queries with a single API call.
+        
+        Args:
+            query_texts: The user's product description queries
+            
+        Returns:
+            One embedding per query in the same order, or None if failed
+        """
+        if not self.openai_client:
+            print("Azure OpenAI client not initialized. Cannot generate embeddings.")
+            return None
+            
+        try:
+            print(f"Generating embeddings for {len(query_texts)} queries")
+            
+            response = self.openai_client.embeddings.create(
+                input=query_texts,
+                model=self.deployment
+            )
+            
+            # The service returns one item per input, tagged with its position
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            print(f"✓ Generated {len(embeddings)} embeddings")
+            return embeddings
+            
+        except Exception as e:
+            print(f"Error generating embeddings: {e}")
+            return None
+    
     def is_available(self) -> bool:
         """Check if the semantic search functionality is available."""
         return self.openai_client is not None
\ No newline at end of file
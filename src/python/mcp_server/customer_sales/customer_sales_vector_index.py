@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+In-Memory Product Vector Index
+
+The catalog has a few thousand products, so all description embeddings fit comfortably in
+one normalized NumPy matrix. Nearest neighbours then come from a single matrix-vector
+product in process instead of a pgvector scan. Postgres is only asked for the details and
+stock of the winning products.
+
+The matrix is loaded from product_description_embeddings when the server starts and
+reloaded on a schedule so re-embedded products are picked up without a restart.
+
+Usage:
+    index = InMemoryVectorIndex(refresh_seconds=600)
+    await index.refresh(db)
+    refresh_task = asyncio.create_task(index.run_refresh(db))
+
+    ranked = index.search(query_embedding, max_candidates=40, similarity_threshold=50.0)
+    # -> [(product_id, cosine distance), ...] nearest first
+
+Requirements:
+    - numpy
+"""
+
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class InMemoryVectorIndex:
+    """Normalized description embeddings held in memory for exact cosine top-K search."""
+
+    def __init__(self, refresh_seconds: float = 600.0) -> None:
+        self.refresh_seconds = refresh_seconds
+        # (product ids, normalized embedding matrix), swapped in one assignment on refresh
+        self._snapshot: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.loaded_at: Optional[float] = None
+
+    async def refresh(self, db: Any) -> None:
+        """Reload all description embeddings from the database."""
+        started = time.perf_counter()
+        rows = await db.get_description_embeddings()
+        if not rows:
+            print("⚠️  No description embeddings found; in-memory vector index is empty")
+            self._snapshot = None
+            return
+
+        product_ids = np.fromiter((row["product_id"] for row in rows), dtype=np.int64, count=len(rows))
+        # Normalizing row-wise at load time turns cosine similarity into a plain dot product
+        matrix = np.asarray([row["embedding"] for row in rows], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+
+        self._snapshot = (product_ids, matrix)
+        self.loaded_at = time.time()
+        print(f"✓ In-memory vector index loaded: {len(product_ids)} products "
+              f"({matrix.nbytes / 1024 / 1024:.1f} MB) in {time.perf_counter() - started:.2f}s")
+
+    async def run_refresh(self, db: Any) -> None:
+        """Refresh the index every refresh_seconds until cancelled; failures keep the previous snapshot."""
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                print(f"⚠️  Failed to refresh in-memory vector index: {e}")
+
+    def is_ready(self) -> bool:
+        """Check if the index holds embeddings to search."""
+        return self._snapshot is not None
+
+    def __len__(self) -> int:
+        return 0 if self._snapshot is None else len(self._snapshot[0])
+
+    def search(self, query_embedding: List[float], max_candidates: int, similarity_threshold: float = 50.0) -> List[Tuple[int, float]]:
+        """
+        Find the products most similar to a query embedding.
+
+        Args:
+            query_embedding: The embedding vector to search for similar products
+            max_candidates: Maximum number of products to return
+            similarity_threshold: Minimum similarity percentage (0-100), as in search_products_by_similarity
+
+        Returns:
+            (product_id, cosine distance) pairs, nearest first
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return []
+        product_ids, matrix = snapshot
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0 or query.shape[0] != matrix.shape[1]:
+            return []
+        similarities = matrix @ (query / query_norm)
+
+        count = min(max_candidates, len(similarities))
+        if count <= 0:
+            return []
+        # argpartition finds the top-K in linear time; only those K are sorted
+        top = np.argpartition(-similarities, count - 1)[:count]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+
+        min_similarity = similarity_threshold / 100.0
+        return [
+            (int(product_ids[i]), float(1.0 - similarities[i]))
+            for i in top
+            if similarities[i] >= min_similarity
+        ]
@@ -0,0 +1,56 @@
+"""
+Image preprocessing for customer photos sent to the model.
+
+Phone photos are often several megabytes with large dimensions and EXIF metadata.
+Downscaling and re-encoding them before they are attached to a chat message keeps
+request size, upload time and vision-token cost down.
+
+The functions in this module are CPU bound and are meant to run in a process pool
+(see web_app.py), so they only take and return plain bytes.
+"""
+
+import io
+
+from PIL import Image, ImageOps
+
+OUTPUT_FORMATS = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+
+def prepare_image(data: bytes, max_dimension: int, output_format: str = "JPEG", quality: int = 85) -> tuple[bytes, str]:
+    """Resize, strip metadata from and re-encode an image.
+
+    Args:
+        data: Original image bytes (any format Pillow can read)
+        max_dimension: Longest side of the output image in pixels
+        output_format: "JPEG" or "WEBP"
+        quality: Encoder quality target (1-100)
+
+    Returns:
+        Tuple of (encoded image bytes, MIME type)
+    """
+    output_format = output_format.upper()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    with Image.open(io.BytesIO(data)) as image:
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        if image.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency onto white, JPEG has no alpha channel
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        # A fresh save without exif/icc arguments writes no metadata
+        buffer = io.BytesIO()
+        image.save(buffer, format=output_format, quality=quality, optimize=True)
+
+    return buffer.getvalue(), OUTPUT_FORMATS[output_format]
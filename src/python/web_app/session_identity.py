@@ -0,0 +1,91 @@
+"""
+Signed RLS identities for chat sessions.
+
+The web app never trusts a store identity chosen by the browser. An RLS user ID is
+only accepted from a token signed with RLS_SESSION_SECRET. An operator issues the
+token with the command below; the store manager signs in with it at /login, which
+stores it in the HttpOnly zava_rls_session cookie. The signature and expiry are
+checked on the server again for every WebSocket connection.
+
+Token format: base64url("<rls_user_id>:<expires_at>") + "." + base64url(HMAC-SHA256)
+
+USAGE:
+    python session_identity.py <rls_user_id> [--ttl-seconds N]   # prints a token
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from typing import Optional
+
+RLS_SESSION_COOKIE = "zava_rls_session"
+DEFAULT_TOKEN_TTL_SECONDS = 8 * 3600
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: bytes, secret: str) -> bytes:
+    return hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).digest()
+
+
+def sign_rls_identity(rls_user_id: str, secret: str, ttl_seconds: int = DEFAULT_TOKEN_TTL_SECONDS,
+                      now: Optional[float] = None) -> str:
+    """Issue a token binding an RLS user ID to an expiry time."""
+    if not secret:
+        raise ValueError("A signing secret is required")
+    rls_user_id = str(uuid.UUID(rls_user_id))
+    expires_at = int((time.time() if now is None else now) + ttl_seconds)
+    payload = f"{rls_user_id}:{expires_at}".encode("ascii")
+    return f"{_b64encode(payload)}.{_b64encode(_signature(payload, secret))}"
+
+
+def verify_rls_identity(token: str, secret: str, now: Optional[float] = None) -> Optional[str]:
+    """Return the RLS user ID of a valid, unexpired token, or None."""
+    if not token or not secret:
+        return None
+    try:
+        encoded_payload, encoded_signature = token.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, binascii.Error):
+        return None
+
+    # Constant-time comparison so the signature can't be guessed byte by byte
+    if not hmac.compare_digest(signature, _signature(payload, secret)):
+        return None
+
+    try:
+        rls_user_id, expires_at = payload.decode("ascii").split(":")
+        if int(expires_at) < (time.time() if now is None else now):
+            return None
+        return str(uuid.UUID(rls_user_id))
+    except ValueError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Issue a signed RLS session token (uses RLS_SESSION_SECRET)")
+    parser.add_argument("rls_user_id", help="Store manager RLS user ID")
+    parser.add_argument("--ttl-seconds", type=int, default=DEFAULT_TOKEN_TTL_SECONDS,
+                        help=f"Token lifetime (default: {DEFAULT_TOKEN_TTL_SECONDS})")
+    args = parser.parse_args()
+
+    secret = os.environ.get("RLS_SESSION_SECRET")
+    if not secret:
+        parser.error("RLS_SESSION_SECRET is not set")
+    print(sign_rls_identity(args.rls_user_id, secret, args.ttl_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Content-addressed storage for uploaded images.
+
+Uploads are stored as <sha256>.<ext> so the same image uploaded twice is kept once.
+A janitor task removes files that have not been used for a while and trims the
+directory back under a size budget, oldest first.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = ".part"
+# In-progress uploads older than this are considered abandoned
+PARTIAL_MAX_AGE_SECONDS = 3600
+
+
+class UploadStore:
+    """Stores uploaded files by content hash with size and age based eviction."""
+
+    def __init__(self, directory: Path, max_bytes: int, max_age_seconds: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def partial_path(self) -> Path:
+        """Get a unique temporary path to stream a new upload into."""
+        return self.directory / f"{uuid.uuid4()}{PARTIAL_SUFFIX}"
+
+    def path_for(self, filename: str) -> Optional[Path]:
+        """Resolve a stored filename, rejecting anything that is not a plain file name."""
+        if Path(filename).name != filename or filename.endswith(PARTIAL_SUFFIX):
+            return None
+        return self.directory / filename
+
+    def _commit(self, partial_path: Path, filename: str) -> bool:
+        final_path = self.directory / filename
+        if final_path.exists():
+            try:
+                # Same content already stored - mark the existing copy as recently used
+                os.utime(final_path)
+                partial_path.unlink(missing_ok=True)
+                return True
+            except FileNotFoundError:
+                # The janitor evicted it in the meantime; store this copy instead
+                pass
+        partial_path.replace(final_path)
+        return False
+
+    async def commit(self, partial_path: Path, digest: str, extension: str) -> tuple[str, bool]:
+        """Move a completed upload to its content-addressed name.
+
+        Returns:
+            Tuple of (stored filename, True if the content was already stored)
+        """
+        filename = f"{digest}.{extension}"
+        duplicate = await asyncio.to_thread(self._commit, partial_path, filename)
+        return filename, duplicate
+
+    async def touch(self, filename: str) -> None:
+        """Mark a stored file as recently used so it is evicted last."""
+        path = self.path_for(filename)
+        if path is not None:
+            try:
+                await asyncio.to_thread(os.utime, path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> tuple[int, int]:
+        """Remove expired files, then the least recently used ones until under the size budget.
+
+        Returns:
+            Tuple of (files removed, bytes removed)
+        """
+        now = time.time()
+        removed_files = 0
+        removed_bytes = 0
+        entries = []
+
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file():
+                continue
+
+            age = now - stat.st_mtime
+            max_age = PARTIAL_MAX_AGE_SECONDS if path.name.endswith(PARTIAL_SUFFIX) else self.max_age_seconds
+            if age > max_age:
+                path.unlink(missing_ok=True)
+                removed_files += 1
+                removed_bytes += stat.st_size
+            elif not path.name.endswith(PARTIAL_SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed_files += 1
+            removed_bytes += size
+
+        return removed_files, removed_bytes
+
+    async def run_janitor(self, interval_seconds: int) -> None:
+        """Periodically evict uploads until cancelled."""
+        while True:
+            try:
+                removed_files, removed_bytes = await asyncio.to_thread(self.evict)
+                if removed_files:
+                    logger.info(f"Upload janitor removed {removed_files} files ({removed_bytes} bytes)")
+            except Exception as e:
+                logger.error(f"Upload janitor failed: {e}")
+            await asyncio.sleep(interval_seconds)
@@ -1,12 +1,15 @@
 # http://localhost:8000
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, UploadFile, File
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, UploadFile, File, Form
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import json
 import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Optional
 import logging
 import base64
@@ -14,6 +17,7 @@ import os
 from contextlib import AsyncExitStack
 import uuid
 from pathlib import Path
+import aiofiles
 
 # Resolve shared asset paths relative to this file (web_app.py)
 BASE_SRC_DIR = Path(__file__).resolve().parents[2]  # -> /workspace/src
@@ -24,22 +28,31 @@ STATIC_DIR = SHARED_STATIC_DIR if SHARED_STATIC_DIR.exists() else Path("static")
 TEMPLATES_DIR = STATIC_DIR if STATIC_DIR.exists() else Path("templates")
 
 # Agent Framework imports
-from agent_framework import ChatAgent, MCPStdioTool, ToolProtocol, ChatMessage, TextContent, DataContent
+from agent_framework import ChatAgent, MCPStdioTool, MCPStreamableHTTPTool, ToolProtocol, ChatMessage, TextContent, DataContent
 from agent_framework.azure import AzureAIClient
 from azure.identity.aio import AzureCliCredential
 
 
 from dotenv import load_dotenv
 
+from image_processing import prepare_image
+from request_limits import BodySizeLimitMiddleware
+from session_identity import RLS_SESSION_COOKIE, verify_rls_identity
+from upload_store import UploadStore
+
 load_dotenv()  # Loads variables from .env into os.environ
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Uploads are stored by content hash and evicted by age and total size
+# Shared with the MCP server's search_products_by_image tool, which reads photos from the same directory
+UPLOAD_DIR = Path(os.environ.get("IMAGE_UPLOAD_DIR", str(Path(__file__).resolve().parent / "uploads")))
+UPLOAD_MAX_DISK_BYTES = int(os.environ.get("UPLOAD_MAX_DISK_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_MAX_AGE_SECONDS = int(os.environ.get("UPLOAD_MAX_AGE_SECONDS", str(24 * 3600)))
+UPLOAD_JANITOR_INTERVAL_SECONDS = int(os.environ.get("UPLOAD_JANITOR_INTERVAL_SECONDS", "600"))
+upload_store = UploadStore(UPLOAD_DIR, UPLOAD_MAX_DISK_BYTES, UPLOAD_MAX_AGE_SECONDS)
 
 def encodeImage(path, mime_type):
     """Encode image file to base64 for use with AI models"""
@@ -60,13 +73,152 @@ def get_image_mime_type(filename: str) -> str:
     }
     return mime_types.get(extension, 'image/jpeg')
 
+# Upload limits - the browser client also rejects files over 10MB
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Room for the multipart boundaries and part headers around the image itself
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get("UPLOAD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+def sniff_image_type(header: bytes) -> Optional[tuple[str, str]]:
+    """Detect the image format from its leading bytes, returning (mime_type, extension)"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg', 'jpg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png', 'png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif', 'gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    if header.startswith(b'BM'):
+        return 'image/bmp', 'bmp'
+    return None
+
+class ImageCache:
+    """Bounded least-recently-used cache of (image bytes, MIME type) entries"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple[bytes, str]]:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: str, data: bytes, mime_type: str):
+        if len(data) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.total_bytes -= len(old[0])
+        self._items[key] = (data, mime_type)
+        self.total_bytes += len(data)
+        # Evict least recently used images until we are back under budget
+        while self.total_bytes > self.max_bytes:
+            _, (evicted, _) = self._items.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+# Keep recently uploaded images in memory so agent turns don't re-read them from disk
+upload_cache = ImageCache(UPLOAD_CACHE_MAX_BYTES)
+
+async def load_uploaded_image(filename: str) -> Optional[tuple[bytes, str]]:
+    """Get an uploaded image as (bytes, mime_type), from memory when possible"""
+    cached = upload_cache.get(filename)
+    if cached is not None:
+        await upload_store.touch(filename)
+        return cached
+
+    # Only plain filenames inside UPLOAD_DIR are allowed
+    file_path = upload_store.path_for(filename)
+    if file_path is None:
+        return None
+
+    try:
+        async with aiofiles.open(file_path, "rb") as image_file:
+            image_bytes = await image_file.read()
+    except FileNotFoundError:
+        return None
+    await upload_store.touch(filename)
+    mime_type = get_image_mime_type(filename)
+    upload_cache.put(filename, image_bytes, mime_type)
+    return image_bytes, mime_type
+
+# Image preprocessing - downscale and re-encode photos before they are sent to the model
+IMAGE_PREPROCESSING = os.environ.get("IMAGE_PREPROCESSING", "true").lower() == "true"
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "1568"))
+IMAGE_OUTPUT_FORMAT = os.environ.get("IMAGE_OUTPUT_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "85"))
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PROCESSED_IMAGE_CACHE_MAX_BYTES = int(os.environ.get("PROCESSED_IMAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# How uploaded photos reach the agent:
+# - "vision": send the image to the model (works without CLIP on the MCP server)
+# - "clip":   send only the upload URL; the agent matches it with the MCP search_products_by_image tool
+IMAGE_SEARCH_MODE = os.environ.get("IMAGE_SEARCH_MODE", "vision").lower()
+
+image_pool: Optional[ProcessPoolExecutor] = None
+processed_image_cache = ImageCache(PROCESSED_IMAGE_CACHE_MAX_BYTES)  # Keyed by SHA-256 of the original bytes
+processing_tasks: Dict[str, asyncio.Future] = {}  # In-flight preprocessing per content hash
+janitor_task: Optional[asyncio.Task] = None
+background_tasks: set[asyncio.Task] = set()  # Keep references so fire-and-forget tasks aren't garbage collected
+
+async def preprocess_image(image_bytes: bytes, mime_type: str, digest: Optional[str] = None) -> tuple[bytes, str]:
+    """Downscale and re-encode an image in the process pool, caching the result by content hash"""
+    if not IMAGE_PREPROCESSING or image_pool is None:
+        return image_bytes, mime_type
+
+    digest = digest or hashlib.sha256(image_bytes).hexdigest()
+    cached = processed_image_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    # Share the work when the same image is already being processed
+    task = processing_tasks.get(digest)
+    if task is None:
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(
+            image_pool, prepare_image, image_bytes, IMAGE_MAX_DIMENSION, IMAGE_OUTPUT_FORMAT, IMAGE_QUALITY
+        )
+        processing_tasks[digest] = task
+        task.add_done_callback(lambda _: processing_tasks.pop(digest, None))
+
+    try:
+        processed_bytes, processed_mime_type = await asyncio.shield(task)
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed, sending original image: {e}")
+        return image_bytes, mime_type
+
+    processed_image_cache.put(digest, processed_bytes, processed_mime_type)
+    logger.info(f"Image preprocessed: {len(image_bytes)} -> {len(processed_bytes)} bytes ({processed_mime_type})")
+    return processed_bytes, processed_mime_type
+
 # Agent Framework Configuration - matching cora-agent-demo.py
 ENDPOINT = os.environ.get("AZURE_AI_FOUNDRY_ENDPOINT", "your_foundry_endpoint_here")
 MODEL_DEPLOYMENT_NAME = os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini")
 AGENT_NAME = "cora-web-agent"
 
+# MCP transport configuration
+# - "stdio": launch a private MCP server process bound to a single RLS identity
+# - "http":  share one streamable-HTTP MCP server and send the RLS identity per session
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "stdio").lower()
+MCP_SERVER_URL = os.environ.get("MCP_SERVER_URL", "http://127.0.0.1:8001/mcp")
+DEFAULT_RLS_USER_ID = os.environ.get("RLS_USER_ID", "00000000-0000-0000-0000-000000000000")
+# Per-session identities are only accepted as tokens signed with this secret, issued by an operator
+# and presented at /login (see session_identity.py); without it every session uses DEFAULT_RLS_USER_ID
+RLS_SESSION_SECRET = os.environ.get("RLS_SESSION_SECRET", "")
+
+# Warm-up configuration - pay MCP launch, DB pool, token and first model call costs before serving users
+AGENT_WARMUP = os.environ.get("AGENT_WARMUP", "true").lower() == "true"
+WARMUP_PRIMING_PROMPT = os.environ.get("WARMUP_PRIMING_PROMPT", "")  # Optional canned request sent once at startup
+TOKEN_SCOPE = "https://ai.azure.com/.default"
+
 def create_mcp_tools() -> list[ToolProtocol]:
     """Create MCP tools for the agent"""
+    if MCP_TRANSPORT == "http":
+        # Tools are bound per session in http mode, see get_session_tools()
+        return []
     return [
         MCPStdioTool(
             name="zava_customer_sales_stdio",
@@ -75,14 +227,39 @@ def create_mcp_tools() -> list[ToolProtocol]:
             args=[
                 "src/python/mcp_server/customer_sales/customer_sales.py",
                 "--stdio",
-                "--RLS_USER_ID=00000000-0000-0000-0000-000000000000",
-            ]
+                f"--RLS_USER_ID={DEFAULT_RLS_USER_ID}",
+            ],
+            env={"IMAGE_UPLOAD_DIR": str(UPLOAD_DIR.resolve())},
         ),
     ]
 
+def create_session_mcp_tools(rls_user_id: str) -> list[ToolProtocol]:
+    """Create MCP tools that call the shared HTTP server as the given RLS user"""
+    return [
+        MCPStreamableHTTPTool(
+            name="zava_customer_sales_http",
+            description="MCP server for Zava customer sales analysis",
+            url=MCP_SERVER_URL,
+            headers={"x-rls-user-id": rls_user_id},
+        ),
+    ]
+
+def resolve_rls_user_id(session_token: Optional[str]) -> str:
+    """Get the RLS user ID from a server-signed session token, falling back to the default identity"""
+    if not session_token or not RLS_SESSION_SECRET:
+        return DEFAULT_RLS_USER_ID
+    rls_user_id = verify_rls_identity(session_token, RLS_SESSION_SECRET)
+    if rls_user_id is None:
+        logger.warning("Ignoring invalid or expired RLS session token")
+        return DEFAULT_RLS_USER_ID
+    return rls_user_id
+
 app = FastAPI(title="AI Agent Chat Demo", version="1.0.0")
 
 # Mount static files and templates
+# Reject oversized uploads before Starlette parses and spools the multipart body
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES, paths=("/upload-image",))
+
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
@@ -90,7 +267,11 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 # Global agent instance and thread storage
 agent_instance = None
 credential_instance = None
+agent_mcp_tools: list[ToolProtocol] = []  # MCP tools bound to the agent (stdio mode)
+warmup_state = {"ready": False, "stage": "starting", "error": None}
+warmup_task: Optional[asyncio.Task] = None
 agent_threads = {}  # Store threads per session
+session_tools: Dict[str, tuple[str, list[ToolProtocol]]] = {}  # Store (rls_user_id, MCP tools) per session in http mode
 
 # Agent instructions for Cora AI assistant
 AGENT_INSTRUCTIONS = """You are Cora, an intelligent and friendly AI assistant for Zava, a home improvement brand. You help customers with their DIY projects by understanding their needs and recommending the most suitable products from Zava's catalog.
@@ -116,7 +297,7 @@ If no matching products are found in Zava's catalog, say:
 
 async def initialize_agent():
     """Initialize the Agent Framework agent using AzureAIClient"""
-    global agent_instance, credential_instance
+    global agent_instance, credential_instance, agent_mcp_tools
     if agent_instance is None:
         try:
             # Use AzureCliCredential like cora-agent-demo.py
@@ -131,11 +312,12 @@ async def initialize_agent():
             )
             
             # Create agent with the Azure AI client
+            agent_mcp_tools = create_mcp_tools()
             agent_instance = client.create_agent(
                 name=AGENT_NAME,
                 instructions=AGENT_INSTRUCTIONS,
                 tools=[
-                    *create_mcp_tools(),
+                    *agent_mcp_tools,
                 ],
             )
             logger.info("Agent Framework initialized successfully with AzureAIClient")
@@ -145,6 +327,41 @@ async def initialize_agent():
             traceback.print_exc()
             agent_instance = None
 
+async def warm_up_agent():
+    """Pre-launch tools, pre-fetch credentials and optionally prime the model before reporting ready"""
+    try:
+        warmup_state["stage"] = "initializing agent"
+        await initialize_agent()
+        if agent_instance is None:
+            raise RuntimeError("Agent initialization failed")
+
+        if AGENT_WARMUP:
+            # Launch the MCP server (and its database pool) now rather than on the first message
+            warmup_state["stage"] = "connecting tools"
+            if MCP_TRANSPORT == "http":
+                await get_session_tools("warmup", DEFAULT_RLS_USER_ID)
+            else:
+                for tool in agent_mcp_tools:
+                    if not tool.is_connected:
+                        await tool.connect()
+
+            # Fails fast if `az login` has not been run
+            warmup_state["stage"] = "acquiring token"
+            await credential_instance.get_token(TOKEN_SCOPE)
+
+            if WARMUP_PRIMING_PROMPT:
+                warmup_state["stage"] = "priming model"
+                tools = await get_session_tools("warmup", DEFAULT_RLS_USER_ID)
+                await run_agent_stream(WARMUP_PRIMING_PROMPT, agent_instance.get_new_thread(), tools)
+
+            await close_session_tools("warmup")
+
+        warmup_state.update(ready=True, stage="ready", error=None)
+        logger.info("Agent warm-up complete, ready to serve requests")
+    except Exception as e:
+        warmup_state.update(ready=False, stage="failed", error=str(e))
+        logger.error(f"Agent warm-up failed: {e}")
+
 # Store active connections
 class ConnectionManager:
     def __init__(self):
@@ -162,6 +379,42 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+async def get_session_tools(session_id: str, rls_user_id: str) -> Optional[list[ToolProtocol]]:
+    """Get connected MCP tools for a session, or None when tools are bound to the agent (stdio mode)"""
+    if MCP_TRANSPORT != "http":
+        return None
+
+    cached = session_tools.get(session_id)
+    if cached is not None:
+        cached_user_id, tools = cached
+        if cached_user_id == rls_user_id:
+            return tools
+        # Identity changed for this session, drop the old connections
+        await close_session_tools(session_id)
+
+    tools = create_session_mcp_tools(rls_user_id)
+    for tool in tools:
+        await tool.connect()
+    session_tools[session_id] = (rls_user_id, tools)
+    logger.info(f"Connected session {session_id} to {MCP_SERVER_URL} as RLS user {rls_user_id}")
+    return tools
+
+async def close_session_tools(session_id: str):
+    """Close the MCP connections held by a session"""
+    cached = session_tools.pop(session_id, None)
+    if cached is None:
+        return
+    for tool in cached[1]:
+        try:
+            await tool.close()
+        except Exception as e:
+            logger.error(f"Error closing MCP tool for session {session_id}: {e}")
+
+async def release_session(session_id: str):
+    """Release the thread and MCP connections held by a session"""
+    agent_threads.pop(session_id, None)
+    await close_session_tools(session_id)
+
 @app.post("/upload-image")
 async def upload_image(file: UploadFile = File(...)):
     """Handle image upload"""
@@ -170,20 +423,49 @@ async def upload_image(file: UploadFile = File(...)):
         if not file.content_type or not file.content_type.startswith('image/'):
             return {"error": "Please upload a valid image file"}
         
-        # Generate unique filename
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # BodySizeLimitMiddleware already bounded the request; this checks the image itself
+        partial_path = upload_store.partial_path()
+        hasher = hashlib.sha256()
+        chunks: list[bytes] = []
+        total_bytes = 0
+        detected = None
+        try:
+            async with aiofiles.open(partial_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    if detected is None:
+                        # Trust the file's magic bytes, not the client-supplied content type
+                        detected = sniff_image_type(chunk)
+                        if detected is None:
+                            return {"error": "Please upload a valid image file"}
+                    total_bytes += len(chunk)
+                    if total_bytes > MAX_UPLOAD_BYTES:
+                        return {"error": f"Image is too large. The maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)}MB"}
+                    hasher.update(chunk)
+                    chunks.append(chunk)
+                    await f.write(chunk)
+
+            if detected is None:
+                return {"error": "Please upload a valid image file"}
+
+            mime_type, file_extension = detected
+            digest = hasher.hexdigest()
+            unique_filename, duplicate = await upload_store.commit(partial_path, digest, file_extension)
+        finally:
+            if partial_path.exists():
+                await asyncio.to_thread(partial_path.unlink)
+
+        # Keep the bytes in memory for the agent turn that follows
+        content = b"".join(chunks)
+        upload_cache.put(unique_filename, content, mime_type)
+        # Start preprocessing now so the result is usually ready when the message is sent
+        task = asyncio.create_task(preprocess_image(content, mime_type, digest))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
         
         # Return file URL
         file_url = f"/uploads/{unique_filename}"
         
-        logger.info(f"Image uploaded: {file_url}")
+        logger.info(f"Image uploaded: {file_url}" + (" (duplicate)" if duplicate else ""))
         return {"success": True, "file_url": file_url, "filename": unique_filename}
         
     except Exception as e:
@@ -195,15 +477,55 @@ async def get_chat_page(request: Request):
     """Serve the main chat interface"""
     return templates.TemplateResponse("index.html", {"request": request})
 
+@app.get("/login", response_class=HTMLResponse)
+async def get_login_page(request: Request):
+    """Serve the store manager sign-in form"""
+    return templates.TemplateResponse("login.html", {"request": request, "error": None})
+
+@app.post("/login")
+async def login(request: Request, token: str = Form(...)):
+    """Verify an operator-issued RLS token and keep it in an HttpOnly session cookie"""
+    token = token.strip()
+    rls_user_id = verify_rls_identity(token, RLS_SESSION_SECRET)
+    if rls_user_id is None:
+        error = ("Sign-in is not enabled on this server" if not RLS_SESSION_SECRET
+                 else "The token is invalid or has expired")
+        return templates.TemplateResponse("login.html", {"request": request, "error": error}, status_code=401)
+
+    logger.info(f"Session signed in as RLS user {rls_user_id}")
+    response = RedirectResponse("/", status_code=303)
+    # The page script can't read the cookie; the token's own expiry still applies
+    response.set_cookie(RLS_SESSION_COOKIE, token, httponly=True, samesite="strict",
+                        secure=request.url.scheme == "https")
+    return response
+
+@app.post("/logout")
+async def logout():
+    """Drop the session cookie, so new chats use the default identity"""
+    response = RedirectResponse("/login", status_code=303)
+    response.delete_cookie(RLS_SESSION_COOKIE)
+    return response
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness endpoint - the process is up, whether or not the agent is warm"""
     return {"status": "healthy", "service": "AI Agent Chat Demo"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint - only returns 200 once the agent has been warmed up"""
+    body = {"status": "ready" if warmup_state["ready"] else "not_ready", "stage": warmup_state["stage"]}
+    if warmup_state["error"]:
+        body["error"] = warmup_state["error"]
+    return JSONResponse(body, status_code=200 if warmup_state["ready"] else 503)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time chat"""
     await manager.connect(websocket)
+    session_id = str(uuid.uuid4())
+    # The identity comes from a signed cookie, never from a value the page chooses
+    rls_user_id = resolve_rls_user_id(websocket.cookies.get(RLS_SESSION_COOKIE))
     try:
         while True:
             # Receive message from client
@@ -217,7 +539,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 logger.info(f"With image: {image_url}")
             
             # Process message with AI agent
-            ai_response = await simulate_ai_agent(user_message, image_url)
+            ai_response = await simulate_ai_agent(user_message, image_url, session_id=session_id, rls_user_id=rls_user_id)
             
             # Send response back to client
             response_data = {
@@ -230,9 +552,23 @@ async def websocket_endpoint(websocket: WebSocket):
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
+        await release_session(session_id)
         logger.info("Client disconnected")
 
-async def simulate_ai_agent(user_message: str, image_url: Optional[str] = None, session_id: str = "default") -> str:
+async def run_agent_stream(messages, thread, tools: Optional[list[ToolProtocol]]) -> str:
+    """Stream a response from the agent and collect the text"""
+    response_text = ""
+    async for chunk in agent_instance.run_stream(messages, thread=thread, tools=tools):
+        if chunk.text:
+            response_text += chunk.text
+    return response_text
+
+def image_search_message(user_message: str, image_url: str) -> str:
+    """Text message pointing the agent at an uploaded photo for the CLIP image search tool"""
+    return (f"{user_message}\n\n[The customer attached a photo: {image_url}. "
+            f"Call search_products_by_image with image=\"{image_url}\" to find the matching products.]")
+
+async def simulate_ai_agent(user_message: str, image_url: Optional[str] = None, session_id: str = "default", rls_user_id: Optional[str] = None) -> str:
     """
     Process user message using Cora AI agent with Agent Framework
     """
@@ -252,23 +588,23 @@ async def simulate_ai_agent(user_message: str, image_url: Optional[str] = None,
             agent_threads[session_id] = agent_instance.get_new_thread()
         
         thread = agent_threads[session_id]
+        tools = await get_session_tools(session_id, rls_user_id or DEFAULT_RLS_USER_ID)
         
         # Prepare message with image if provided
         if image_url:
             logger.info(f"Processing message with image: {image_url}")
             
             # Convert relative URL to file path
-            if image_url.startswith("/uploads/"):
+            if IMAGE_SEARCH_MODE == "clip" and image_url.startswith("/uploads/"):
+                # The MCP server embeds the photo with CLIP; no image is sent to the model
+                response_text = await run_agent_stream(image_search_message(user_message, image_url), thread, tools)
+            elif image_url.startswith("/uploads/"):
                 filename = image_url.replace("/uploads/", "")
-                file_path = UPLOAD_DIR / filename
                 
-                if file_path.exists():
-                    # Get MIME type and read image as bytes
-                    mime_type = get_image_mime_type(filename)
-                    
-                    # Read image file as raw bytes
-                    with open(file_path, "rb") as image_file:
-                        image_bytes = image_file.read()
+                image = await load_uploaded_image(filename)
+                
+                if image is not None:
+                    image_bytes, mime_type = await preprocess_image(*image, Path(filename).stem)
                     
                     logger.info(f"Image loaded: {len(image_bytes)} bytes, MIME type: {mime_type}")
                     
@@ -287,30 +623,18 @@ async def simulate_ai_agent(user_message: str, image_url: Optional[str] = None,
                     logger.info(f"Sending message with image to agent: {user_message}")
                     
                     # Stream response from agent with image
-                    response_text = ""
-                    async for chunk in agent_instance.run_stream(message_with_image, thread=thread):
-                        if chunk.text:
-                            response_text += chunk.text
+                    response_text = await run_agent_stream(message_with_image, thread, tools)
                 else:
-                    logger.warning(f"Image file not found: {file_path}")
+                    logger.warning(f"Image file not found: {filename}")
                     # Fall back to text-only processing
-                    response_text = ""
-                    async for chunk in agent_instance.run_stream(user_message, thread=thread):
-                        if chunk.text:
-                            response_text += chunk.text
+                    response_text = await run_agent_stream(user_message, thread, tools)
             else:
                 logger.warning(f"Invalid image URL format: {image_url}")
                 # Fall back to text-only processing
-                response_text = ""
-                async for chunk in agent_instance.run_stream(user_message, thread=thread):
-                    if chunk.text:
-                        response_text += chunk.text
+                response_text = await run_agent_stream(user_message, thread, tools)
         else:
             # Stream response from agent (text only)
-            response_text = ""
-            async for chunk in agent_instance.run_stream(user_message, thread=thread):
-                if chunk.text:
-                    response_text += chunk.text
+            response_text = await run_agent_stream(user_message, thread, tools)
         
         return response_text if response_text else "I processed your request, but I'm having trouble generating a response. Please try rephrasing your question."
             
@@ -323,16 +647,39 @@ async def simulate_ai_agent(user_message: str, image_url: Optional[str] = None,
 @app.on_event("startup")
 async def startup_event():
     """Initialize resources on startup"""
-    await initialize_agent()
+    global image_pool, janitor_task, warmup_task
+    if IMAGE_PREPROCESSING:
+        image_pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    janitor_task = asyncio.create_task(upload_store.run_janitor(UPLOAD_JANITOR_INTERVAL_SECONDS))
+    # Warm up in the background so /health answers immediately while /ready reports progress
+    warmup_task = asyncio.create_task(warm_up_agent())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
-    global agent_instance, credential_instance
+    global agent_instance, credential_instance, image_pool, janitor_task, warmup_task
+    warmup_state["ready"] = False
+    if warmup_task:
+        warmup_task.cancel()
+        warmup_task = None
+
+    if janitor_task:
+        janitor_task.cancel()
+        janitor_task = None
+
+    for session_id in list(session_tools):
+        await close_session_tools(session_id)
+
+    if image_pool:
+        image_pool.shutdown(wait=False, cancel_futures=True)
+        image_pool = None
+
     if agent_instance:
         try:
-            # Agent cleanup if needed
-            pass
+            # Close MCP tools connected during warm-up
+            for tool in agent_mcp_tools:
+                if tool.is_connected:
+                    await tool.close()
         except Exception as e:
             logger.error(f"Error during agent cleanup: {e}")
         agent_instance = None
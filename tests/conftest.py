@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+# The modules under test are scripts run from their own directories, not an installed package
+REPO_ROOT = Path(__file__).resolve().parent.parent
+for source_dir in (
+    REPO_ROOT / "data" / "database",
+    REPO_ROOT / "src" / "python" / "web_app",
+    REPO_ROOT / "src" / "python" / "mcp_server" / "customer_sales",
+):
+    sys.path.insert(0, str(source_dir))
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+openai = pytest.importorskip("openai")
+pytest.importorskip("azure.identity")
+pytest.importorskip("dotenv")
+import httpx  # noqa: E402
+
+import add_description_embeddings  # noqa: E402
+from add_description_embeddings import DescriptionEmbeddingProcessor  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+
+
+def _error(error_class, status: int, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "https://embeddings.test"))
+    return error_class("error", response=response, body=None)
+
+
+def _response(texts: List[str]):
+    # Results come back out of order; the processor must sort them by index
+    data = [SimpleNamespace(index=i, embedding=[float(len(text)), float(i)]) for i, text in enumerate(texts)]
+    return SimpleNamespace(data=list(reversed(data)), usage=SimpleNamespace(total_tokens=len(texts)))
+
+
+class FakeEmbeddings:
+    """Embeddings API that rejects inputs containing "INVALID" and raises queued errors first."""
+
+    def __init__(self, errors=()) -> None:
+        self.errors = list(errors)
+        self.requests: List[List[str]] = []
+
+    def create(self, input: List[str], model: str):
+        self.requests.append(list(input))
+        if self.errors:
+            raise self.errors.pop(0)
+        if any("INVALID" in text for text in input):
+            raise _error(openai.BadRequestError, 400)
+        return _response(input)
+
+
+class FakeAsyncEmbeddings(FakeEmbeddings):
+    async def create(self, input: List[str], model: str):
+        return FakeEmbeddings.create(self, input, model)
+
+
+def _client(embeddings: FakeEmbeddings) -> SimpleNamespace:
+    async def close() -> None:
+        pass
+    return SimpleNamespace(embeddings=embeddings, close=close)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(add_description_embeddings, "RETRY_BASE_SECONDS", 0.001)
+    products = [{"name": f"Product {i}", "description": f"Description {i}", "sku": f"SKU-{i}"} for i in range(5)]
+    products[3]["description"] = "INVALID"
+    catalog = {"main_categories": {"Paint": {"Interior": products}}}
+    (tmp_path / "product_data.json").write_text(json.dumps(catalog))
+    return tmp_path
+
+
+def test_invalid_product_only_loses_its_own_embedding(data_dir) -> None:
+    embeddings = FakeEmbeddings()
+    processor = DescriptionEmbeddingProcessor(str(data_dir), client=_client(embeddings))
+    products = [product for _, _, product in processor.catalog.products()]
+
+    results = processor.embed_batch(products)
+
+    assert [product["sku"] for product, _ in results] == ["SKU-0", "SKU-1", "SKU-2", "SKU-4"]
+    assert results[0][1] == [float(len(processor.embedding_text(products[0]))), 0.0]
+    # 5 -> 2 + 3 -> 3 splits into 1 + 2 -> 2 splits into the bad product and SKU-4
+    assert [len(request) for request in embeddings.requests] == [5, 2, 3, 1, 2, 1, 1]
+
+
+def test_throttled_requests_back_off_and_then_succeed(data_dir) -> None:
+    throttled = _error(openai.RateLimitError, 429, {"retry-after-ms": "10"})
+    embeddings = FakeAsyncEmbeddings(errors=[throttled, throttled])
+    processor = DescriptionEmbeddingProcessor(str(data_dir), client=_client(FakeEmbeddings()))
+    limiter = RateLimiter(max_concurrency=4)
+
+    result = asyncio.run(processor.create_embeddings_async(_client(embeddings), limiter, ["a", "bb"]))
+
+    assert result == [[1.0, 0.0], [2.0, 1.0]]
+    assert processor.stats.throttled == 2
+    assert processor.stats.retries == 0
+    # Each 429 halved the requests allowed in flight (4 -> 2 -> 1); a success at 1 adds a slot back
+    assert limiter.concurrency == 2
+
+
+def test_throttled_batch_fails_once_its_wait_budget_is_spent(data_dir) -> None:
+    throttled = _error(openai.RateLimitError, 429, {"retry-after-ms": "10"})
+    embeddings = FakeAsyncEmbeddings(errors=[throttled] * 10)
+    processor = DescriptionEmbeddingProcessor(str(data_dir), client=_client(FakeEmbeddings()), max_throttle_wait=0.025)
+    products = [product for _, _, product in processor.catalog.products()][:2]
+
+    results = asyncio.run(processor.embed_batch_async(_client(embeddings), RateLimiter(max_concurrency=1), products))
+
+    assert results == []
+    assert len(embeddings.requests) == 3
+
+
+def test_progress_is_checkpointed_per_batch_and_reruns_are_incremental(data_dir) -> None:
+    # The first batch fails outright; the other batches are saved regardless
+    embeddings = FakeEmbeddings(errors=[_error(openai.InternalServerError, 500)])
+    processor = DescriptionEmbeddingProcessor(str(data_dir), batch_size=2, max_retries=0, client=_client(embeddings))
+    processor.process_all_products()
+
+    store = processor.catalog.store("description_embedding")
+    assert sorted(store.skus()) == ["SKU-2", "SKU-4"]
+    assert store.source("SKU-2") == processor.embedding_source(next(
+        product for _, _, product in processor.catalog.products() if product["sku"] == "SKU-2"))
+
+    # A fresh run only embeds the products the first run didn't store
+    embeddings = FakeEmbeddings()
+    DescriptionEmbeddingProcessor(str(data_dir), batch_size=2, client=_client(embeddings)).process_all_products()
+    assert sorted(text for request in embeddings.requests for text in request) == [
+        "Product 0. Description 0", "Product 1. Description 1", "Product 3. INVALID"]
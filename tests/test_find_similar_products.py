@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("mcp")
+
+from customer_sales_semantic_search import AppContext, find_similar_products  # noqa: E402
+from customer_sales_vector_index import InMemoryVectorIndex  # noqa: E402
+
+
+class FakeDatabase:
+    """Pretends the RLS user only has inventory for the given product IDs."""
+
+    def __init__(self, embeddings, visible_ids) -> None:
+        self.rows = [{"product_id": product_id, "embedding": embedding} for product_id, embedding in embeddings.items()]
+        self.visible_ids = visible_ids
+        self.sql_searches = 0
+
+    async def get_description_embeddings(self):
+        return self.rows
+
+    async def get_products_by_similarity_ranking(self, ranked_products, rls_user_id, max_rows, similarity_threshold):
+        results = [{"product_id": product_id} for product_id, _ in ranked_products if product_id in self.visible_ids][:max_rows]
+        return json.dumps({"results": results, "row_count": len(results)})
+
+    async def search_products_by_similarity(self, query_embedding, rls_user_id, max_rows, similarity_threshold):
+        self.sql_searches += 1
+        results = [{"product_id": product_id} for product_id in sorted(self.visible_ids)][:max_rows]
+        return json.dumps({"results": results, "row_count": len(results)})
+
+
+def _search(db: FakeDatabase, max_rows: int) -> dict:
+    index = InMemoryVectorIndex()
+    asyncio.run(index.refresh(db))
+    app_context = AppContext(db=db, semantic_search=None, image_search=None, vector_index=index)
+    return json.loads(asyncio.run(find_similar_products(app_context, [1.0, 0.0], "manager", max_rows, 0.0)))
+
+
+def test_in_memory_ranking_is_used_when_it_fills_max_rows() -> None:
+    db = FakeDatabase({product_id: [1.0, product_id / 100] for product_id in range(20)}, visible_ids=set(range(0, 20, 2)))
+
+    result = _search(db, max_rows=2)
+
+    assert result["row_count"] == 2
+    assert db.sql_searches == 0
+
+
+def test_falls_back_to_pgvector_when_rls_hides_too_many_candidates() -> None:
+    # Only products beyond the 4 * max_rows nearest candidates are visible to this store
+    db = FakeDatabase({product_id: [1.0, product_id / 100] for product_id in range(20)}, visible_ids={15, 16, 17})
+
+    result = _search(db, max_rows=2)
+
+    assert db.sql_searches == 1
+    assert result["row_count"] == 2
+
+
+def test_short_results_are_kept_when_every_match_was_ranked() -> None:
+    db = FakeDatabase({product_id: [1.0, product_id / 100] for product_id in range(5)}, visible_ids={3})
+
+    result = _search(db, max_rows=2)
+
+    assert result["row_count"] == 1
+    assert db.sql_searches == 0
@@ -0,0 +1,40 @@
+import asyncio
+import base64
+
+import pytest
+
+import customer_sales_semantic_search_image_embeddings as image_embeddings
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+@pytest.fixture
+def tool() -> image_embeddings.SemanticSearchImageEmbedding:
+    return image_embeddings.SemanticSearchImageEmbedding()
+
+
+def test_reads_data_urls_and_uploaded_files(tool, tmp_path, monkeypatch) -> None:
+    encoded = base64.b64encode(PNG_BYTES).decode()
+    assert asyncio.run(tool.load_image(f"data:image/png;base64,{encoded}")) == PNG_BYTES
+
+    monkeypatch.setattr(image_embeddings, "IMAGE_UPLOAD_DIR", tmp_path)
+    (tmp_path / "photo.png").write_bytes(PNG_BYTES)
+    # Only the file name is used, so paths can't escape the upload directory
+    assert asyncio.run(tool.load_image("/uploads/../../photo.png")) == PNG_BYTES
+
+
+@pytest.mark.parametrize("url", [
+    "http://169.254.169.254/latest/meta-data/",
+    "https://localhost/image.png",
+    "http://images.example.com/image.png",
+])
+def test_rejects_urls_outside_the_allowlist(tool, monkeypatch, url: str) -> None:
+    monkeypatch.setattr(image_embeddings, "IMAGE_SEARCH_ALLOWED_HOSTS", frozenset({"images.example.com"}))
+    with pytest.raises(ValueError, match="not allowed"):
+        asyncio.run(tool.load_image(url))
+
+
+def test_rejects_oversized_images(tool, monkeypatch) -> None:
+    monkeypatch.setattr(image_embeddings, "MAX_IMAGE_BYTES", 8)
+    with pytest.raises(ValueError, match="larger than"):
+        asyncio.run(tool.load_image(base64.b64encode(PNG_BYTES).decode()))
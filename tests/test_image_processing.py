@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from PIL import Image
+
+from image_processing import prepare_image
+
+ORIENTATION_TAG = 0x0112
+
+
+def _encode(image: Image.Image, image_format: str, **save_kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def _decode(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def _halves(size: tuple[int, int], left: tuple[int, int, int], right: tuple[int, int, int]) -> Image.Image:
+    image = Image.new("RGB", size, right)
+    image.paste(left, (0, 0, size[0] // 2, size[1]))
+    return image
+
+
+def _close(pixel, expected, tolerance: int = 12) -> bool:
+    return all(abs(a - b) <= tolerance for a, b in zip(pixel, expected))
+
+
+def test_applies_the_exif_orientation() -> None:
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = 6  # Rotate 90 degrees clockwise to display
+    data = _encode(_halves((200, 100), (255, 0, 0), (0, 0, 255)), "JPEG", exif=exif.tobytes())
+
+    output, _ = prepare_image(data, max_dimension=1000)
+
+    image = _decode(output)
+    assert image.size == (100, 200)
+    # The left (red) half of the stored pixels is on top once rotated
+    assert _close(image.getpixel((50, 20)), (255, 0, 0))
+    assert _close(image.getpixel((50, 180)), (0, 0, 255))
+
+
+@pytest.mark.parametrize("size, expected", [((4000, 3000), (800, 600)), ((600, 2400), (200, 800)), ((300, 200), (300, 200))])
+def test_caps_the_longest_side(size, expected) -> None:
+    output, mime_type = prepare_image(_encode(Image.new("RGB", size, (10, 120, 60)), "PNG"), max_dimension=800)
+
+    assert mime_type == "image/jpeg"
+    assert _decode(output).size == expected
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA", "P"])
+def test_flattens_transparency_onto_white(mode) -> None:
+    image = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+    image.paste((0, 0, 0, 255), (0, 0, 32, 64))
+    if mode == "LA":
+        image = image.convert("LA")
+    elif mode == "P":
+        image = image.convert("P", palette=Image.Palette.ADAPTIVE)
+        image.info["transparency"] = image.getpixel((63, 0))
+
+    output, _ = prepare_image(_encode(image, "PNG"), max_dimension=64)
+
+    flattened = _decode(output)
+    assert flattened.mode == "RGB"
+    assert _close(flattened.getpixel((8, 32)), (0, 0, 0))
+    assert _close(flattened.getpixel((56, 32)), (255, 255, 255))
+
+
+@pytest.mark.parametrize("output_format, mime_type", [("jpeg", "image/jpeg"), ("WEBP", "image/webp")])
+def test_output_carries_no_metadata(output_format, mime_type) -> None:
+    exif = Image.Exif()
+    exif[0x010F] = "Phone maker"
+    exif[0x8825] = {2: (47.0, 36.0, 22.0)}  # GPS latitude
+    data = _encode(Image.new("RGB", (120, 80), (200, 50, 50)), "JPEG", exif=exif.tobytes(), icc_profile=b"fake icc profile")
+    assert _decode(data).getexif()
+
+    output, returned_mime_type = prepare_image(data, max_dimension=100, output_format=output_format)
+
+    image = _decode(output)
+    assert returned_mime_type == mime_type
+    assert image.format == output_format.upper()
+    assert not image.getexif()
+    assert "exif" not in image.info and "icc_profile" not in image.info
+
+
+def test_rejects_unsupported_output_formats() -> None:
+    with pytest.raises(ValueError, match="PNG"):
+        prepare_image(_encode(Image.new("RGB", (8, 8)), "PNG"), max_dimension=8, output_format="png")
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import re
+
+from customer_sales_postgres import IMAGE_SEARCH_CANDIDATE_FACTOR, PostgreSQLCustomerSales
+
+SEATTLE = "f47ac10b-58cc-4372-a567-0e02b2c3d479"
+
+
+class FakeConnection:
+    """Records the statements sent and answers the image query like the database would.
+
+    The nearest-image CTE sees every product; products the store doesn't stock are
+    removed by the inventory join, and rows over the distance threshold by the WHERE.
+    """
+
+    def __init__(self, distances, stocked) -> None:
+        self.distances = distances
+        self.stocked = stocked
+        self.settings = []
+        self.query = None
+        self.args = None
+
+    async def execute(self, query, *args):
+        self.settings.append(args)
+
+    async def fetch(self, query, embedding, max_rows, distance_threshold, candidates):
+        self.query, self.args = query, (embedding, max_rows, distance_threshold, candidates)
+        nearest = sorted(self.distances.items(), key=lambda item: item[1])[:candidates]
+        visible = [(sku, d) for sku, d in nearest if sku in self.stocked and d <= distance_threshold]
+        return [{"sku": sku, "similarity_distance": d} for sku, d in visible[:max_rows]]
+
+
+class FakePool:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    async def acquire(self):
+        return self.conn
+
+    async def release(self, conn):
+        pass
+
+
+def _search(conn, **kwargs):
+    db = PostgreSQLCustomerSales("postgresql://unused")
+    db.connection_pool = FakePool(conn)
+    return json.loads(asyncio.run(db.search_products_by_image_similarity([0.1, 0.2], rls_user_id=SEATTLE, **kwargs)))
+
+
+def test_limits_after_the_rls_join_not_before() -> None:
+    # The three nearest products aren't stocked in this store
+    distances = {f"SKU-{i}": i / 100 for i in range(20)}
+    conn = FakeConnection(distances, stocked={f"SKU-{i}" for i in range(3, 20)})
+
+    result = _search(conn, max_rows=2, similarity_threshold=50.0)
+
+    assert [row["sku"] for row in result["results"]] == ["SKU-3", "SKU-4"]
+    assert conn.args[1:] == (2, 0.5, 2 * IMAGE_SEARCH_CANDIDATE_FACTOR)
+    assert conn.settings == [(SEATTLE,)]
+
+    # Candidates are limited inside the CTE, the requested rows after the join and threshold
+    query = " ".join(conn.query.split())
+    assert re.search(r"WITH nearest AS \(.*ORDER BY pie\.image_embedding <=> \$1::vector LIMIT \$4 \)", query)
+    assert query.index("JOIN retail.inventory") < query.index("WHERE n.similarity_distance <= $3")
+    assert query.endswith("ORDER BY n.similarity_distance LIMIT $2")
+
+
+def test_applies_the_similarity_threshold() -> None:
+    conn = FakeConnection({"SKU-1": 0.1, "SKU-2": 0.25, "SKU-3": 0.4}, stocked={"SKU-1", "SKU-2", "SKU-3"})
+
+    result = _search(conn, max_rows=5, similarity_threshold=70.0)
+
+    assert [(row["sku"], row["similarity_percent"]) for row in result["results"]] == [("SKU-1", 90.0), ("SKU-2", 75.0)]
+    assert abs(conn.args[2] - 0.3) < 1e-9
+
+
+def test_reports_when_nothing_matches() -> None:
+    result = _search(FakeConnection({"SKU-1": 0.9}, stocked={"SKU-1"}), max_rows=5, similarity_threshold=50.0)
+    assert result["row_count"] == 0
+    assert "50.0%" in result["message"]
+
+
+def test_caps_max_rows() -> None:
+    conn = FakeConnection({}, stocked=set())
+    _search(conn, max_rows=500)
+    assert conn.args[1] == 100
+    assert conn.args[3] == 100 * IMAGE_SEARCH_CANDIDATE_FACTOR
@@ -0,0 +1,22 @@
+import struct
+
+import numpy as np
+
+from pgvector_codec import decode_vector, encode_vector
+
+
+def test_round_trip() -> None:
+    values = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+    decoded = decode_vector(encode_vector(values))
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_binary_layout_matches_pgvector() -> None:
+    # uint16 dimensions, uint16 unused, then big-endian float4 values
+    assert encode_vector([1.0, -2.5]) == struct.pack(">HHff", 2, 0, 1.0, -2.5)
+    np.testing.assert_array_equal(decode_vector(struct.pack(">HHfff", 3, 0, 0.5, 1.0, 2.0)), [0.5, 1.0, 2.0])
+
+
+def test_encodes_python_lists() -> None:
+    assert decode_vector(encode_vector([0.25, 0.75])).tolist() == [0.25, 0.75]
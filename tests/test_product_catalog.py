@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from product_catalog import EmbeddingSource, EmbeddingStore, ProductCatalog
+
+
+def _store(tmp_path) -> EmbeddingStore:
+    return EmbeddingStore.for_field(tmp_path / "product_data.json", "description_embedding")
+
+
+def test_round_trip_through_a_fresh_store(tmp_path) -> None:
+    source = EmbeddingSource("abc123", "text-embedding-3-small/text-embedding-3-small")
+    _store(tmp_path).append_many([("SKU-1", [1.0, 2.0, 3.0]), ("SKU-2", [4.0, 5.0, 6.0])], [source, None])
+
+    store = _store(tmp_path)
+    assert store.dimension == 3
+    assert store.skus() == ["SKU-1", "SKU-2"]
+    np.testing.assert_array_equal(store.get("SKU-2"), np.array([4.0, 5.0, 6.0], dtype=np.float32))
+    assert store.source("SKU-1") == source
+    assert store.source("SKU-2") is None
+    assert store.get("SKU-3") is None
+
+
+def test_latest_row_wins_and_compact_drops_superseded_rows(tmp_path) -> None:
+    store = _store(tmp_path)
+    store.append("SKU-1", [1.0, 0.0])
+    store.append("SKU-2", [0.0, 1.0])
+    store.append("SKU-1", [2.0, 2.0], EmbeddingSource("new", "model"))
+    assert len(store) == 2
+    np.testing.assert_array_equal(store.get("SKU-1"), [2.0, 2.0])
+
+    assert store.compact() == 1
+    assert store.matrix_path.stat().st_size == 2 * 2 * 4
+    assert store.compact() == 0
+
+    reopened = _store(tmp_path)
+    np.testing.assert_array_equal(reopened.get("SKU-1"), [2.0, 2.0])
+    np.testing.assert_array_equal(reopened.get("SKU-2"), [0.0, 1.0])
+    assert reopened.source("SKU-1") == EmbeddingSource("new", "model")
+
+
+def test_interrupted_append_is_ignored_and_overwritten(tmp_path) -> None:
+    store = _store(tmp_path)
+    store.append("SKU-1", [1.0, 1.0])
+    # A row written to the matrix whose index line never made it
+    with store.matrix_path.open("ab") as f:
+        f.write(np.array([9.0, 9.0], dtype="<f4").tobytes())
+
+    store = _store(tmp_path)
+    assert store.skus() == ["SKU-1"]
+    store.append("SKU-2", [2.0, 2.0])
+    np.testing.assert_array_equal(_store(tmp_path).get("SKU-2"), [2.0, 2.0])
+    assert store.matrix_path.stat().st_size == 2 * 2 * 4
+
+
+def test_rejects_embeddings_of_another_dimension(tmp_path) -> None:
+    store = _store(tmp_path)
+    store.append("SKU-1", [1.0, 1.0])
+    with pytest.raises(ValueError):
+        store.append("SKU-2", [1.0, 1.0, 1.0])
+
+
+def test_catalog_needs_embedding_tracks_content_and_model(tmp_path) -> None:
+    product = {"name": "Paint", "description": "Blue", "sku": "SKU-1"}
+    catalog = ProductCatalog({"main_categories": {"Paint": {"Interior": [product]}}}, tmp_path / "product_data.json")
+    source = EmbeddingSource("hash", "model")
+    assert catalog.needs_embedding(product, "description_embedding", source)
+
+    catalog.set_embedding(product, "description_embedding", [1.0, 0.0], source)
+    assert not catalog.needs_embedding(product, "description_embedding", source)
+    assert catalog.needs_embedding(product, "description_embedding", EmbeddingSource("hash", "other-model"))
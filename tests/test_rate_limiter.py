@@ -0,0 +1,72 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket, retry_after_seconds
+
+
+def test_token_bucket_starts_full_and_refills_at_its_rate() -> None:
+    async def run() -> float:
+        # 6000 per minute is 100 per second
+        bucket = TokenBucket(per_minute=6000)
+        await bucket.acquire(6000)
+        started = time.monotonic()
+        await bucket.acquire(10)
+        return time.monotonic() - started
+
+    assert 0.08 <= asyncio.run(run()) < 0.5
+
+
+def test_token_bucket_caps_requests_larger_than_the_bucket() -> None:
+    async def run() -> float:
+        bucket = TokenBucket(per_minute=6000)
+        started = time.monotonic()
+        await bucket.acquire(1_000_000)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_throttling_halves_concurrency_and_successes_restore_it() -> None:
+    async def run() -> RateLimiter:
+        limiter = RateLimiter(max_concurrency=8)
+        limiter.throttled(0.01)
+        limiter.throttled(0.01)
+        assert limiter.concurrency == 2
+        for _ in range(2):
+            await limiter.succeeded()
+        assert limiter.concurrency == 3
+        return limiter
+
+    asyncio.run(run())
+
+
+def test_slot_limits_requests_in_flight() -> None:
+    async def run() -> int:
+        limiter = RateLimiter(max_concurrency=2)
+        peak = 0
+
+        async def request() -> None:
+            nonlocal peak
+            async with limiter.slot(1):
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 7.0),
+    ({}, 7.0),
+])
+def test_retry_after_seconds(headers, expected: float) -> None:
+    error = Exception()
+    error.response = SimpleNamespace(headers=headers)
+    assert retry_after_seconds(error, default=7.0) == expected
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from request_limits import BodySizeLimitMiddleware
+
+
+def _scope(path: str = "/upload-image", content_length: Optional[int] = None) -> Dict[str, Any]:
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    return {"type": "http", "path": path, "headers": headers}
+
+
+async def _read_body_app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    more_body = True
+    while more_body:
+        message = await receive()
+        more_body = message.get("more_body", False)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _run(middleware: BodySizeLimitMiddleware, scope: Dict[str, Any], chunks: List[bytes]) -> Dict[str, Any]:
+    pending = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    received = []
+    sent: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        message = pending.pop(0)
+        received.append(message)
+        return message
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return {"status": sent[0]["status"], "chunks_read": len(received)}
+
+
+def test_rejects_on_content_length_without_reading_the_body() -> None:
+    middleware = BodySizeLimitMiddleware(_read_body_app, max_bytes=10, paths=("/upload-image",))
+    result = _run(middleware, _scope(content_length=11), [b"x" * 11])
+    assert result == {"status": 413, "chunks_read": 0}
+
+
+def test_stops_streamed_body_once_over_the_limit() -> None:
+    middleware = BodySizeLimitMiddleware(_read_body_app, max_bytes=10, paths=("/upload-image",))
+    result = _run(middleware, _scope(), [b"x" * 6, b"x" * 6, b"x" * 6])
+    assert result == {"status": 413, "chunks_read": 2}
+
+
+def test_allows_bodies_within_the_limit_and_other_paths() -> None:
+    middleware = BodySizeLimitMiddleware(_read_body_app, max_bytes=10, paths=("/upload-image",))
+    assert _run(middleware, _scope(content_length=10), [b"x" * 10])["status"] == 200
+    assert _run(middleware, _scope("/ready", content_length=100), [b"x" * 100])["status"] == 200
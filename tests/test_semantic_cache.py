@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+import customer_sales_semantic_cache
+from customer_sales_semantic_cache import SemanticResultCache
+
+SEATTLE = ("f47ac10b-58cc-4372-a567-0e02b2c3d479", 10, 30.0)
+BELLEVUE = ("6ba7b810-9dad-11d1-80b4-00c04fd430c8", 10, 30.0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(customer_sales_semantic_cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_serves_near_duplicate_queries_only(clock) -> None:
+    cache = SemanticResultCache(similarity_threshold=0.97)
+    cache.put(SEATTLE, [1.0, 0.0, 0.0], "drills")
+
+    # Scale doesn't matter, only direction
+    assert cache.get(SEATTLE, [2.0, 0.1, 0.0]) == "drills"
+    assert cache.get(SEATTLE, [1.0, 1.0, 0.0]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_returns_the_closest_cached_query(clock) -> None:
+    cache = SemanticResultCache(similarity_threshold=0.9)
+    cache.put(SEATTLE, [1.0, 0.2, 0.0], "first")
+    cache.put(SEATTLE, [1.0, 0.05, 0.0], "closest")
+    assert cache.get(SEATTLE, [1.0, 0.0, 0.0]) == "closest"
+
+
+def test_partitions_never_share_results(clock) -> None:
+    cache = SemanticResultCache()
+    cache.put(SEATTLE, [1.0, 0.0], "seattle stock")
+    assert cache.get(BELLEVUE, [1.0, 0.0]) is None
+    assert cache.get(SEATTLE[:2] + (50.0,), [1.0, 0.0]) is None
+    assert cache.get(SEATTLE, [1.0, 0.0]) == "seattle stock"
+
+
+def test_entries_expire_after_the_ttl(clock) -> None:
+    cache = SemanticResultCache(ttl_seconds=300)
+    cache.put(SEATTLE, [1.0, 0.0], "old")
+    clock.now += 299
+    cache.put(BELLEVUE, [1.0, 0.0], "newer")
+    assert cache.get(SEATTLE, [1.0, 0.0]) == "old"
+
+    clock.now += 1
+    assert cache.get(SEATTLE, [1.0, 0.0]) is None
+    assert len(cache) == 1
+    assert SEATTLE not in cache._partitions
+
+
+def test_evicts_the_oldest_entry_when_full(clock) -> None:
+    cache = SemanticResultCache(max_entries=2)
+    cache.put(SEATTLE, [1.0, 0.0], "a")
+    cache.put(SEATTLE, [0.0, 1.0], "b")
+    cache.put(BELLEVUE, [1.0, 0.0], "c")
+    assert len(cache) == 2
+    assert cache.get(SEATTLE, [1.0, 0.0]) is None
+    assert cache.get(SEATTLE, [0.0, 1.0]) == "b"
+
+
+def test_zero_vectors_are_not_cached(clock) -> None:
+    cache = SemanticResultCache()
+    cache.put(SEATTLE, [0.0, 0.0], "nothing")
+    assert len(cache) == 0
+    assert cache.get(SEATTLE, [0.0, 0.0]) is None
@@ -0,0 +1,33 @@
+import pytest
+from session_identity import sign_rls_identity, verify_rls_identity
+
+SEATTLE = "f47ac10b-58cc-4372-a567-0e02b2c3d479"
+
+
+def test_round_trip() -> None:
+    token = sign_rls_identity(SEATTLE, "secret", ttl_seconds=60, now=1000)
+    assert verify_rls_identity(token, "secret", now=1030) == SEATTLE
+
+
+def test_rejects_wrong_secret_and_expired_tokens() -> None:
+    token = sign_rls_identity(SEATTLE, "secret", ttl_seconds=60, now=1000)
+    assert verify_rls_identity(token, "other", now=1030) is None
+    assert verify_rls_identity(token, "secret", now=1061) is None
+
+
+def test_rejects_tampered_identity() -> None:
+    token = sign_rls_identity(SEATTLE, "secret", now=1000)
+    forged_payload = sign_rls_identity("00000000-0000-0000-0000-000000000000", "attacker", now=1000).split(".")[0]
+    assert verify_rls_identity(f"{forged_payload}.{token.split('.')[1]}", "secret", now=1000) is None
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "a.b.c", "!!!.???"])
+def test_rejects_malformed_tokens(token: str) -> None:
+    assert verify_rls_identity(token, "secret") is None
+
+
+def test_requires_secret_and_uuid() -> None:
+    with pytest.raises(ValueError):
+        sign_rls_identity(SEATTLE, "")
+    with pytest.raises(ValueError):
+        sign_rls_identity("not-a-uuid", "secret")
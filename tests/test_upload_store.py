@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import upload_store
+from upload_store import PARTIAL_SUFFIX, UploadStore
+
+
+@pytest.fixture
+def store(tmp_path) -> UploadStore:
+    return UploadStore(tmp_path / "uploads", max_bytes=1000, max_age_seconds=3600)
+
+
+def _upload(store: UploadStore, content: bytes, digest: str) -> tuple[str, bool]:
+    partial = store.partial_path()
+    partial.write_bytes(content)
+    return asyncio.run(store.commit(partial, digest, "png"))
+
+
+def _age(path, seconds: float) -> None:
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_commit_stores_once_and_dedupes(store) -> None:
+    assert _upload(store, b"image", "abc") == ("abc.png", False)
+    _age(store.directory / "abc.png", 100)
+
+    assert _upload(store, b"image", "abc") == ("abc.png", True)
+    assert [path.name for path in store.directory.iterdir()] == ["abc.png"]
+    # The duplicate upload marked the stored copy as recently used
+    assert time.time() - (store.directory / "abc.png").stat().st_mtime < 10
+
+
+def test_duplicate_commit_survives_a_concurrent_eviction(store, monkeypatch) -> None:
+    _upload(store, b"image", "abc")
+    final_path = store.directory / "abc.png"
+    real_utime = os.utime
+
+    def evicted_before_utime(path, *args, **kwargs):
+        # The janitor removes the file between the exists() check and utime()
+        final_path.unlink(missing_ok=True)
+        return real_utime(path, *args, **kwargs)
+
+    monkeypatch.setattr(upload_store.os, "utime", evicted_before_utime)
+    assert _upload(store, b"image", "abc") == ("abc.png", False)
+    assert final_path.read_bytes() == b"image"
+    assert not list(store.directory.glob(f"*{PARTIAL_SUFFIX}"))
+
+
+def test_evict_removes_expired_files_and_abandoned_partials(store) -> None:
+    _upload(store, b"old", "old")
+    _upload(store, b"new", "new")
+    _age(store.directory / "old.png", 7200)
+    stale_partial = store.partial_path()
+    stale_partial.write_bytes(b"xx")
+    _age(stale_partial, 7200)
+    fresh_partial = store.partial_path()
+    fresh_partial.write_bytes(b"yy")
+
+    assert store.evict() == (2, 5)
+    assert sorted(path.name for path in store.directory.iterdir()) == sorted(["new.png", fresh_partial.name])
+
+
+def test_evict_trims_least_recently_used_files_to_the_size_budget(store) -> None:
+    for name, age in (("a", 30), ("b", 10), ("c", 20)):
+        _upload(store, b"x" * 400, name)
+        _age(store.directory / f"{name}.png", age)
+
+    # 1200 bytes against a 1000 byte budget: only the oldest file has to go
+    assert store.evict() == (1, 400)
+    assert sorted(path.name for path in store.directory.iterdir()) == ["b.png", "c.png"]
+
+    # Touching a file makes it the most recently used
+    asyncio.run(store.touch("c.png"))
+    _upload(store, b"x" * 400, "d")
+    store.evict()
+    assert sorted(path.name for path in store.directory.iterdir()) == ["c.png", "d.png"]
+
+
+@pytest.mark.parametrize("filename", ["../secret.png", "nested/abc.png", "/etc/passwd", f"abc{PARTIAL_SUFFIX}"])
+def test_path_for_rejects_anything_but_stored_file_names(store, filename: str) -> None:
+    assert store.path_for(filename) is None
+
+
+def test_path_for_resolves_stored_files(store) -> None:
+    assert store.path_for("abc.png") == store.directory / "abc.png"
@@ -0,0 +1,67 @@
+import asyncio
+
+import numpy as np
+
+from customer_sales_vector_index import InMemoryVectorIndex
+
+
+class FakeDatabase:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    async def get_description_embeddings(self):
+        return self.rows
+
+
+def _index(embeddings) -> InMemoryVectorIndex:
+    index = InMemoryVectorIndex()
+    rows = [{"product_id": product_id, "embedding": embedding} for product_id, embedding in embeddings.items()]
+    asyncio.run(index.refresh(FakeDatabase(rows)))
+    return index
+
+
+def test_returns_top_k_nearest_first() -> None:
+    index = _index({
+        10: [1.0, 0.0],
+        20: [0.0, 1.0],
+        30: [1.0, 1.0],
+        40: [5.0, 1.0],  # Unnormalized; only the direction counts
+        50: [-1.0, 0.0],
+    })
+
+    ranked = index.search([1.0, 0.0], max_candidates=3, similarity_threshold=0.0)
+
+    assert [product_id for product_id, _ in ranked] == [10, 40, 30]
+    distances = [distance for _, distance in ranked]
+    assert distances == sorted(distances)
+    assert distances[0] == 0.0
+    assert np.isclose(distances[2], 1 - np.sqrt(0.5))
+
+
+def test_matches_a_full_sort() -> None:
+    rng = np.random.default_rng(7)
+    matrix = rng.standard_normal((500, 16))
+    index = _index({product_id: row.tolist() for product_id, row in enumerate(matrix)})
+    query = rng.standard_normal(16)
+
+    ranked = index.search(query.tolist(), max_candidates=25, similarity_threshold=-100.0)
+
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))), kind="stable")[:25]
+    assert [product_id for product_id, _ in ranked] == expected.tolist()
+
+
+def test_applies_the_similarity_threshold() -> None:
+    index = _index({1: [1.0, 0.0], 2: [1.0, 1.0], 3: [0.0, 1.0]})
+    # cos 45 degrees is about 70.7%
+    assert [product_id for product_id, _ in index.search([1.0, 0.0], 10, similarity_threshold=70.0)] == [1, 2]
+    assert [product_id for product_id, _ in index.search([1.0, 0.0], 10, similarity_threshold=71.0)] == [1]
+
+
+def test_empty_or_mismatched_queries_return_nothing() -> None:
+    assert InMemoryVectorIndex().search([1.0, 0.0], 5) == []
+    index = _index({1: [1.0, 0.0]})
+    assert len(index) == 1 and index.is_ready()
+    assert index.search([0.0, 0.0], 5) == []
+    assert index.search([1.0, 0.0, 0.0], 5) == []
+    assert index.search([1.0, 0.0], 0) == []
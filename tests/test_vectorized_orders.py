@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from vectorized_orders import VectorizedOrderGenerator
+
+
+@pytest.fixture
+def generator() -> VectorizedOrderGenerator:
+    return VectorizedOrderGenerator.from_catalog(
+        stores={
+            "Seattle": {"customer_distribution_weight": 3, "order_frequency_multiplier": 1.5},
+            "Tacoma": {"customer_distribution_weight": 1},
+        },
+        store_ids={"Seattle": 1, "Tacoma": 2},
+        year_weights={2023: 1.0, 2024: 1.2},
+        categories={"Paint": [1.0] * 6 + [2.0] * 6, "Tools": None},
+        category_products={"Paint": [101, 102], "Tools": [201]},
+        product_prices={101: 10.0, 102: 20.0, 201: 30.0},
+    )
+
+
+def test_from_catalog_rejects_stores_without_an_id() -> None:
+    with pytest.raises(ValueError, match="Tacoma"):
+        VectorizedOrderGenerator.from_catalog(
+            stores={"Seattle": {"customer_distribution_weight": 3}, "Tacoma": {"customer_distribution_weight": 1}},
+            store_ids={"Seattle": 1},
+            year_weights={2024: 1.0},
+            categories={"Tools": None},
+            category_products={"Tools": [201]},
+            product_prices={201: 30.0},
+        )
+
+
+def _generate(generator, *args, **kwargs):
+    orders, items = [], []
+    for _, _, order_rows, item_rows in generator.generate_batches(*args, **kwargs):
+        orders += order_rows
+        items += item_rows
+    return orders, items
+
+
+def test_order_items_match_their_orders(generator) -> None:
+    orders, items = _generate(generator, 1, 120, seed=1, batch_customers=50)
+    order_stores = {order_id: store_id for order_id, _, store_id, _ in orders}
+
+    assert list(order_stores) == list(range(1, len(orders) + 1))
+    assert {item[0] for item in items} == set(order_stores)
+    assert all(order_stores[item[0]] == item[1] for item in items)
+    assert np.isin([item[2] for item in items], [101, 102, 201]).all()
+
+
+def test_same_seed_gives_the_same_dataset(generator) -> None:
+    assert _generate(generator, 1, 80, seed=5) == _generate(generator, 1, 80, seed=5)
+    assert _generate(generator, 1, 80, seed=5) != _generate(generator, 1, 80, seed=6)
+
+
+def test_plan_shards_covers_customers_with_contiguous_order_ids(generator) -> None:
+    shards = generator.plan_shards(num_customers=250, shard_customers=100, seed=42)
+
+    assert [(s.first_customer_id, s.last_customer_id) for s in shards] == [(1, 100), (101, 200), (201, 250)]
+    assert shards[0].first_order_id == 1
+    for shard, following in zip(shards, shards[1:]):
+        assert following.first_order_id == shard.first_order_id + generator.count_orders(
+            shard.first_customer_id, shard.last_customer_id, shard.seed)
+
+
+def test_sharded_generation_has_no_overlapping_order_ids(generator) -> None:
+    order_ids = []
+    for shard in generator.plan_shards(num_customers=250, shard_customers=60, seed=7):
+        orders, _ = _generate(generator, shard.first_customer_id, shard.last_customer_id, shard.first_order_id, shard.seed)
+        order_ids += [order_id for order_id, *_ in orders]
+    assert order_ids == list(range(1, len(order_ids) + 1))
+
+
+def test_plan_shards_is_deterministic_per_seed(generator) -> None:
+    def plan(seed):
+        return [(s.first_order_id, s.seed.entropy, s.seed.spawn_key) for s in generator.plan_shards(200, 50, seed)]
+
+    assert plan(42) == plan(42)
+    assert plan(42) != plan(43)
+
+
+def test_streamed_rows_match_generate_batches(generator) -> None:
+    orders, items = _generate(generator, 1, 120, seed=3, batch_customers=50)
+    assert list(generator.iter_orders(1, 120, seed=3, batch_customers=50)) == orders
+    assert list(generator.iter_order_items(1, 120, seed=3, batch_customers=50)) == items